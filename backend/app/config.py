@@ -1,6 +1,6 @@
 """Lightweight backend configuration - Redis only, no persistent DB."""
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -16,12 +16,68 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
     REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+
+    # Scraper settings
+    SCRAPER_PAGES_PER_SOURCE: int = 3
+    SCRAPER_FOLLOW_DETAILS: bool = False
+    SCRAPER_HOST_RATE: float = 1.0
+    SCRAPER_HOST_BURST: int = 2
+    SCRAPER_HOST_CONCURRENCY: int = 2
+    SCRAPER_TIMEOUT: float = 10.0
+    SCRAPER_INCREMENTAL: bool = True
+    SCRAPER_PARSER: str = "auto"  # selectolax, lxml, bs4 or auto (fastest installed)
+    SCRAPER_SCHEDULE_ENABLED: bool = True  # refresh jobs in the background while the app runs
+    SCRAPER_REFRESH_INTERVAL: int = 3600  # seconds between scheduled scrapes
+    SCRAPER_RUN_TIMEOUT: int = 300  # seconds before a scrape run is abandoned
+
+    # Skill taxonomy JSON ({"Skill": ["synonym", ...]}); defaults to app/data/skills_taxonomy.json
+    SKILLS_TAXONOMY_PATH: Optional[str] = None
+
+    # KCSE careers/universities catalogue: JSON source, compiled binary (rebuilt when the source is newer)
+    # and how often workers check for a new compiled file; defaults to app/data/kcse_catalogue.{json,bin}
+    KCSE_CATALOGUE_SOURCE: Optional[str] = None
+    KCSE_CATALOGUE_PATH: Optional[str] = None
+    KCSE_CATALOGUE_CHECK_INTERVAL: float = 5.0
+
+    # KES per unit of foreign currency, for normalizing scraped salaries to monthly KES
+    SALARY_FX_RATES: Dict[str, float] = {"USD": 129.0, "EUR": 140.0, "GBP": 165.0}
+
+    # Merge near-duplicate listings (same vacancy on several sites) when jobs are stored
+    JOB_DEDUP_ENABLED: bool = True
+    JOB_DEDUP_THRESHOLD: float = 0.8  # estimated Jaccard similarity of title+company+description
+    # Jobs posted longer ago than this are removed after each scrape run; 0 keeps them
+    JOB_MAX_AGE_DAYS: int = 60
 
     # Session settings
     SESSION_TTL: int = 3600
+    # Also read and delete per-field session keys written before sessions became one hash.
+    # Each lookup then SCANs the keyspace, so only turn it on for the first SESSION_TTL
+    # after upgrading a deployment that still holds such sessions
+    SESSION_LEGACY_KEYS: bool = False
+
+    # Cache settings: how long past its soft TTL a stale entry may still be served while it is refreshed
+    CACHE_STALE_TTL: int = 900
+    CACHE_LOCK_TIMEOUT: int = 30  # seconds one refresher holds a key's lock
+    # In-process (L1) cache in front of Redis for hot keys
+    CACHE_L1_SIZE: int = 256
+    CACHE_L1_TTL: float = 5.0
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    # Stored value format: orjson, msgpack, json or auto; zstd-compress values of at least CACHE_COMPRESS_MIN_BYTES
+    CACHE_CODEC: str = "auto"
+    CACHE_COMPRESSION: bool = True
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
 
     # External API Keys (optional)
     GEMINI_API_KEY: Optional[str] = None
+    GEMINI_CACHE_TTL: int = 86400  # seconds a Gemini answer is reused for the same canonical input
+    GEMINI_POINTS_BUCKET: float = 1.0  # KCSE cluster points are rounded down to this band for caching
+    GEMINI_TIMEOUT: float = 20.0  # seconds before a call falls back to the mock response
+    GEMINI_MAX_CONCURRENCY: int = 8  # Gemini calls in flight per worker
+    GEMINI_HEDGE_DELAY: float = 0.0  # resend a call still unanswered after this many seconds; 0 disables
+    GEMINI_MODEL_CACHE_TTL: int = 86400  # seconds the discovered model name is shared via Redis
     
     # Database (optional - not used but may be in .env)
     DATABASE_URL: Optional[str] = None
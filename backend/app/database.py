@@ -1,101 +1,312 @@
 """Redis connection for temporary session storage."""
 import redis
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 from app.config import settings
+from collections import OrderedDict
+import asyncio
 import json
-from typing import Optional, Any
+import time
+from typing import Optional, Any, Dict, List
 import uuid
 
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Header byte: codec ID in the low bits, ZSTD_FLAG when the body is compressed. Bytes
+# 0x01-0x0f and 0x81-0x8f never start JSON text or UTF-8, so values written before
+# the header existed (plain JSON / strings) are still recognized and decoded.
+ZSTD_FLAG = 0x80
+ZSTD_LEVEL = 3
+
+# One hash per session: one key, one TTL, one DEL
+SESSION_KEY = "session:{}"
+# Earlier layout, one key per session field (see SESSION_LEGACY_KEYS)
+LEGACY_SESSION_KEY = "session:{}:{}"
+
+
+class Codec:
+    """Turns cache values into bytes and back."""
+    name = ""
+    header = 0
+    available = True
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = "json"
+    header = 0x01
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+    header = 0x02
+    available = ORJSON_AVAILABLE
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    header = 0x03
+    available = MSGPACK_AVAILABLE
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), OrjsonCodec(), MsgpackCodec())}
+_CODECS_BY_HEADER = {codec.header: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str = "auto") -> Codec:
+    """Codec by name; ``auto`` picks orjson when installed, else json."""
+    if name == "auto":
+        name = "orjson" if ORJSON_AVAILABLE else "json"
+    codec = CODECS.get(name)
+    if codec is None or not codec.available:
+        print(f"Cache codec {name!r} is not available, using json")
+        return CODECS["json"]
+    return codec
+
+
+def encode_value(value: Any, codec: Optional[Codec] = None, compress: Optional[bool] = None,
+                 compress_min_bytes: Optional[int] = None) -> bytes:
+    """Header byte plus the encoded (and, if large enough, zstd-compressed) value."""
+    codec = codec or _default_codec
+    compress = _compress if compress is None else compress and ZSTD_AVAILABLE
+    threshold = settings.CACHE_COMPRESS_MIN_BYTES if compress_min_bytes is None else compress_min_bytes
+
+    body = codec.dumps(value)
+    header = codec.header
+    if compress and len(body) >= threshold:
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+        header |= ZSTD_FLAG
+    return bytes((header,)) + body
+
+
+def decode_value(data: Optional[bytes]) -> Optional[Any]:
+    """Decode a stored value in any format (header-tagged or legacy JSON/plain text)."""
+    if data is None:
+        return None
+    codec = _CODECS_BY_HEADER.get(data[0] & ~ZSTD_FLAG) if data else None
+    if codec is None:
+        return _deserialize(data.decode("utf-8", errors="replace"))
+
+    body = data[1:]
+    if data[0] & ZSTD_FLAG:
+        body = zstandard.ZstdDecompressor().decompress(body)
+    return codec.loads(body)
+
+
+_default_codec = get_codec(settings.CACHE_CODEC)
+_compress = settings.CACHE_COMPRESSION and ZSTD_AVAILABLE
+
+
+def _deserialize(value: Optional[str]) -> Optional[Any]:
+    """Decode a value stored as JSON text, falling back to the raw string."""
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return value
+
+
+def copy_value(value: Any) -> Any:
+    """Deep copy of a decoded cache value (nested dicts and lists; other values are immutable)."""
+    kind = type(value)
+    if kind is dict:
+        return {key: copy_value(item) if type(item) in (dict, list) else item for key, item in value.items()}
+    if kind is list:
+        return [copy_value(item) if type(item) in (dict, list) else item for item in value]
+    return value
+
+
+class LocalCache:
+    """Size- and TTL-bounded LRU of decoded cache values.
+
+    Entries are decoded once when they are read from Redis; each hit
+    returns a deep copy (``copy_value``), so callers may mutate what they
+    get without touching the entry. ``misses`` is left to the caller,
+    which knows whether a lookup actually went on to the next tier.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy_value(entry[1])
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache ``value``, which the caller must not mutate afterwards."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class RedisClient:
-    """Redis client for session-based temporary storage."""
+    """Redis client for session-based temporary storage.
+
+    Session and cache values are stored in the binary codec format
+    (``encode_value``), through ``raw``, a second connection that leaves
+    responses undecoded.
+    """
 
     def __init__(self):
         """Initialize Redis connection"""
         try:
-            if settings.REDIS_URL:
-                self.client = redis.from_url(
-                    settings.REDIS_URL,
-                    decode_responses=True
-                )
-            else:
-                self.client = redis.Redis(
-                    host=settings.REDIS_HOST,
-                    port=settings.REDIS_PORT,
-                    db=settings.REDIS_DB,
-                    password=settings.REDIS_PASSWORD,
-                    decode_responses=True
-                )
+            self.client = self._connect(decode_responses=True)
+            self.raw = self._connect(decode_responses=False)
             # Test connection
             self.client.ping()
             self.connected = True
         except Exception:
             self.client = None
-            self.connected = False  
+            self.raw = None
+            self.connected = False
+
+    @staticmethod
+    def _connect(decode_responses: bool) -> redis.Redis:
+        if settings.REDIS_URL:
+            return redis.from_url(settings.REDIS_URL, decode_responses=decode_responses)
+        return redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=decode_responses
+        )
 
     def get_session_id(self) -> str:
         """Generate a temporary session ID"""
         return str(uuid.uuid4())
 
     def set_session_data(self, session_id: str, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Store data in session with optional TTL."""
-        if not self.connected:
-            return False
-        
-        redis_key = f"session:{session_id}:{key}"
-        ttl = ttl or settings.SESSION_TTL
+        """Store data in session; ``ttl`` (re)sets the whole session's expiry."""
+        return self.set_session_fields(session_id, {key: value}, ttl)
 
-        if isinstance(value, (dict, list)):
-            value = json.dumps(value)
+    def set_session_fields(self, session_id: str, fields: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Store several session fields in one pipelined round-trip."""
+        if not self.connected or not fields:
+            return False
 
-        return self.client.setex(redis_key, ttl, value)
+        redis_key = SESSION_KEY.format(session_id)
+        pipe = self.raw.pipeline(transaction=True)
+        pipe.hset(redis_key, mapping={name: encode_value(value) for name, value in fields.items()})
+        pipe.expire(redis_key, ttl or settings.SESSION_TTL)
+        pipe.execute()
+        return True
 
     def get_session_data(self, session_id: str, key: str) -> Optional[Any]:
         """Retrieve data from session."""
+        return self.get_session_fields(session_id, [key]).get(key)
+
+    def get_session_fields(self, session_id: str, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Several session fields (all of them when ``keys`` is omitted) in one round-trip.
+
+        Fields missing from the session hash are looked up under their
+        pre-hash per-field keys while ``SESSION_LEGACY_KEYS`` is on.
+        """
         if not self.connected:
-            return None
-            
-        redis_key = f"session:{session_id}:{key}"
-        value = self.client.get(redis_key)
+            return {}
 
-        if value is None:
-            return None
+        redis_key = SESSION_KEY.format(session_id)
+        if keys is None:
+            fields = {name.decode(): value for name, value in self.raw.hgetall(redis_key).items()}
+            if settings.SESSION_LEGACY_KEYS:
+                legacy = list(self.client.scan_iter(match=LEGACY_SESSION_KEY.format(session_id, "*")))
+                keys = list(fields) + [key.split(":", 2)[2] for key in legacy if key.split(":", 2)[2] not in fields]
+        else:
+            fields = dict(zip(keys, self.raw.hmget(redis_key, keys))) if keys else {}
 
-        try:
-            return json.loads(value)
-        except (json.JSONDecodeError, TypeError):
-            return value
+        missing = [key for key in keys or [] if fields.get(key) is None]
+        if missing and settings.SESSION_LEGACY_KEYS:
+            fields.update(zip(missing, self.raw.mget([LEGACY_SESSION_KEY.format(session_id, key) for key in missing])))
+        return {key: decode_value(value) for key, value in fields.items() if value is not None}
 
     def delete_session(self, session_id: str) -> int:
-        """Delete all data for a session."""
+        """Delete all data for a session; returns the number of fields removed."""
         if not self.connected:
             return 0
-            
-        pattern = f"session:{session_id}:*"
-        keys = self.client.keys(pattern)
-        if keys:
-            return self.client.delete(*keys)
-        return 0
+
+        legacy = []
+        if settings.SESSION_LEGACY_KEYS:
+            legacy = list(self.client.scan_iter(match=LEGACY_SESSION_KEY.format(session_id, "*")))
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hlen(SESSION_KEY.format(session_id))
+        pipe.delete(SESSION_KEY.format(session_id), *legacy)
+        fields, deleted = pipe.execute()
+        # DEL counted the hash as one key
+        return fields + deleted - (1 if fields else 0)
 
     def set_cache(self, key: str, value: Any, ttl: int = 300) -> bool:
         """Set a cache entry (For API responses, not user-specific)."""
         if not self.connected:
             return False
-            
-        if isinstance(value, (dict, list)):
-            value = json.dumps(value)
-        return self.client.setex(f"cache:{key}", ttl, value)
+
+        return self.raw.setex(f"cache:{key}", ttl, encode_value(value))
 
     def get_cache(self, key: str) -> Optional[Any]:
         """Get a cache entry."""
         if not self.connected:
             return None
-            
-        value = self.client.get(f"cache:{key}")
-        if value is None:
-            return None
-        try:
-            return json.loads(value)
-        except (json.JSONDecodeError, TypeError):
-            return value
+
+        return decode_value(self.raw.get(f"cache:{key}"))
 
     def ping(self) -> bool:
         """Check redis connection."""
@@ -106,6 +317,221 @@ class RedisClient:
         except Exception:
             return False
 
-#Global Redis instance
-redis_client = RedisClient()                        
 
+class AsyncRedisClient:
+    """Asyncio Redis client backed by a bounded connection pool.
+
+    Used from ``async def`` routes so a slow Redis round-trip only suspends
+    the awaiting request instead of blocking the whole event loop. The pool
+    is capped at ``REDIS_MAX_CONNECTIONS``; callers wait up to
+    ``REDIS_POOL_TIMEOUT`` seconds for a free connection. Connections are
+    opened lazily, and any Redis error degrades to a cache miss.
+
+    Session and cache values are stored in the binary codec format
+    (``encode_value``) through ``raw``, a client on a second pool that
+    leaves responses undecoded; ``client`` decodes responses to ``str``.
+    Each session is a single hash (``SESSION_KEY``), so reading, expiring
+    or deleting it never scans the keyspace unless ``SESSION_LEGACY_KEYS``
+    (the fallback to the older per-field keys) is turned on.
+
+    ``get_cache`` reads through an in-process ``LocalCache`` (L1) first, so
+    hot keys skip the round-trip and the decode (each hit gets its own copy).
+    Writes evict the key locally and announce it on
+    ``CACHE_INVALIDATION_CHANNEL``; the listener started by
+    ``start_invalidation_listener`` evicts it in every other worker, and
+    the short ``CACHE_L1_TTL`` bounds staleness if a message is missed.
+    """
+
+    def __init__(self):
+        """Create the connection pools (no network I/O happens here)."""
+        try:
+            self.pool = self._pool(decode_responses=True)
+            self.raw_pool = self._pool(decode_responses=False)
+            self.client = aioredis.Redis(connection_pool=self.pool)
+            self.raw = aioredis.Redis(connection_pool=self.raw_pool)
+        except Exception:
+            self.pool = self.raw_pool = None
+            self.client = self.raw = None
+
+        self.l1 = LocalCache(settings.CACHE_L1_SIZE, settings.CACHE_L1_TTL)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _pool(decode_responses: bool) -> aioredis.BlockingConnectionPool:
+        pool_options = {
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            "timeout": settings.REDIS_POOL_TIMEOUT,
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "decode_responses": decode_responses,
+        }
+        if settings.REDIS_URL:
+            return aioredis.BlockingConnectionPool.from_url(settings.REDIS_URL, **pool_options)
+        return aioredis.BlockingConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            **pool_options
+        )
+
+    def get_session_id(self) -> str:
+        """Generate a temporary session ID"""
+        return str(uuid.uuid4())
+
+    async def set_session_data(self, session_id: str, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store data in session; ``ttl`` (re)sets the whole session's expiry."""
+        return await self.set_session_fields(session_id, {key: value}, ttl)
+
+    async def set_session_fields(self, session_id: str, fields: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Store several session fields in one pipelined round-trip."""
+        if self.client is None or not fields:
+            return False
+
+        redis_key = SESSION_KEY.format(session_id)
+        try:
+            pipe = self.raw.pipeline(transaction=True)
+            pipe.hset(redis_key, mapping={name: encode_value(value) for name, value in fields.items()})
+            pipe.expire(redis_key, ttl or settings.SESSION_TTL)
+            await pipe.execute()
+        except RedisError:
+            return False
+        return True
+
+    async def get_session_data(self, session_id: str, key: str) -> Optional[Any]:
+        """Retrieve data from session."""
+        return (await self.get_session_fields(session_id, [key])).get(key)
+
+    async def get_session_fields(self, session_id: str, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Several session fields (all of them when ``keys`` is omitted) in one round-trip.
+
+        Fields missing from the session hash are looked up under their
+        pre-hash per-field keys while ``SESSION_LEGACY_KEYS`` is on.
+        """
+        if self.client is None:
+            return {}
+
+        redis_key = SESSION_KEY.format(session_id)
+        try:
+            if keys is None:
+                fields = {name.decode(): value for name, value in (await self.raw.hgetall(redis_key)).items()}
+                if settings.SESSION_LEGACY_KEYS:
+                    legacy = [key.split(":", 2)[2] async for key in
+                              self.client.scan_iter(match=LEGACY_SESSION_KEY.format(session_id, "*"))]
+                    keys = list(fields) + [key for key in legacy if key not in fields]
+            else:
+                fields = dict(zip(keys, await self.raw.hmget(redis_key, keys))) if keys else {}
+
+            missing = [key for key in keys or [] if fields.get(key) is None]
+            if missing and settings.SESSION_LEGACY_KEYS:
+                values = await self.raw.mget([LEGACY_SESSION_KEY.format(session_id, key) for key in missing])
+                fields.update(zip(missing, values))
+        except RedisError:
+            return {}
+        return {key: decode_value(value) for key, value in fields.items() if value is not None}
+
+    async def delete_session(self, session_id: str) -> int:
+        """Delete all data for a session; returns the number of fields removed."""
+        if self.client is None:
+            return 0
+
+        try:
+            legacy = []
+            if settings.SESSION_LEGACY_KEYS:
+                legacy = [key async for key in self.client.scan_iter(match=LEGACY_SESSION_KEY.format(session_id, "*"))]
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hlen(SESSION_KEY.format(session_id))
+            pipe.delete(SESSION_KEY.format(session_id), *legacy)
+            fields, deleted = await pipe.execute()
+        except RedisError:
+            return 0
+        # DEL counted the hash as one key
+        return fields + deleted - (1 if fields else 0)
+
+    async def set_cache(self, key: str, value: Any, ttl: int = 300) -> bool:
+        """Set a cache entry (For API responses, not user-specific)."""
+        if self.client is None:
+            return False
+
+        self.l1.pop(key)
+        try:
+            stored = await self.raw.setex(f"cache:{key}", ttl, encode_value(value))
+            await self.client.publish(settings.CACHE_INVALIDATION_CHANNEL, key)
+            return stored
+        except RedisError:
+            return False
+
+    async def get_cache(self, key: str) -> Optional[Any]:
+        """Get a cache entry (from the in-process L1 when it holds the key)."""
+        if self.client is None:
+            return None
+
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+
+        try:
+            raw = await self.raw.get(f"cache:{key}")
+        except RedisError:
+            return None
+        # Only lookups that reached Redis count as L1 misses
+        self.l1.misses += 1
+        if raw is None:
+            self.redis_misses += 1
+            return None
+        self.redis_hits += 1
+        value = decode_value(raw)
+        self.l1.put(key, value)
+        return copy_value(value) if self.l1.max_size > 0 else value
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per cache tier."""
+        return {
+            "l1": {"hits": self.l1.hits, "misses": self.l1.misses},
+            "redis": {"hits": self.redis_hits, "misses": self.redis_misses},
+        }
+
+    def start_invalidation_listener(self) -> None:
+        """Evict L1 entries when any worker rewrites them (runs until ``close``)."""
+        if self.client is not None and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def _listen_for_invalidations(self) -> None:
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                # Anything cached before (re)subscribing may have missed its message
+                self.l1.clear()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self.l1.pop(message["data"])
+            except (RedisError, OSError):
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+
+    async def ping(self) -> bool:
+        """Check redis connection."""
+        if self.client is None:
+            return False
+        try:
+            return await self.client.ping()
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        """Release pooled connections (called on application shutdown)."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        for pool in (self.pool, self.raw_pool):
+            if pool is not None:
+                await pool.disconnect()
+
+#Global Redis instance
+redis_client = RedisClient()
+async_redis_client = AsyncRedisClient()
@@ -3,7 +3,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.routes import jobs, ai, analytics, kcse, scraper, auto, test
-from app.database import redis_client
+from app.database import async_redis_client
+from app.tasks.scrapping_tasks import scrape_scheduler
+from app.services.gemini_service import gemini_service
 
 app = FastAPI(
     title=settings.API_TITLE,
@@ -30,18 +32,35 @@ app.include_router(auto.router, prefix="/api")
 app.include_router(test.router, prefix="/api")
 
 
+@app.on_event("startup")
+async def start_background_tasks():
+    """Listen for cross-worker cache invalidations, find a Gemini model and keep scraped jobs fresh."""
+    async_redis_client.start_invalidation_listener()
+    gemini_service.start_initialization()
+    if settings.SCRAPER_SCHEDULE_ENABLED:
+        scrape_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def close_redis_pool():
+    """Stop background scraping and release pooled Redis connections."""
+    await scrape_scheduler.stop()
+    await async_redis_client.close()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
     return {
         "message": "PathFinder API",
         "version": settings.API_VERSION,
-        "redis_connected": redis_client.ping()
+        "redis_connected": await async_redis_client.ping()
     }
 @app.get("/health")
 async def health():
     """Health check with Redis status."""
     return {
         "status": "healthy",
-        "redis": "connected" if redis_client.ping() else "disconnected"
+        "redis": "connected" if await async_redis_client.ping() else "disconnected",
+        "cache": async_redis_client.cache_stats()
     }
\ No newline at end of file
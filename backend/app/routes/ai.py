@@ -18,7 +18,7 @@ router = APIRouter(prefix="/ai", tags=["ai"])
 async def get_recommendations(request: RecommendationRequest):
     """Get AI-powered career recommendations."""
     try:
-        recommendations = gemini_service.get_recommendations(
+        recommendations = await gemini_service.get_recommendations_async(
             skills=request.skills or [],
             experience=request.experience or "",
             interests=request.interests or [],
@@ -33,7 +33,7 @@ async def get_recommendations(request: RecommendationRequest):
 async def analyze_skills(request: SkillsAnalysisRequest):
     """Extract skills from text."""
     try:
-        result = gemini_service.analyze_skills(request.text)
+        result = await gemini_service.analyze_skills_async(request.text)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to analyze skills: {str(e)}")
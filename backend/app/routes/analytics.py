@@ -1,13 +1,36 @@
 """Analytics endpoints for market trends."""
 from fastapi import APIRouter, Query
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from app.schemas import DemandTrend, SalaryData, SkillData, CategoryData
-from app.services.cache_service import get_cache_key, get_cached_data, set_cached_data
+from app.services.cache_service import stale_while_revalidate
 from app.services.analytics_service import analytics_service
+from app.services.analytics_aggregates import analytics_aggregates
+from app.services.job_store import job_store
+from app.services.job_table import job_table, date_range_start
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+async def _get_aggregates(category: Optional[str], location: Optional[str],
+                          salaryMin: Optional[int], dateRange: Optional[str]) -> Dict[str, Any]:
+    """Analytics totals for the requested filters.
+
+    Unfiltered requests read the ingest-time totals; filtered ones are
+    computed with vectorized masks over the in-process job table.
+    """
+    if (not category or category == "all") and not location and not salaryMin:
+        since = date_range_start(dateRange)
+        oldest = await job_store.oldest_posted_date()
+        if since is None or oldest is None or oldest >= since:
+            # The date window covers every stored job
+            return await analytics_aggregates.read()
+
+    if not await job_store.sync(job_table):
+        return await analytics_aggregates.read()
+    mask = job_table.mask(category=category, location=location, salary_min=salaryMin, date_range=dateRange)
+    return job_table.aggregate(mask)
+
 @router.get("/demand", response_model=List[DemandTrend])
+@stale_while_revalidate("analytics_demand", soft_ttl=300)
 async def get_demand_trends(
     category: Optional[str] = Query("all"),
     location: Optional[str] = Query(None),
@@ -15,27 +38,11 @@ async def get_demand_trends(
     dateRange: Optional[str] = Query("last-year")
 ):
     """Get job demand trends from real scraped data."""
-    cache_key = get_cache_key("analytics_demand", {
-        "category": category,
-        "location": location,
-        "salaryMin": salaryMin,
-        "dateRange": dateRange
-    })
-    
-    cached = get_cached_data(cache_key)
-    if cached:
-        return cached
-    
-    # Get scraped jobs data
-    scraped_jobs = get_cached_data("scraped_jobs") or []
-    
-    # Generate analytics from real data
-    result = analytics_service.generate_demand_trends(scraped_jobs)
-    
-    set_cached_data(cache_key, result, ttl=300)
-    return result
+    aggregates = await _get_aggregates(category, location, salaryMin, dateRange)
+    return analytics_service.demand_trends_from_aggregates(aggregates)
 
 @router.get("/salary", response_model=List[SalaryData])
+@stale_while_revalidate("analytics_salary", soft_ttl=300)
 async def get_salary_data(
     category: Optional[str] = Query("all"),
     location: Optional[str] = Query(None),
@@ -43,27 +50,11 @@ async def get_salary_data(
     dateRange: Optional[str] = Query("last-year")
 ):
     """Get salary distribution from real scraped data."""
-    cache_key = get_cache_key("analytics_salary", {
-        "category": category,
-        "location": location,
-        "salaryMin": salaryMin,
-        "dateRange": dateRange
-    })
-    
-    cached = get_cached_data(cache_key)
-    if cached:
-        return cached
-    
-    # Get scraped jobs data
-    scraped_jobs = get_cached_data("scraped_jobs") or []
-    
-    # Generate analytics from real data
-    result = analytics_service.generate_salary_data(scraped_jobs)
-    
-    set_cached_data(cache_key, result, ttl=300)
-    return result
+    aggregates = await _get_aggregates(category, location, salaryMin, dateRange)
+    return analytics_service.salary_data_from_aggregates(aggregates)
 
 @router.get("/skills", response_model=List[SkillData])
+@stale_while_revalidate("analytics_skills", soft_ttl=300)
 async def get_skills(
     category: Optional[str] = Query("all"),
     location: Optional[str] = Query(None),
@@ -71,27 +62,11 @@ async def get_skills(
     dateRange: Optional[str] = Query("last-year")
 ):
     """Get top skills from real scraped data."""
-    cache_key = get_cache_key("analytics_skills", {
-        "category": category,
-        "location": location,
-        "salaryMin": salaryMin,
-        "dateRange": dateRange
-    })
-    
-    cached = get_cached_data(cache_key)
-    if cached:
-        return cached
-    
-    # Get scraped jobs data
-    scraped_jobs = get_cached_data("scraped_jobs") or []
-    
-    # Generate analytics from real data
-    result = analytics_service.generate_skills_data(scraped_jobs)
-    
-    set_cached_data(cache_key, result, ttl=300)
-    return result
+    aggregates = await _get_aggregates(category, location, salaryMin, dateRange)
+    return analytics_service.skills_data_from_aggregates(aggregates)
 
 @router.get("/categories", response_model=List[CategoryData])
+@stale_while_revalidate("analytics_categories", soft_ttl=300)
 async def get_categories(
     category: Optional[str] = Query("all"),
     location: Optional[str] = Query(None),
@@ -99,22 +74,5 @@ async def get_categories(
     dateRange: Optional[str] = Query("last-year")
 ):
     """Get category distribution from real scraped data."""
-    cache_key = get_cache_key("analytics_categories", {
-        "category": category,
-        "location": location,
-        "salaryMin": salaryMin,
-        "dateRange": dateRange
-    })
-    
-    cached = get_cached_data(cache_key)
-    if cached:
-        return cached
-    
-    # Get scraped jobs data
-    scraped_jobs = get_cached_data("scraped_jobs") or []
-    
-    # Generate analytics from real data
-    result = analytics_service.generate_categories_data(scraped_jobs)
-    
-    set_cached_data(cache_key, result, ttl=300)
-    return result
\ No newline at end of file
+    aggregates = await _get_aggregates(category, location, salaryMin, dateRange)
+    return analytics_service.categories_data_from_aggregates(aggregates)
\ No newline at end of file
@@ -1,8 +1,7 @@
 """Auto-scraping endpoint to ensure fresh data."""
 from fastapi import APIRouter
-from app.services.simple_job_scraper import simple_job_scraper
-from app.services.cache_service import get_cached_data, set_cached_data
-import asyncio
+from app.services.job_store import job_store
+from app.tasks.scrapping_tasks import scrape_scheduler
 
 router = APIRouter(prefix="/auto", tags=["auto"])
 
@@ -11,36 +10,31 @@ async def ensure_fresh_data():
     """Ensure we have fresh scraped data for analytics and dashboard."""
     try:
         # Check if we have recent scraped data
-        cached_jobs = get_cached_data("scraped_jobs")
+        cached_count = await job_store.count()
         
-        if not cached_jobs or len(cached_jobs) < 10:
-            # Scrape fresh data if cache is empty or has too few jobs
-            jobs = simple_job_scraper.scrape_all_jobs(max_jobs=30)
-            
-            if jobs:
-                # Cache for 1 hour
-                set_cached_data("scraped_jobs", jobs, ttl=3600)
-                
-                return {
-                    "status": "success",
-                    "message": "Fresh data scraped and cached",
-                    "jobs_count": len(jobs),
-                    "action": "scraped_new"
-                }
-            else:
-                return {
-                    "status": "warning", 
-                    "message": "Scraping failed, using fallback data",
-                    "jobs_count": 0,
-                    "action": "fallback"
-                }
-        else:
+        if cached_count < 10:
+            # Too few jobs: scrape in the background rather than inside this request
+            run = await scrape_scheduler.submit(max_jobs=30, trigger="ensure-fresh-data")
             return {
+                "status": "pending",
+                "message": "Fresh data is being scraped in the background",
+                "jobs_count": cached_count,
+                "action": "scrape_scheduled",
+                "run_id": run["run_id"],
+                "run_status": run["status"]
+            }
+        else:
+            response = {
                 "status": "success",
                 "message": "Using existing cached data",
-                "jobs_count": len(cached_jobs),
+                "jobs_count": cached_count,
                 "action": "used_cache"
             }
+            if await job_store.is_stale():
+                # Past its soft TTL: keep serving it while one background run refreshes it
+                run = await scrape_scheduler.submit(max_jobs=30, trigger="stale-cache")
+                response.update(action="refreshing_stale", run_id=run["run_id"], run_status=run["status"])
+            return response
             
     except Exception as e:
         return {
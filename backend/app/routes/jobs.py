@@ -5,6 +5,8 @@ from app.schemas import JobResponse
 from app.database import redis_client
 from app.services.cache_service import get_cache_key, get_cached_data, set_cached_data
 from app.services.job_scraper import job_scraper
+from app.services.job_store import job_store
+from app.services.search_index import search_index
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -42,30 +44,10 @@ MOCK_JOBS = [
     }
 ]
 
-@router.get("", response_model=List[JobResponse])
-async def get_jobs(
-    q: Optional[str] = Query(None, description="Search query"),
-    category: Optional[str] = Query(None),
-    location: Optional[str] = Query(None),
-    salary_min: Optional[int] = Query(None),
-    use_scraped: bool = Query(True, description="Use scraped jobs if available")
-):
-    """Get jobs with optional filters."""
-    cache_key = get_cache_key("jobs", {"q": q, "category": category, "location": location, "salary_min": salary_min, "scraped": use_scraped})
-    cached = get_cached_data(cache_key)
-    if cached:
-        return cached
-    
-    # Try to get scraped jobs first
-    jobs_data = MOCK_JOBS.copy()
-    
-    if use_scraped:
-        scraped_jobs = get_cached_data("scraped_jobs")
-        if scraped_jobs:
-            jobs_data = scraped_jobs
-    
-    # Filter jobs
-    filtered_jobs = jobs_data.copy()
+def _filter_jobs(jobs: List[dict], q: Optional[str] = None, category: Optional[str] = None,
+                 location: Optional[str] = None, salary_min: Optional[int] = None) -> List[dict]:
+    """Filter an in-memory job list (fallback when no corpus is stored)."""
+    filtered_jobs = list(jobs)
     
     if q:
         q_lower = q.lower()
@@ -81,23 +63,58 @@ async def get_jobs(
         filtered_jobs = [job for job in filtered_jobs if location.lower() in job["location"].lower()]
     
     if salary_min:
-        filtered_jobs = [job for job in filtered_jobs if job.get("salary", 0) >= salary_min]
+        filtered_jobs = [job for job in filtered_jobs if (job.get("salary_max") or job.get("salary") or 0) >= salary_min]
+    
+    return filtered_jobs
+
+@router.get("", response_model=List[JobResponse])
+async def get_jobs(
+    q: Optional[str] = Query(None, description="Search query"),
+    category: Optional[str] = Query(None),
+    location: Optional[str] = Query(None),
+    salary_min: Optional[int] = Query(None),
+    use_scraped: bool = Query(True, description="Use scraped jobs if available")
+):
+    """Get jobs with optional filters."""
+    cache_key = get_cache_key("jobs", {"q": q, "category": category, "location": location, "salary_min": salary_min, "scraped": use_scraped})
+    cached = await get_cached_data(cache_key)
+    if cached:
+        return cached
+    
+    stored_ids = None
+    if use_scraped and (category or location or salary_min or not q):
+        # Resolve category/location/salary filters against the job store indexes
+        stored_ids = await job_store.find_job_ids(category=category, location=location, salary_min=salary_min)
+
+    if use_scraped and q and await job_store.sync(search_index):
+        # Ranked full-text matches, narrowed to the filtered IDs
+        ranked_ids = [doc_id for doc_id, _ in search_index.search(q)]
+        if stored_ids is not None:
+            allowed = set(stored_ids)
+            ranked_ids = [doc_id for doc_id in ranked_ids if doc_id in allowed]
+        filtered_jobs = await job_store.get_jobs(ranked_ids, scrape_order=False)
+    elif stored_ids is not None:
+        filtered_jobs = await job_store.get_jobs(stored_ids)
+    else:
+        filtered_jobs = _filter_jobs(MOCK_JOBS, q, category, location, salary_min)
     
     # Cache result
-    set_cached_data(cache_key, filtered_jobs, ttl=300)
+    await set_cached_data(cache_key, filtered_jobs, ttl=300)
     
     return filtered_jobs
 
 @router.get("/search", response_model=List[JobResponse])
 async def search_jobs(q: str = Query(..., description="Search query")):
     """Search jobs by query."""
-    return await get_jobs(q=q)
+    return await get_jobs(q=q, category=None, location=None, salary_min=None, use_scraped=True)
 
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(job_id: int):
     """Get a single job by ID."""
-    job = next((j for j in MOCK_JOBS if j["id"] == job_id), None)
+    job = await job_store.get_job(job_id)
+    if not job:
+        job = next((j for j in MOCK_JOBS if j["id"] == job_id), None)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job    
\ No newline at end of file
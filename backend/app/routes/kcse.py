@@ -1,7 +1,16 @@
 """KCSE career guidance endpoints."""
-from fastapi import APIRouter, HTTPException
-from app.schemas import KCSECareerRequest, KCSECareerResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Iterator, Optional, Tuple
+from app.schemas import KCSECareerRequest, KCSECareerResponse, KCSEBulkStudent
 from app.services.kcse_service import kcse_service
+import csv
+import io
+import json
+
+# List columns in bulk CSV uploads separate their items with this
+CSV_LIST_SEPARATOR = ";"
 
 router = APIRouter(prefix="/kcse", tags=["kcse"])
 
@@ -9,7 +18,7 @@ router = APIRouter(prefix="/kcse", tags=["kcse"])
 async def get_ai_recommendations(request: KCSECareerRequest):
     """Get AI-powered course and university recommendations."""
     try:
-        recommendations = kcse_service.get_ai_recommendations(
+        recommendations = await kcse_service.get_ai_recommendations_async(
             cluster_points=request.cluster_points,
             interests=request.interests,
             preferred_subjects=request.preferred_subjects,
@@ -39,6 +48,72 @@ async def get_kcse_career_guidance(request: KCSECareerRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get career guidance: {str(e)}")
 
+@router.post("/bulk-career-guidance")
+async def bulk_career_guidance(file: UploadFile = File(...)):
+    """Career guidance for a whole class or county, streamed back as NDJSON.
+
+    Upload a CSV with ``cluster_points``, ``interests``, ``preferred_subjects``,
+    ``budget_range`` and optional ``student_id`` columns (list items separated
+    by ``;``), or an NDJSON file (``.ndjson``/``.jsonl``) of the same fields.
+    Each output line has the row number, the student's ID and budget, and
+    the ``/career-guidance`` fields, or an ``error`` for an invalid row.
+    """
+    try:
+        content = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Upload must be UTF-8 text")
+    is_ndjson = ((file.filename or "").lower().endswith((".ndjson", ".jsonl"))
+                 or "json" in (file.content_type or ""))
+    rows = list(_read_ndjson(content) if is_ndjson else _read_csv(content))
+
+    def results() -> Iterator[str]:
+        students = [student for _, student, _ in rows if student is not None]
+        recommendations = kcse_service.bulk_career_recommendations([student.model_dump() for student in students])
+        for row, student, error in rows:
+            if student is None:
+                yield json.dumps({"row": row, "error": error}) + "\n"
+                continue
+            result = next(recommendations)
+            yield json.dumps({
+                "row": row,
+                "student_id": student.student_id,
+                "budget_range": student.budget_range,
+                "eligible_careers": result["eligible"],
+                "related_careers": result["related"],
+                "alternative_paths": result["alternatives"]
+            }) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+def _read_csv(content: str) -> Iterator[Tuple[int, Optional[KCSEBulkStudent], Optional[str]]]:
+    for row, record in enumerate(csv.DictReader(io.StringIO(content)), start=1):
+        record = {key.strip(): (value or "").strip() for key, value in record.items() if key}
+        for field in ("interests", "preferred_subjects"):
+            record[field] = [item.strip() for item in record.get(field, "").split(CSV_LIST_SEPARATOR) if item.strip()]
+        for field in ("budget_range", "student_id"):
+            if not record.get(field):
+                record.pop(field, None)
+        yield _validate(row, record)
+
+def _read_ndjson(content: str) -> Iterator[Tuple[int, Optional[KCSEBulkStudent], Optional[str]]]:
+    row = 0
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        yield _validate(row, record)
+
+def _validate(row: int, record) -> Tuple[int, Optional[KCSEBulkStudent], Optional[str]]:
+    try:
+        return row, KCSEBulkStudent(**record), None
+    except (ValidationError, TypeError) as e:
+        return row, None, str(e)
+
 @router.get("/universities")
 async def get_universities():
     """Get list of universities and their requirements."""
@@ -1,7 +1,10 @@
 """Job scraping endpoints."""
 from fastapi import APIRouter, BackgroundTasks, HTTPException
+from app.config import settings
 from app.services.simple_job_scraper import simple_job_scraper
-from app.services.cache_service import get_cached_data, set_cached_data
+from app.services.cache_service import get_cached_entry
+from app.services.job_store import job_store
+from app.tasks.scrapping_tasks import scrape_scheduler
 from typing import List, Dict
 
 router = APIRouter(prefix="/scraper", tags=["scraper"])
@@ -10,48 +13,48 @@ router = APIRouter(prefix="/scraper", tags=["scraper"])
 async def scrape_jobs(background_tasks: BackgroundTasks, max_jobs: int = 30):
     """Scrape jobs from multiple sources with realistic fallback."""
     try:
-        # Check cache first
-        cached_jobs = get_cached_data("scraped_jobs")
+        # Check cache first; past the hour it is still served while one background run refreshes it
+        cached_jobs, stale = await get_cached_entry("scraped_jobs")
         if cached_jobs and len(cached_jobs) >= 10:
-            return {
+            response = {
                 "message": "Using cached jobs (scraped within last hour)",
                 "jobs_count": len(cached_jobs),
                 "jobs": cached_jobs,
                 "sources": list(set(job.get("source", "Unknown") for job in cached_jobs))
             }
+            if stale:
+                run = await scrape_scheduler.submit(max_jobs=max_jobs, trigger="stale-cache")
+                response.update(message="Using cached jobs while they are refreshed", run_id=run["run_id"],
+                                status=run["status"])
+            return response
         
-        # Scrape new jobs (with realistic fallback)
-        jobs = simple_job_scraper.scrape_all_jobs(max_jobs)
-        
-        if jobs:
-            # Cache for 1 hour
-            set_cached_data("scraped_jobs", jobs, ttl=3600)
-            
-            return {
-                "message": "Successfully scraped/generated jobs",
-                "jobs_count": len(jobs),
-                "jobs": jobs,
-                "sources": list(set(job.get("source", "Unknown") for job in jobs))
-            }
-        else:
-            # This shouldn't happen with the new scraper, but just in case
-            fallback_jobs = simple_job_scraper._generate_realistic_kenyan_jobs(max_jobs)
-            set_cached_data("scraped_jobs", fallback_jobs, ttl=3600)
-            
-            return {
-                "message": "Using generated realistic job data",
-                "jobs_count": len(fallback_jobs),
-                "jobs": fallback_jobs,
-                "sources": ["Generated (Kenyan Market)"]
-            }
+        # Scrape in the background; poll /scraper/runs/{run_id} for the outcome
+        run = await scrape_scheduler.submit(max_jobs=max_jobs)
+        jobs = cached_jobs or []
+        return {
+            "message": "Scraping started in the background",
+            "run_id": run["run_id"],
+            "status": run["status"],
+            "jobs_count": len(jobs),
+            "jobs": jobs,
+            "sources": list(set(job.get("source", "Unknown") for job in jobs))
+        }
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
+@router.get("/runs/{run_id}")
+async def get_scrape_run(run_id: str):
+    """Status of a background scrape run."""
+    run = await scrape_scheduler.get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Scrape run not found")
+    return run
+
 @router.get("/scraped-jobs")
 async def get_scraped_jobs():
     """Get previously scraped jobs from cache."""
-    cached_jobs = get_cached_data("scraped_jobs")
+    cached_jobs, _ = await get_cached_entry("scraped_jobs")
     
     if cached_jobs:
         return {
@@ -69,11 +72,14 @@ async def get_scraped_jobs():
 @router.get("/scraping-status")
 async def get_scraping_status():
     """Get status of job scraping."""
-    cached_jobs = get_cached_data("scraped_jobs")
+    cached_count = await job_store.count()
     
     return {
-        "has_cached_jobs": bool(cached_jobs),
-        "cached_jobs_count": len(cached_jobs) if cached_jobs else 0,
+        "has_cached_jobs": bool(cached_count),
+        "cached_jobs_count": cached_count,
         "supported_sites": ["Indeed Kenya", "Generated Kenyan Jobs"],
-        "cache_duration": "1 hour"
+        "cache_duration": "1 hour",
+        "crawl_stats": simple_job_scraper.last_crawl_stats,
+        "scheduled_refresh_seconds": scrape_scheduler.interval if settings.SCRAPER_SCHEDULE_ENABLED else None,
+        "last_run": next(reversed(scrape_scheduler.runs.values()), None)
     }
\ No newline at end of file
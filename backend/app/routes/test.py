@@ -8,6 +8,7 @@ router = APIRouter(prefix="/test", tags=["test"])
 @router.get("/gemini-status")
 async def check_gemini_status():
     """Check if Gemini API is properly configured."""
+    await gemini_service.initialize_async()
     return {
         "gemini_available": gemini_service.is_available(),
         "api_key_configured": bool(settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != "your_gemini_api_key_here"),
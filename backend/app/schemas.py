@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation"""
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
 # Job Schemas
 class JobResponse(BaseModel):
@@ -8,12 +8,15 @@ class JobResponse(BaseModel):
     title: str
     company: str
     salary: Optional[int] = None 
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
     location: str
     category: str
     description: Optional[str] = None
     skills: List[str] = []
     apply_url: Optional[str] = None
     source: Optional[str] = None
+    sources: List[str] = []
 
 #AI schemas
 class RecommendationRequest(BaseModel):
@@ -73,6 +76,10 @@ class KCSECareerRequest(BaseModel):
     preferred_subjects: Optional[List[str]] = []
     budget_range: Optional[str] = "medium"
 
+class KCSEBulkStudent(KCSECareerRequest):
+    """One student in a bulk career guidance upload."""
+    student_id: Optional[Union[int, str]] = None
+
 class CareerOption(BaseModel):
     name: str
     description: str
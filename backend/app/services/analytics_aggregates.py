@@ -0,0 +1,103 @@
+"""Running analytics totals maintained at ingest time."""
+from app.database import async_redis_client
+from redis.exceptions import RedisError
+from typing import List, Dict, Any, Optional
+from collections import Counter
+
+TOTAL_KEY = "analytics:agg:total"
+CATEGORY_COUNTS_KEY = "analytics:agg:category_counts"
+SALARY_SUMS_KEY = "analytics:agg:salary_sums"
+SALARY_COUNTS_KEY = "analytics:agg:salary_counts"
+SKILL_COUNTS_KEY = "analytics:agg:skill_counts"
+
+HASH_KEYS = (CATEGORY_COUNTS_KEY, SALARY_SUMS_KEY, SALARY_COUNTS_KEY, SKILL_COUNTS_KEY)
+
+
+def _job_deltas(jobs: List[Dict], sign: int) -> Dict[str, Counter]:
+    """Per-hash increments contributed by ``jobs`` (``sign`` -1 to retract them)."""
+    deltas = {key: Counter() for key in HASH_KEYS}
+    for job in jobs:
+        category = job.get("category") or "other"
+        deltas[CATEGORY_COUNTS_KEY][category] += sign
+        if job.get("salary"):
+            deltas[SALARY_SUMS_KEY][category] += sign * int(job["salary"])
+            deltas[SALARY_COUNTS_KEY][category] += sign
+        for skill in job.get("skills") or []:
+            deltas[SKILL_COUNTS_KEY][skill] += sign
+    return deltas
+
+
+class AnalyticsAggregates:
+    """Per-category salary sums/counts, category counts and skill counts.
+
+    Jobs are folded in once when they are stored and retracted when they
+    are removed, so analytics reads cost O(#categories + #skills) instead
+    of a rescan of every job.
+    """
+
+    def __init__(self, redis=async_redis_client):
+        self.redis = redis
+
+    def queue_reset(self, pipe) -> None:
+        """Queue deletion of all totals on ``pipe`` (before a full corpus rewrite)."""
+        pipe.delete(TOTAL_KEY, *HASH_KEYS)
+
+    def queue_update(self, pipe, added: Optional[List[Dict]] = None, removed: Optional[List[Dict]] = None,
+                     ttl: Optional[int] = None) -> None:
+        """Queue the increments for ``added`` and decrements for ``removed`` jobs on ``pipe``.
+
+        Queuing on the caller's pipeline keeps the totals in the same
+        transaction as the job writes they describe.
+        """
+        added, removed = added or [], removed or []
+        deltas = _job_deltas(added, 1)
+        for key, counter in _job_deltas(removed, -1).items():
+            deltas[key].update(counter)
+
+        for key, counter in deltas.items():
+            for field, amount in counter.items():
+                if amount:
+                    pipe.hincrby(key, field, amount)
+
+        net_total = len(added) - len(removed)
+        if net_total:
+            pipe.incrby(TOTAL_KEY, net_total)
+
+        if ttl:
+            for key in (TOTAL_KEY,) + HASH_KEYS:
+                pipe.expire(key, ttl)
+
+    async def read(self) -> Dict[str, Any]:
+        """Snapshot of the current totals (zeroed fields left by removals are dropped).
+
+        ``stored`` is the number of stored jobs; it equals ``total`` here,
+        but not for the filtered totals of ``JobTable.aggregate``.
+        """
+        empty = {"total": 0, "stored": 0, "category_counts": {}, "salary_sums": {}, "salary_counts": {}, "skill_counts": {}}
+        client = self.redis.client
+        if client is None:
+            return empty
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.get(TOTAL_KEY)
+            for key in HASH_KEYS:
+                pipe.hgetall(key)
+            total, categories, salary_sums, salary_counts, skills = await pipe.execute()
+        except RedisError:
+            return empty
+
+        def positive(values: Dict[str, str]) -> Dict[str, int]:
+            return {name: int(value) for name, value in values.items() if int(value) > 0}
+
+        return {
+            "total": int(total or 0),
+            "stored": int(total or 0),
+            "category_counts": positive(categories),
+            "salary_sums": positive(salary_sums),
+            "salary_counts": positive(salary_counts),
+            "skill_counts": positive(skills),
+        }
+
+
+analytics_aggregates = AnalyticsAggregates()
@@ -12,63 +12,105 @@ class AnalyticsService:
         if not jobs:
             return self._get_mock_demand_trends()
         
-        # Group jobs by month (simulate historical data)
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
-        base_count = len(jobs)
-        
-        trends = []
-        for i, month in enumerate(months):
-            # Simulate growth trend with some variation
-            variation = 0.8 + (i * 0.1) + (hash(month) % 20) / 100
-            job_count = int(base_count * variation)
-            trends.append({"month": month, "jobs": job_count})
-        
-        return trends
+        return self._demand_trends_for_total(len(jobs))
     
     def generate_salary_data(self, jobs: List[Dict]) -> List[Dict]:
         """Generate salary data by category from real jobs."""
         if not jobs:
             return self._get_mock_salary_data()
         
-        # Group jobs by category and calculate average salary
-        category_salaries = defaultdict(list)
+        # Group jobs by category and total their salaries
+        salary_sums = defaultdict(int)
+        salary_counts = defaultdict(int)
         
         for job in jobs:
-            if job.get("salary") and job.get("category"):
-                category_salaries[job["category"]].append(job["salary"])
+            if job.get("salary"):
+                category = job.get("category") or "other"
+                salary_sums[category] += job["salary"]
+                salary_counts[category] += 1
         
-        salary_data = []
-        for category, salaries in category_salaries.items():
-            if salaries:
-                avg_salary = int(sum(salaries) / len(salaries))
-                salary_data.append({
-                    "category": category.title(),
-                    "salary": avg_salary
-                })
-        
-        # If no salary data, use mock data
-        if not salary_data:
-            return self._get_mock_salary_data()
-        
-        return sorted(salary_data, key=lambda x: x["salary"], reverse=True)
+        return self._salary_data_from_totals(salary_sums, salary_counts) or self._get_mock_salary_data()
     
     def generate_skills_data(self, jobs: List[Dict]) -> List[Dict]:
         """Generate skills data from real jobs."""
         if not jobs:
             return self._get_mock_skills_data()
         
-        # Count all skills across jobs
-        all_skills = []
+        # Count skill frequency across jobs
+        skill_counts = Counter()
         for job in jobs:
             if job.get("skills"):
-                all_skills.extend(job["skills"])
+                skill_counts.update(job["skills"])
+        
+        return self._skills_data_from_counts(skill_counts) or self._get_mock_skills_data()
+    
+    def generate_categories_data(self, jobs: List[Dict]) -> List[Dict]:
+        """Generate category distribution from real jobs."""
+        if not jobs:
+            return self._get_mock_categories_data()
         
-        if not all_skills:
+        # Count jobs by category
+        category_counts = Counter(job.get("category") or "other" for job in jobs)
+        return self._categories_data_from_counts(category_counts, len(jobs))
+    
+    # Totals come from ``AnalyticsAggregates.read()`` or ``JobTable.aggregate``.
+    # Mock data stands in only while no jobs are stored at all; a filter
+    # matching none of them gives empty results.
+    def demand_trends_from_aggregates(self, aggregates: Dict[str, Any]) -> List[Dict]:
+        """Demand trends from analytics totals."""
+        if not aggregates["stored"]:
+            return self._get_mock_demand_trends()
+        if not aggregates["total"]:
+            return []
+        return self._demand_trends_for_total(aggregates["total"])
+    
+    def salary_data_from_aggregates(self, aggregates: Dict[str, Any]) -> List[Dict]:
+        """Average salary per category from analytics totals."""
+        if not aggregates["stored"]:
+            return self._get_mock_salary_data()
+        return self._salary_data_from_totals(aggregates["salary_sums"], aggregates["salary_counts"])
+    
+    def skills_data_from_aggregates(self, aggregates: Dict[str, Any]) -> List[Dict]:
+        """Top skills from analytics totals."""
+        if not aggregates["stored"]:
             return self._get_mock_skills_data()
+        return self._skills_data_from_counts(Counter(aggregates["skill_counts"]))
+    
+    def categories_data_from_aggregates(self, aggregates: Dict[str, Any]) -> List[Dict]:
+        """Category distribution from analytics totals."""
+        if not aggregates["stored"]:
+            return self._get_mock_categories_data()
+        return self._categories_data_from_counts(aggregates["category_counts"], aggregates["total"])
+    
+    def _demand_trends_for_total(self, base_count: int) -> List[Dict]:
+        """Simulated monthly trend scaled from the current job count."""
+        # Group jobs by month (simulate historical data)
+        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
         
-        # Count skill frequency
-        skill_counts = Counter(all_skills)
+        trends = []
+        for i, month in enumerate(months):
+            # Simulate growth trend with some variation
+            variation = 0.8 + (i * 0.1) + (hash(month) % 20) / 100
+            job_count = int(base_count * variation)
+            trends.append({"month": month, "jobs": job_count})
         
+        return trends
+    
+    def _salary_data_from_totals(self, salary_sums: Dict[str, int], salary_counts: Dict[str, int]) -> List[Dict]:
+        """Average salary per category from per-category sums and counts."""
+        salary_data = []
+        for category, total in salary_sums.items():
+            count = salary_counts.get(category, 0)
+            if count:
+                salary_data.append({
+                    "category": category.title(),
+                    "salary": int(total / count)
+                })
+        
+        return sorted(salary_data, key=lambda x: x["salary"], reverse=True)
+    
+    def _skills_data_from_counts(self, skill_counts: Counter) -> List[Dict]:
+        """Top 10 skills from skill frequencies."""
         skills_data = []
         for skill, count in skill_counts.most_common(10):
             # Determine trend (mock logic)
@@ -81,15 +123,8 @@ class AnalyticsService:
         
         return skills_data
     
-    def generate_categories_data(self, jobs: List[Dict]) -> List[Dict]:
-        """Generate category distribution from real jobs."""
-        if not jobs:
-            return self._get_mock_categories_data()
-        
-        # Count jobs by category
-        category_counts = Counter(job.get("category", "other") for job in jobs)
-        total_jobs = len(jobs)
-        
+    def _categories_data_from_counts(self, category_counts: Dict[str, int], total_jobs: int) -> List[Dict]:
+        """Category shares from per-category counts."""
         categories_data = []
         for category, count in category_counts.items():
             percentage = round((count / total_jobs) * 100, 1)
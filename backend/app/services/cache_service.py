@@ -1,8 +1,20 @@
 """Cache service for temporary data storage."""
-from app.database import redis_client
-from typing import Optional, Any
+from app.config import settings
+from app.database import async_redis_client
+from redis.exceptions import RedisError
+from typing import Optional, Any, Awaitable, Callable, Dict, Tuple
+import asyncio
+import functools
 import hashlib
+import inspect
 import json
+import time
+import uuid
+
+LOCK_KEY = "lock:{}"
+
+# Refreshes running in this process, by cache key (single-flight)
+_inflight: Dict[str, asyncio.Task] = {}
 
 
 def get_cache_key(prefix: str, params: dict) -> str:
@@ -11,10 +23,141 @@ def get_cache_key(prefix: str, params: dict) -> str:
     params_hash = hashlib.md5(params_str.encode()).hexdigest()
     return f"{prefix}:{params_hash}"
 
-def get_cached_data(key: str) -> Optional[Any]:
+async def get_cached_data(key: str) -> Optional[Any]:
     """Get cached data"""
-    return redis_client.get_cache(key)
+    return await async_redis_client.get_cache(key)
 
-def set_cached_data(key: str, data: Any, ttl: int = 300) -> bool:
+async def set_cached_data(key: str, data: Any, ttl: int = 300) -> bool:
     """Set cached data with TTL (default 5 minutes)."""
-    return redis_client.set_cache(key, data, ttl)        
\ No newline at end of file
+    return await async_redis_client.set_cache(key, data, ttl)
+
+
+async def get_cached_entry(key: str) -> Tuple[Optional[Any], bool]:
+    """Get a stale-while-revalidate entry as ``(data, stale)``; ``(None, True)`` on a miss."""
+    entry = await async_redis_client.get_cache(key)
+    if not isinstance(entry, dict) or "fresh_until" not in entry:
+        return None, True
+    return entry["data"], time.time() >= entry["fresh_until"]
+
+async def set_cached_entry(key: str, data: Any, soft_ttl: int = 300, hard_ttl: Optional[int] = None) -> bool:
+    """Cache data as fresh for ``soft_ttl`` seconds and servable (stale) until ``hard_ttl``.
+
+    ``hard_ttl`` defaults to ``soft_ttl`` plus ``CACHE_STALE_TTL``.
+    """
+    hard_ttl = hard_ttl or soft_ttl + settings.CACHE_STALE_TTL
+    entry = {"fresh_until": time.time() + soft_ttl, "data": data}
+    return await async_redis_client.set_cache(key, entry, max(hard_ttl, soft_ttl))
+
+
+async def _acquire_lock(key: str, token: str, timeout: int) -> bool:
+    """Take the cross-worker refresh lock for ``key`` (always granted without Redis)."""
+    if async_redis_client.client is None:
+        return True
+    try:
+        return bool(await async_redis_client.client.set(LOCK_KEY.format(key), token, nx=True, ex=timeout))
+    except RedisError:
+        return True
+
+async def _release_lock(key: str, token: str) -> None:
+    if async_redis_client.client is None:
+        return
+    try:
+        if await async_redis_client.client.get(LOCK_KEY.format(key)) == token:
+            await async_redis_client.client.delete(LOCK_KEY.format(key))
+    except RedisError:
+        pass
+
+async def _lock_held(key: str) -> bool:
+    """Whether some worker holds the refresh lock for ``key`` (assumed so if Redis errors)."""
+    if async_redis_client.client is None:
+        return False
+    try:
+        return bool(await async_redis_client.client.exists(LOCK_KEY.format(key)))
+    except RedisError:
+        return True
+
+async def _refresh(key: str, loader: Callable[[], Awaitable[Any]], soft_ttl: int, hard_ttl: Optional[int],
+                   lock_timeout: int, wait: bool) -> Optional[Any]:
+    """Rebuild ``key`` if no other worker is already doing so.
+
+    When another worker holds the lock and ``wait`` is set (nothing cached
+    to serve), poll for its result until the lock times out, then load
+    anyway rather than fail the request. If the lock is released with
+    nothing cached (the holder's loader returned None), share that None
+    instead of waiting out the timeout.
+    """
+    token = uuid.uuid4().hex
+    if not await _acquire_lock(key, token, lock_timeout):
+        if not wait:
+            return None
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            data, _ = await get_cached_entry(key)
+            if data is not None:
+                return data
+            if not await _lock_held(key):
+                # The holder may have cached its result just before releasing
+                data, _ = await get_cached_entry(key)
+                return data
+        token = None
+
+    try:
+        data = await loader()
+        if data is not None:
+            await set_cached_entry(key, data, soft_ttl, hard_ttl)
+        return data
+    finally:
+        if token is not None:
+            await _release_lock(key, token)
+
+def _refreshed(key: str, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Cache refresh failed for {key}: {task.exception()}")
+
+async def get_or_refresh(key: str, loader: Callable[[], Awaitable[Any]], soft_ttl: int = 300,
+                         hard_ttl: Optional[int] = None, lock_timeout: Optional[int] = None) -> Any:
+    """Cached data for ``key``, calling ``loader`` to (re)build it at most once at a time.
+
+    Fresh entries are returned as they are. Stale ones (past ``soft_ttl``
+    but not ``hard_ttl``) are returned immediately while one background
+    task refreshes them. On a miss the caller waits for the rebuild.
+    Concurrent callers in this process share one task per key, and a Redis
+    lock keeps other workers from rebuilding the same key at the same time.
+    """
+    lock_timeout = lock_timeout or settings.CACHE_LOCK_TIMEOUT
+    data, stale = await get_cached_entry(key)
+    if data is not None and not stale:
+        return data
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_refresh(key, loader, soft_ttl, hard_ttl, lock_timeout, wait=data is None))
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_refreshed, key))
+
+    if data is not None:
+        return data
+    return await asyncio.shield(task)
+
+
+def stale_while_revalidate(prefix: str, soft_ttl: int = 300, hard_ttl: Optional[int] = None,
+                           lock_timeout: Optional[int] = None):
+    """Decorator caching an async function's result with ``get_or_refresh``.
+
+    The cache key is ``prefix`` plus a hash of the call's arguments (by
+    name, defaults applied), so they must be JSON-serializable.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = get_cache_key(prefix, dict(bound.arguments))
+            return await get_or_refresh(key, lambda: func(*args, **kwargs), soft_ttl, hard_ttl, lock_timeout)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,219 @@
+"""Compiled, memory-mapped KCSE career and university catalogue."""
+from typing import Any, Dict, Optional, Tuple
+from pathlib import Path
+import copy
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import numpy as np
+from app.config import settings
+from app.database import decode_value, encode_value
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_SOURCE_PATH = DATA_DIR / "kcse_catalogue.json"
+DEFAULT_COMPILED_PATH = DATA_DIR / "kcse_catalogue.bin"
+
+MAGIC = b"PFKCSECT"
+FORMAT_VERSION = 1
+# Magic, format version, header length
+PREAMBLE = struct.Struct("<8sII")
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _columns(source: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Numeric columns of the catalogue, in source order (courses flattened university by university)."""
+    course_cutoffs, course_universities = [], []
+    for university, data in enumerate(source["universities"].values()):
+        for course in data.get("courses", {}).values():
+            course_cutoffs.append(course["cluster_points"])
+            course_universities.append(university)
+    return {
+        "career_cutoffs": np.array([c["cluster_points"] for c in source["careers"].values()], dtype=np.float64),
+        "course_cutoffs": np.array(course_cutoffs, dtype=np.float64),
+        "course_universities": np.array(course_universities, dtype=np.int32),
+    }
+
+
+def compile_catalogue(source_path: Optional[str] = None, output_path: Optional[str] = None) -> str:
+    """Compile the JSON source catalogue into the binary format; returns its version.
+
+    Layout: a fixed preamble (magic, format version, header length), a JSON
+    header describing every section, the numeric columns as aligned raw
+    arrays, and the records (careers and universities) in the cache codec
+    format. The file is written next to its destination and renamed into
+    place, so readers never see a partial file, and workers still mapping
+    the old one keep a consistent view until they reload.
+    """
+    source_path = Path(source_path or settings.KCSE_CATALOGUE_SOURCE or DEFAULT_SOURCE_PATH)
+    output_path = Path(output_path or settings.KCSE_CATALOGUE_PATH or DEFAULT_COMPILED_PATH)
+    raw = source_path.read_bytes()
+    source = json.loads(raw)
+    digest = hashlib.sha256(raw).hexdigest()
+    version = str(source.get("version") or digest[:12])
+
+    columns = _columns(source)
+    records = encode_value({"careers": source["careers"], "universities": source["universities"]})
+
+    # Section offsets are relative to the end of the header (the data start)
+    sections, offset = {}, 0
+    for name, array in columns.items():
+        sections[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({
+        "version": version,
+        "source_sha256": digest,
+        "compiled_at": time.time(),
+        "arrays": sections,
+        "records": {"offset": offset, "length": len(records)},
+    }).encode()
+    data_start = _align(PREAMBLE.size + len(header))
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=output_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for name, array in columns.items():
+                f.seek(data_start + sections[name]["offset"])
+                f.write(array.tobytes())
+            f.seek(data_start + offset)
+            f.write(records)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return version
+
+
+class Catalogue:
+    """Read-only view of a compiled catalogue file.
+
+    The file is memory-mapped read-only: the numeric ``arrays`` are NumPy
+    views straight onto the mapping, so every worker on the machine shares
+    the same page-cache copy of them. ``careers`` and ``universities`` are
+    decoded once per load; callers must not mutate them (public accessors
+    hand out copies).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity: Tuple[int, int] = (stat.st_ino, stat.st_mtime_ns)
+
+        magic, format_version, header_length = PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a format {FORMAT_VERSION} catalogue")
+        header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_length])
+        data_start = _align(PREAMBLE.size + header_length)
+
+        self.version: str = header["version"]
+        self.source_sha256: str = header["source_sha256"]
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, section in header["arrays"].items():
+            dtype = np.dtype(section["dtype"])
+            count = int(np.prod(section["shape"]))
+            self.arrays[name] = np.frombuffer(self._map, dtype=dtype, count=count,
+                                              offset=data_start + section["offset"]).reshape(section["shape"])
+
+        start = data_start + header["records"]["offset"]
+        records = decode_value(self._map[start:start + header["records"]["length"]])
+        self.careers: Dict[str, Dict[str, Any]] = records["careers"]
+        self.universities: Dict[str, Dict[str, Any]] = records["universities"]
+
+    def university(self, name: str) -> Dict[str, Any]:
+        """A copy of one university's record ({} if unknown)."""
+        return copy.deepcopy(self.universities.get(name, {}))
+
+
+class CatalogueStore:
+    """Process-wide access to the current catalogue, with hot reload.
+
+    ``current()`` re-checks the compiled file at most every
+    ``KCSE_CATALOGUE_CHECK_INTERVAL`` seconds. When the JSON source is newer
+    than the compiled file, it is recompiled first. When the compiled file
+    has been replaced (by this or any other worker, or by
+    ``scripts/compile_catalogue.py``), the new file is mapped and returned, so
+    updated KUCCPS cutoffs apply without a restart. Services rebuild what
+    they derive from it when ``current()`` returns a different ``Catalogue``.
+
+    Deployments compile the file at build time (``scripts/compile_catalogue.py``)
+    or point ``KCSE_CATALOGUE_PATH`` at a writable location. If the compiled
+    path cannot be written (a read-only image), the catalogue is compiled
+    into the temp directory instead and served from there.
+    """
+
+    def __init__(self, source_path: Optional[str] = None, compiled_path: Optional[str] = None,
+                 check_interval: Optional[float] = None):
+        self.source_path = Path(source_path or settings.KCSE_CATALOGUE_SOURCE or DEFAULT_SOURCE_PATH)
+        self.compiled_path = Path(compiled_path or settings.KCSE_CATALOGUE_PATH or DEFAULT_COMPILED_PATH)
+        self.check_interval = settings.KCSE_CATALOGUE_CHECK_INTERVAL if check_interval is None else check_interval
+        self._catalogue: Optional[Catalogue] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Catalogue:
+        """The latest compiled catalogue."""
+        if self._catalogue is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._catalogue
+        with self._lock:
+            if self._catalogue is None or time.monotonic() - self._checked_at >= self.check_interval:
+                self._refresh()
+        return self._catalogue
+
+    def _refresh(self) -> None:
+        self._checked_at = time.monotonic()
+        try:
+            if self._stale():
+                self._compile()
+            stat = os.stat(self.compiled_path)
+        except OSError as e:
+            if self._catalogue is None:
+                raise
+            print(f"Keeping catalogue {self._catalogue.version}: {e}")
+            return
+
+        if self._catalogue is None or self._catalogue.identity != (stat.st_ino, stat.st_mtime_ns):
+            self._catalogue = Catalogue(self.compiled_path)
+            print(f"Loaded KCSE catalogue {self._catalogue.version} from {self.compiled_path}")
+
+    def _compile(self) -> None:
+        try:
+            compile_catalogue(str(self.source_path), str(self.compiled_path))
+        except OSError as e:
+            fallback = self._fallback_path()
+            if self.compiled_path == fallback:
+                raise
+            print(f"Cannot write catalogue to {self.compiled_path} ({e}); using {fallback}")
+            self.compiled_path = fallback
+            if self._stale():
+                compile_catalogue(str(self.source_path), str(self.compiled_path))
+
+    def _fallback_path(self) -> Path:
+        """Per-source compiled path in the temp directory, shared by the workers on the machine."""
+        key = hashlib.sha256(str(self.source_path.resolve()).encode()).hexdigest()[:12]
+        return Path(tempfile.gettempdir()) / f"pathfinder-kcse_catalogue-{key}.bin"
+
+    def _stale(self) -> bool:
+        """Whether the source exists and is newer than the compiled file."""
+        if not self.source_path.exists():
+            return False
+        if not self.compiled_path.exists():
+            return True
+        return self.source_path.stat().st_mtime_ns > self.compiled_path.stat().st_mtime_ns
+
+
+kcse_catalogue = CatalogueStore()
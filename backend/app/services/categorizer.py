@@ -0,0 +1,177 @@
+"""Keyword-scored job categorization with one regular expression compiled at import."""
+from typing import List, Dict, Optional, Sequence, Tuple, Any
+import re
+import numpy as np
+
+# Category -> keywords. Words and phrases match whole words, plurals included
+# ("nurse" -> "nurses", not "nursery"); a trailing "*" marks a stem, which
+# also matches longer words ("engineer*" -> "engineering"); all-caps acronyms
+# match exactly and case-sensitively ("IT", not the pronoun "it"). Order
+# breaks score ties.
+CATEGORY_KEYWORDS = {
+    "tech": ["developer", "programmer", "software", "IT", "ICT", "computer", "data", "analyst", "engineer*",
+             "devops", "network administrator", "web", "website", "cyber*"],
+    "finance": ["accountant", "finance", "banking", "audit*", "financial", "economist", "accounts", "tax",
+                "taxation", "credit", "actuar*"],
+    "sales": ["sales", "marketing", "business development", "account manager", "brand*", "merchandis*"],
+    "education": ["teacher", "lecturer", "instructor", "education*", "academic", "tutor*", "trainer"],
+    "healthcare": ["nurse", "nursing", "doctor", "medical", "health*", "clinic*", "pharmac*", "laborator*",
+                   "midwi*"],
+    "hospitality": ["hotel", "restaurant", "chef", "waiter", "hospitality", "tourism", "housekeep*", "barista"],
+    "agriculture": ["agricultur*", "farm*", "livestock", "crop", "agronom*", "veterinar*", "horticultur*"],
+    "engineering": ["engineer*", "civil", "mechanical", "electrical", "construction", "technician", "surveyor"],
+    "logistics": ["logistics", "transport*", "driver", "delivery", "supply chain", "warehous*", "procurement",
+                  "fleet"],
+    "customer_service": ["customer service", "customer care", "support", "receptionist", "call center",
+                         "call centre"],
+    "management": ["manager", "director", "supervisor", "coordinator", "lead", "leader", "head of"],
+}
+
+TITLE_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Joins the texts of a batch: not a word character or whitespace, so no match spans two texts
+_SEPARATOR = "\x00"
+
+
+def _keyword_path(keyword: str) -> Tuple[str, str]:
+    """Split a keyword (see ``CATEGORY_KEYWORDS``) into its literal text and the regex that ends it."""
+    if keyword.endswith("*"):
+        return keyword[:-1].lower(), r"\w*"
+    if keyword.isupper():
+        return keyword.lower(), r"\b"
+    # Plurals: -s/-es, or -y -> -ies
+    if keyword.endswith("y"):
+        return keyword[:-1].lower(), r"(?:y|ies)\b"
+    return keyword.lower(), r"(?:e?s)?\b"
+
+
+def _trie_pattern(node: Dict[str, Any], markers: List[str]) -> str:
+    """Regex for a keyword trie; each keyword ends in an empty marker group, numbered in ``markers``."""
+    branches = [(r"\s+" if char == " " else re.escape(char)) + _trie_pattern(child, markers)
+                for char, child in node.items() if char != ""]
+    # Continuations come first, so the longest keyword wins
+    for keyword, ending in node.get("", []):
+        markers.append(keyword)
+        branches.append(ending + "()")
+    return branches[0] if len(branches) == 1 else "(?:%s)" % "|".join(branches)
+
+
+class JobCategorizer:
+    """Scores every category in one regex pass over a job's text.
+
+    All keywords are compiled at construction into a single regex,
+    anchored at word starts and shaped as a trie so each word is only
+    matched against the keywords sharing its first letters, and run over
+    the lowercased text. Every keyword ends in its own empty marker group, so a match's
+    ``lastindex`` names the categories it scores; acronym matches are kept
+    only when their case matches too. Each hit adds its weight (title hits
+    count ``TITLE_WEIGHT``, description hits ``DESCRIPTION_WEIGHT``) to
+    those categories, and the highest score wins rather than the first
+    category that matched at all.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]] = CATEGORY_KEYWORDS):
+        self.categories = list(categories)
+        keyword_columns: Dict[str, List[int]] = {}
+        for column, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                keyword_columns.setdefault(keyword, []).append(column)
+
+        trie: Dict[str, Any] = {}
+        for keyword in keyword_columns:
+            text, ending = _keyword_path(keyword)
+            node = trie
+            for char in text:
+                node = node.setdefault(char, {})
+            node.setdefault("", []).append((keyword, ending))
+        markers: List[str] = []
+        # Matched against lowercased text (cheaper than a case-insensitive regex)
+        self.pattern = re.compile(r"\b" + _trie_pattern(trie, markers))
+        self._pattern_ignorecase = re.compile(self.pattern.pattern, re.IGNORECASE)
+
+        # Group number -> columns it scores (as tuples, and -1 padded for the batch path)
+        self._group_columns: List[Tuple[int, ...]] = [()] + [tuple(keyword_columns[keyword]) for keyword in markers]
+        self._columns = np.full((len(markers) + 1, max(map(len, self._group_columns))), -1, dtype=np.int64)
+        for group, group_columns in enumerate(self._group_columns):
+            self._columns[group, :len(group_columns)] = group_columns
+        # Group number -> exact text of acronym groups
+        self._acronyms: Dict[int, str] = {group: keyword for group, keyword in enumerate(markers, 1)
+                                          if keyword.isupper()}
+
+    def _hits(self, text: str) -> List[Tuple[int, int]]:
+        """``(group, offset)`` of every keyword match in ``text``."""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self.pattern.finditer(lowered)
+        else:
+            # A few characters lowercase to two, which would shift the match offsets
+            matches = self._pattern_ignorecase.finditer(text)
+        acronyms = self._acronyms
+        return [(match.lastindex, match.start()) for match in matches
+                if match.lastindex not in acronyms or text[match.start():match.end()] == acronyms[match.lastindex]]
+
+    def _cells(self, texts: Sequence[Optional[str]]) -> np.ndarray:
+        """Flat ``row * n_categories + column`` index of every keyword hit in ``texts``."""
+        texts = [(text or "").replace(_SEPARATOR, " ") for text in texts]
+        hits = self._hits(_SEPARATOR.join(texts))
+        if not hits:
+            return np.zeros(0, dtype=np.int64)
+
+        groups, offsets = np.array(hits, dtype=np.int64).T
+        starts = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        rows = np.searchsorted(starts, offsets, side="right") - 1
+        columns = self._columns[groups]
+        cells = rows[:, None] * len(self.categories) + columns
+        return cells[columns >= 0]
+
+    def scores(self, title: str, description: str = "") -> Dict[str, float]:
+        """Score per matching category."""
+        totals = [0.0] * len(self.categories)
+        for text, weight in ((title, TITLE_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+            for group, _ in self._hits(text or ""):
+                for column in self._group_columns[group]:
+                    totals[column] += weight
+        return {category: total for category, total in zip(self.categories, totals) if total}
+
+    def categorize(self, title: str, description: str = "") -> str:
+        """Best-scoring category for one job, or ``"other"`` (ties go to the earlier category)."""
+        scores = self.scores(title, description)
+        if not scores:
+            return "other"
+        best = max(scores.values())
+        return next(category for category, total in scores.items() if total == best)
+
+    def categorize_batch(self, titles: Sequence[str], descriptions: Optional[Sequence[str]] = None) -> List[str]:
+        """Best-scoring category per job for a whole list at once.
+
+        The titles (and descriptions) are joined and scanned in one regex pass,
+        and the hits summed with ``np.bincount`` into an
+        (n_jobs, n_categories) score matrix whose row-wise argmax is the
+        answer.
+        """
+        n, width = len(titles), len(self.categories)
+        scores = np.zeros(n * width)
+        fields = [(titles, TITLE_WEIGHT)]
+        if descriptions is not None:
+            fields.append((descriptions, DESCRIPTION_WEIGHT))
+
+        for texts, weight in fields:
+            cells = self._cells(texts)
+            if len(cells):
+                scores += weight * np.bincount(cells, minlength=n * width)
+
+        scores = scores.reshape(n, width)
+        best = scores.argmax(axis=1)
+        matched = scores[np.arange(n), best] > 0
+        return [self.categories[column] if hit else "other" for column, hit in zip(best.tolist(), matched.tolist())]
+
+    def categorize_jobs(self, jobs: List[Dict]) -> None:
+        """Set ``category`` on each job from its title and description, in one batch."""
+        categories = self.categorize_batch([job.get("title", "") for job in jobs],
+                                           [job.get("description", "") for job in jobs])
+        for job, category in zip(jobs, categories):
+            job["category"] = category
+
+
+job_categorizer = JobCategorizer()
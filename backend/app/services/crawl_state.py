@@ -0,0 +1,62 @@
+"""What earlier crawls already fetched, so refreshes only pay for what changed."""
+from app.database import async_redis_client
+from app.services.job_store import job_store
+from redis.exceptions import RedisError
+from typing import List, Dict
+import json
+
+VALIDATORS_KEY = "scraper:validators"
+
+
+class CrawlState:
+    """Listing-page validators and ingested-job fingerprints for incremental scrapes.
+
+    Each listing page's ``ETag``/``Last-Modified`` (and the pagination links
+    found on it) are kept so the next crawl can send a conditional GET and
+    skip the page on a 304. Cards are fingerprinted before extraction and
+    checked against the fingerprints of jobs already in the job store, so
+    only new cards are parsed. Both expire with the stored corpus, which
+    makes the first crawl after expiry a full one.
+    """
+
+    def __init__(self, redis=async_redis_client, store=job_store, ttl: int = 3600):
+        self.redis = redis
+        self.store = store
+        self.ttl = ttl
+
+    async def validators(self, urls: List[str]) -> Dict[str, Dict]:
+        """Stored validators for the given page URLs (missing pages are omitted)."""
+        client = self.redis.client
+        if client is None or not urls:
+            return {}
+
+        # Validators are only useful while the jobs from those pages are stored
+        if not await self.store.count():
+            return {}
+
+        try:
+            rows = await client.hmget(VALIDATORS_KEY, urls)
+        except RedisError:
+            return {}
+        return {url: json.loads(row) for url, row in zip(urls, rows) if row}
+
+    async def save_validators(self, pages: Dict[str, Dict]) -> None:
+        """Remember validators (``etag``, ``last_modified``, ``next``) per page URL."""
+        client = self.redis.client
+        if client is None or not pages:
+            return
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(VALIDATORS_KEY, mapping={url: json.dumps(page) for url, page in pages.items()})
+            pipe.expire(VALIDATORS_KEY, self.ttl)
+            await pipe.execute()
+        except RedisError as e:
+            print(f"Could not save crawl validators: {e}")
+
+    async def known(self, fingerprints: List[str]) -> List[bool]:
+        """Whether each card fingerprint belongs to a job that is already stored."""
+        return await self.store.known_fingerprints(fingerprints)
+
+
+crawl_state = CrawlState()
@@ -0,0 +1,191 @@
+"""Paginated crawler shared by the job scrapers."""
+from typing import List, Dict, Optional, Any, Callable, Tuple
+from urllib.parse import urljoin
+import asyncio
+import hashlib
+import time
+import httpx
+from app.services.rate_limiter import HostRateLimiter
+from app.services.crawl_state import CrawlState
+from app.services.html_parser import ParserBackend
+
+DEFAULT_NEXT_SELECTORS = ['a[rel="next"]', 'li.next a', 'a.next', '.pagination a.next']
+DEFAULT_DETAIL_SELECTORS = ['.job-description', '.description', '#jobDescriptionText', 'article', 'main', 'body']
+
+
+async def fetch_page(client: httpx.AsyncClient, limiter: HostRateLimiter, url: str,
+                     validators: Optional[Dict[str, Any]] = None) -> Optional[httpx.Response]:
+    """GET a page under the host's limits, returning None on any failure.
+
+    With stored ``validators`` the request is conditional, and an unchanged
+    page comes back as a bodiless 304 response.
+    """
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    async with limiter.limit(url):
+        try:
+            response = await client.get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except httpx.HTTPError as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+
+def card_link(parser: ParserBackend, page_url: str, card: Any) -> Optional[str]:
+    """Absolute URL of the card's first link (normally the job-detail page)."""
+    link = parser.select_one(card, 'a[href]')
+    return urljoin(page_url, parser.attr(link, "href")) if link is not None else None
+
+
+def card_fingerprint(parser: ParserBackend, card: Any, link: Optional[str]) -> str:
+    """Cheap identity for a listing card: its job link, else a hash of its text."""
+    return link or hashlib.sha1(parser.text(card).encode("utf-8")).hexdigest()
+
+
+def job_id(key: str) -> int:
+    """Stable job ID for a listing key, the same in every worker and across restarts.
+
+    52 bits of the key's SHA-1, so IDs stay exact as JavaScript numbers.
+    """
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:13], 16)
+
+
+def crawl_rates(pages: int, jobs: int, seconds: float) -> Dict[str, Any]:
+    """Per-source crawl throughput summary."""
+    seconds = max(seconds, 1e-6)
+    return {
+        "pages": pages,
+        "jobs": jobs,
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(pages / seconds, 2),
+        "jobs_per_sec": round(jobs / seconds, 2),
+    }
+
+
+async def crawl_source(
+    client: httpx.AsyncClient,
+    limiter: HostRateLimiter,
+    source: Dict[str, Any],
+    parser: ParserBackend,
+    extract: Callable[[Any], Optional[Dict]],
+    max_jobs: int,
+    max_pages: int = 1,
+    enrich: Optional[Callable[[Dict, str], None]] = None,
+    state: Optional[CrawlState] = None,
+) -> Tuple[List[Dict], Dict[str, Any]]:
+    """Crawl one source's listing pages, then optionally its job-detail pages.
+
+    ``source`` provides ``url``, ``cards`` (CSS selectors tried in order) and
+    optionally ``page_url`` (template for page N, fetched up front and
+    concurrently) and ``next`` selectors for discovered pagination links.
+    Pages are parsed with ``parser`` and each card node passed to ``extract``.
+    Up to ``max_pages`` listing pages are visited. When ``enrich`` is given,
+    each job's detail link is fetched and ``enrich(job, detail_text)`` called.
+
+    With a ``state`` (see ``CrawlState``) the crawl is incremental: listing
+    pages are fetched conditionally, and cards whose fingerprint is already
+    stored are skipped before extraction. Each returned job carries its
+    card's ``fingerprint`` and an ``id`` derived from it (see ``job_id``).
+
+    Returns the new jobs and a throughput summary for the source.
+    """
+    started = time.monotonic()
+    pages_fetched = 0
+    not_modified = 0
+    skipped = 0
+    jobs: List[Dict] = []
+    detail_links: List[Optional[str]] = []
+    page_validators: Dict[str, Dict[str, Any]] = {}
+
+    frontier = [source["url"]]
+    if source.get("page_url"):
+        frontier += [source["page_url"].format(page=page) for page in range(2, max_pages + 1)]
+    seen = set(frontier)
+
+    while frontier and pages_fetched < max_pages and len(jobs) < max_jobs:
+        batch, frontier = frontier[:max_pages - pages_fetched], frontier[max_pages - pages_fetched:]
+        stored = await state.validators(batch) if state else {}
+        responses = await asyncio.gather(
+            *(fetch_page(client, limiter, url, stored.get(url)) for url in batch))
+
+        for url, response in zip(batch, responses):
+            if response is None:
+                continue
+            pages_fetched += 1
+
+            if response.status_code == 304:
+                # Unchanged since the last crawl: its jobs are already stored
+                not_modified += 1
+                next_links = stored.get(url, {}).get("next", [])
+            else:
+                root = parser.parse(response.content)
+                cards = parser.select_any(root, source["cards"])
+                links = [card_link(parser, url, card) for card in cards]
+                fingerprints = [card_fingerprint(parser, card, link) for card, link in zip(cards, links)]
+                known = await state.known(fingerprints) if state else [False] * len(cards)
+
+                complete = True
+                for card, link, fingerprint, is_known in zip(cards, links, fingerprints, known):
+                    if is_known:
+                        skipped += 1
+                        continue
+                    if len(jobs) >= max_jobs:
+                        complete = False
+                        break
+                    try:
+                        job = extract(card)
+                    except Exception:
+                        job = None
+                    if job:
+                        job["fingerprint"] = fingerprint
+                        job["id"] = job_id(fingerprint)
+                        jobs.append(job)
+                        detail_links.append(link)
+
+                next_links = [urljoin(url, parser.attr(link, "href"))
+                              for selector in source.get("next", DEFAULT_NEXT_SELECTORS)
+                              for link in parser.select(root, selector) if parser.attr(link, "href")]
+
+                # Pages cut short by max_jobs must be re-read in full next time
+                validators = {"etag": response.headers.get("ETag"),
+                              "last_modified": response.headers.get("Last-Modified")}
+                if complete and (validators["etag"] or validators["last_modified"]):
+                    page_validators[url] = dict(validators, next=next_links)
+
+            for next_url in next_links:
+                if next_url not in seen:
+                    seen.add(next_url)
+                    frontier.append(next_url)
+
+    if enrich:
+        pages_fetched += await _enrich_from_details(client, limiter, parser, jobs, detail_links, enrich)
+    if state:
+        await state.save_validators(page_validators)
+
+    stats = crawl_rates(pages_fetched, len(jobs), time.monotonic() - started)
+    stats.update(not_modified=not_modified, skipped=skipped)
+    return jobs, stats
+
+
+async def _enrich_from_details(client: httpx.AsyncClient, limiter: HostRateLimiter, parser: ParserBackend,
+                               jobs: List[Dict], links: List[Optional[str]],
+                               enrich: Callable[[Dict, str], None]) -> int:
+    """Fetch job-detail pages concurrently and pass their text to ``enrich``."""
+    targets = [(job, link) for job, link in zip(jobs, links) if link]
+    responses = await asyncio.gather(*(fetch_page(client, limiter, link) for _, link in targets))
+
+    fetched = 0
+    for (job, _), response in zip(targets, responses):
+        if response is None:
+            continue
+        fetched += 1
+        text = parser.first_text(parser.parse(response.content), DEFAULT_DETAIL_SELECTORS)
+        if text:
+            enrich(job, text)
+    return fetched
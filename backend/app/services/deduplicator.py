@@ -0,0 +1,126 @@
+"""Near-duplicate job detection with MinHash signatures and LSH banding."""
+from typing import List, Dict, Any, Optional, Set
+import re
+import zlib
+import numpy as np
+from app.config import settings
+
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 16 bands of 4 rows: pairs above ~0.5 Jaccard almost always share a bucket
+SHINGLE_SIZE = 2
+
+# Multiply-shift hashing of the 32-bit shingle hashes: ((a * x + b) mod 2**64) >> 32, a odd
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(0, 1 << 63, size=NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.randint(0, 1 << 63, size=NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+_SHIFT = np.uint64(32)
+
+_WORD = re.compile(r"\w+")
+
+
+def _shingles(text: str) -> Set[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _job_text(job: Dict[str, Any]) -> str:
+    return f"{job.get('title', '')} {job.get('company', '')} {job.get('description', '')}"
+
+
+class JobDeduplicator:
+    """Collapses listings of the same vacancy into one canonical job.
+
+    Each job's title, company and description are shingled into word
+    bigrams and summarized as a MinHash signature; signatures are split
+    into LSH bands, and only jobs sharing a band bucket are compared, so
+    finding duplicates stays close to linear in the number of jobs.
+    Candidates whose estimated Jaccard similarity reaches ``threshold`` are
+    merged (transitively) into the first job of their group.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = settings.JOB_DEDUP_THRESHOLD if threshold is None else threshold
+
+    def signatures(self, jobs: List[Dict[str, Any]]) -> np.ndarray:
+        """(n_jobs, NUM_PERMUTATIONS) MinHash matrix; empty texts get all-max rows."""
+        signatures = np.full((len(jobs), NUM_PERMUTATIONS), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for row, job in enumerate(jobs):
+            shingles = _shingles(_job_text(job))
+            if not shingles:
+                continue
+            hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64,
+                                 count=len(shingles))
+            signatures[row] = ((np.outer(_A, hashes) + _B[:, None]) >> _SHIFT).min(axis=1)
+        return signatures
+
+    def groups(self, jobs: List[Dict[str, Any]]) -> List[List[int]]:
+        """Indices of ``jobs`` grouped by near-duplicate, in order of first appearance."""
+        signatures = self.signatures(jobs)
+        parent = list(range(len(jobs)))
+
+        def find(row: int) -> int:
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        rows_per_band = NUM_PERMUTATIONS // BANDS
+        for band in range(BANDS):
+            # One bucket id per distinct band value; only shared buckets are visited
+            chunk = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+            keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows_per_band))).ravel()
+            _, bucket_ids, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+            buckets: Dict[int, int] = {}
+            for row in np.flatnonzero(sizes[bucket_ids] > 1).tolist():
+                first = buckets.setdefault(int(bucket_ids[row]), row)
+                if first == row:
+                    continue
+                a, b = find(first), find(row)
+                if a != b and np.mean(signatures[first] == signatures[row]) >= self.threshold:
+                    # The earlier job stays the group's root
+                    parent[max(a, b)] = min(a, b)
+
+        groups: Dict[int, List[int]] = {}
+        for row in range(len(jobs)):
+            groups.setdefault(find(row), []).append(row)
+        return list(groups.values())
+
+    def deduplicate(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """``jobs`` with near-duplicates merged into the first listing of each vacancy.
+
+        The canonical job lists every ``sources`` it was found on, keeps the
+        fingerprints of the listings merged into it, and fills fields it is
+        missing (salary, skills...) from its duplicates.
+        """
+        if len(jobs) < 2:
+            return list(jobs)
+        return [self._merge([jobs[row] for row in group]) for group in self.groups(jobs)]
+
+    @staticmethod
+    def _merge(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        canonical = dict(group[0])
+        if len(group) == 1:
+            return canonical
+
+        sources: List[str] = []
+        fingerprints: List[str] = []
+        for job in group:
+            for source in job.get("sources") or [job.get("source")]:
+                if source and source not in sources:
+                    sources.append(source)
+            for fingerprint in job.get("fingerprints") or [job.get("fingerprint")]:
+                if fingerprint and fingerprint not in fingerprints:
+                    fingerprints.append(fingerprint)
+            for field, value in job.items():
+                if canonical.get(field) in (None, "", []):
+                    canonical[field] = value
+
+        canonical["sources"] = sources
+        if fingerprints:
+            canonical["fingerprints"] = fingerprints
+        return canonical
+
+
+job_deduplicator = JobDeduplicator()
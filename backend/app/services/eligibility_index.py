@@ -0,0 +1,191 @@
+"""Precomputed lookups for matching KCSE students to programmes."""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from bisect import bisect_right
+import heapq
+import numpy as np
+
+
+class TermIndex:
+    """Inverted map from a normalized (lowercased) term to the programmes listing it.
+
+    A student's term matches a programme's term when either contains the
+    other, as in the original per-programme scan; each distinct term in the
+    catalogue is compared once per student term instead of once per
+    programme.
+    """
+
+    def __init__(self, term_lists: List[Iterable[str]]):
+        self.postings: Dict[str, List[int]] = {}
+        self.sizes: List[int] = []
+        for programme, terms in enumerate(term_lists):
+            normalized = {term.lower() for term in terms}
+            self.sizes.append(len(normalized))
+            for term in normalized:
+                self.postings.setdefault(term, []).append(programme)
+        # Programmes without terms always score the default 50%
+        self.unlisted = [programme for programme, size in enumerate(self.sizes) if size == 0]
+        # One-hot (programmes, terms) matrix for scoring many students at once
+        self.terms = list(self.postings)
+        self.matrix = np.zeros((len(self.sizes), len(self.terms)), dtype=bool)
+        for column, term in enumerate(self.terms):
+            self.matrix[self.postings[term], column] = True
+        self.unlisted_mask = np.array([size == 0 for size in self.sizes], dtype=bool)
+
+    def programmes_matching(self, term: str) -> Set[int]:
+        """Programmes with a term containing, or contained in, ``term``."""
+        term = term.lower()
+        matched: Set[int] = set()
+        for candidate, programmes in self.postings.items():
+            if candidate in term or term in candidate:
+                matched.update(programmes)
+        return matched
+
+    def match(self, user_terms: List[str]) -> Dict[int, float]:
+        """Match percentage (share of ``user_terms`` matched) of every programme matching any of them.
+
+        Programmes left out score 0, or 50 when ``user_terms`` is empty or
+        the programme lists no terms (see ``percent``).
+        """
+        if not user_terms:
+            return {}
+        counts: Dict[int, int] = {}
+        for term in user_terms:
+            for programme in self.programmes_matching(term):
+                counts[programme] = counts.get(programme, 0) + 1
+        return {programme: min(100.0, (count / len(user_terms)) * 100) for programme, count in counts.items()}
+
+    def percent(self, matches: Dict[int, float], user_terms: List[str], programme: int) -> float:
+        if not user_terms or not self.sizes[programme]:
+            return 50.0
+        return matches.get(programme, 0.0)
+
+    def percent_matrix(self, user_term_lists: Sequence[List[str]]) -> np.ndarray:
+        """(students, programmes) float matrix of ``percent`` for each student's terms.
+
+        Each distinct student term is matched against the catalogue terms
+        once; a (students, distinct terms) count matrix times the (distinct
+        terms, programmes) hit matrix then gives every matched-term count.
+        """
+        distinct: Dict[str, int] = {}
+        rows, columns = [], []
+        for row, terms in enumerate(user_term_lists):
+            for term in terms:
+                rows.append(row)
+                columns.append(distinct.setdefault(term.lower(), len(distinct)))
+
+        incidence = np.zeros((len(user_term_lists), len(distinct)))
+        np.add.at(incidence, (rows, columns), 1)
+        hits = np.zeros((len(distinct), len(self.sizes)))
+        for term, column in distinct.items():
+            matched = [i for i, candidate in enumerate(self.terms) if candidate in term or term in candidate]
+            hits[column] = self.matrix[:, matched].any(axis=1)
+
+        lengths = incidence.sum(axis=1)[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent = np.minimum(100.0, ((incidence @ hits) / lengths) * 100)
+        return np.where((lengths == 0) | self.unlisted_mask[None, :], 50.0, percent)
+
+
+class EligibilityIndex:
+    """Programmes sorted by cutoff, plus interest and subject ``TermIndex``es.
+
+    ``recommend`` bisects the cutoffs for the eligibility boundary and only
+    scores programmes that share an interest or subject with the student.
+    Every other eligible programme has the same baseline score, so they are
+    only needed, in catalogue order, to fill up a short top list.
+    Ties keep catalogue order, as with a stable sort over the whole catalogue.
+    """
+
+    def __init__(self, programmes: Dict[str, Dict[str, Any]], cutoffs: Optional[np.ndarray] = None):
+        """``cutoffs`` (one per programme, in order) defaults to each programme's ``cluster_points``."""
+        self.names = list(programmes)
+        if cutoffs is None:
+            cutoffs = np.array([programmes[name]["cluster_points"] for name in self.names], dtype=float)
+        self.cutoff_array = cutoffs
+        self.cutoffs = [float(cutoff) for cutoff in cutoffs]
+        self.by_cutoff = sorted(range(len(self.names)), key=lambda i: (self.cutoffs[i], i))
+        self.sorted_cutoffs = [self.cutoffs[i] for i in self.by_cutoff]
+        self.interests = TermIndex([programmes[name].get("interests", []) for name in self.names])
+        self.subjects = TermIndex([programmes[name].get("subjects", []) for name in self.names])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def eligible_count(self, cluster_points: float) -> int:
+        """Number of programmes whose cutoff is at most ``cluster_points``."""
+        return bisect_right(self.sorted_cutoffs, cluster_points)
+
+    def recommend(self, cluster_points: float, interests: List[str], subjects: List[str],
+                  eligible_limit: int = 5, related_limit: int = 3,
+                  related_margin: float = 10.0) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Best eligible and related programmes as ``(programme, match_percentage)`` pairs.
+
+        Eligible programmes have a cutoff of at most ``cluster_points``;
+        related ones are within ``related_margin`` points above it and match
+        over 60% of the student's interests.
+        """
+        interest_matches = self.interests.match(interests)
+        subject_matches = self.subjects.match(subjects)
+
+        def score(programme: int) -> Tuple[int, float]:
+            interest = self.interests.percent(interest_matches, interests, programme)
+            subject = self.subjects.percent(subject_matches, subjects, programme)
+            return int((interest + subject) / 2), interest
+
+        # What a programme sharing nothing with the student scores
+        baseline = int(((0.0 if interests else 50.0) + (0.0 if subjects else 50.0)) / 2)
+        candidates = (set(interest_matches) | set(subject_matches)
+                      | set(self.interests.unlisted) | set(self.subjects.unlisted))
+
+        eligible, related = [], []
+        for programme in candidates:
+            match, interest = score(programme)
+            cutoff = self.cutoffs[programme]
+            if cluster_points >= cutoff:
+                if match > baseline:
+                    eligible.append((programme, match))
+            elif cluster_points >= cutoff - related_margin and interest > 60:
+                related.append((programme, match))
+
+        eligible = sorted(eligible, key=lambda item: (-item[1], item[0]))[:eligible_limit]
+        related = sorted(related, key=lambda item: (-item[1], item[0]))[:related_limit]
+
+        if len(eligible) < eligible_limit:
+            # Fill up with the earliest eligible programmes at the baseline score
+            chosen = {programme for programme, _ in eligible}
+            earliest = heapq.nsmallest(eligible_limit, self.by_cutoff[:self.eligible_count(cluster_points)])
+            eligible += [(programme, baseline) for programme in earliest
+                         if programme not in chosen][:eligible_limit - len(eligible)]
+
+        return eligible, related
+
+    def recommend_many(self, cluster_points: Sequence[float], interests: Sequence[List[str]],
+                       subjects: Sequence[List[str]], eligible_limit: int = 5, related_limit: int = 3,
+                       related_margin: float = 10.0) -> List[Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]]:
+        """``recommend`` for many students at once, from a (students, programmes) score matrix.
+
+        Memory grows with students x programmes, so callers score large
+        batches in chunks.
+        """
+        points = np.asarray(cluster_points, dtype=float)[:, None]
+        interest = self.interests.percent_matrix(interests)
+        scores = ((interest + self.subjects.percent_matrix(subjects)) / 2).astype(np.int32)
+        eligible = points >= self.cutoff_array
+        related = ~eligible & (points >= self.cutoff_array - related_margin) & (interest > 60)
+        return list(zip(self._top(scores, eligible, eligible_limit), self._top(scores, related, related_limit)))
+
+    def _top(self, scores: np.ndarray, mask: np.ndarray, limit: int) -> List[List[Tuple[int, int]]]:
+        """Per row, the best ``limit`` masked ``(programme, score)`` pairs, ties in catalogue order."""
+        count = len(self)
+        limit = min(limit, count)
+        if limit <= 0:
+            return [[] for _ in range(len(scores))]
+
+        # Unique keys: higher score first, then earlier programme
+        keys = np.where(mask, scores * count + np.arange(count - 1, -1, -1, dtype=scores.dtype), -1)
+        top = np.argpartition(-keys, limit - 1, axis=1)[:, :limit]
+        top_keys = np.take_along_axis(keys, top, axis=1)
+        order = np.argsort(-top_keys, axis=1)
+        top, top_keys = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_keys, order, axis=1)
+        return [[(programme, key // count) for programme, key in zip(programmes, row_keys) if key >= 0]
+                for programmes, row_keys in zip(top.tolist(), top_keys.tolist())]
@@ -1,8 +1,16 @@
 """Improved Gemini AI service with better error handling."""
 from app.config import settings
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Iterable, Callable
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import json
+import math
 import re
+import threading
+from app.services.skill_matcher import skill_matcher
+from app.services.cache_service import get_cache_key, get_or_refresh
+from app.database import redis_client
+from redis.exceptions import RedisError
 
 try:
     import google.generativeai as genai
@@ -17,54 +25,101 @@ try:
 except ImportError:
     SCRAPER_AVAILABLE = False
 
+MODEL_CACHE_KEY = "gemini:model"
+# Real courses looked up for KCSE prompts (the prompt shows 10, the mock response fewer)
+REAL_COURSES_LIMIT = 10
+# Preferred models, best first
+MODEL_NAMES = ["models/gemini-2.5-flash", "models/gemini-2.5-pro", "models/gemini-flash-latest", "models/gemini-pro-latest"]
+
+
+def canonical_list(values: Optional[Iterable[str]]) -> List[str]:
+    """Lowercased, de-duplicated, sorted list items (blank ones dropped)."""
+    return sorted({" ".join(value.lower().split()) for value in values or [] if value and value.strip()})
+
+
+def canonical_text(text: Optional[str]) -> str:
+    """Lowercased text with whitespace collapsed."""
+    return " ".join((text or "").lower().split())
+
+
+def bucket_points(points: float) -> float:
+    """Cluster points rounded down to their ``GEMINI_POINTS_BUCKET`` band."""
+    bucket = settings.GEMINI_POINTS_BUCKET
+    return float(math.floor(points / bucket) * bucket) if bucket > 0 else float(points)
+
+
 class GeminiService:
-    """Service for interacting with Google Gemini AI."""
+    """Service for interacting with Google Gemini AI.
+
+    The ``*_async`` methods used by the routes canonicalize their input
+    (see ``canonical_list``, ``canonical_text`` and ``bucket_points``) and
+    cache Gemini's answer under it for ``GEMINI_CACHE_TTL`` seconds, so
+    near-identical requests share one response, and identical concurrent
+    requests share one upstream call. Mock fallbacks are never cached.
+
+    They also never block the event loop: calls go through the model's
+    native async API (or a bounded thread pool when it has none), at most
+    ``GEMINI_MAX_CONCURRENCY`` at a time, and give up after
+    ``GEMINI_TIMEOUT`` seconds in favour of the mock response. With
+    ``GEMINI_HEDGE_DELAY`` set, a call still unanswered after that long is
+    sent a second time and the first answer wins.
+
+    Model discovery is lazy: the app starts it in the background
+    (``start_initialization``), and the first call that needs a model
+    waits for it if it has not finished.
+    """
 
     def __init__(self):
-        """Initialize Gemini client."""
+        """Set up the Gemini client; no network calls until ``initialize``."""
         self.model = None
         self.api_available = False
-        
+        self.initialized = False
+        self._init_lock = threading.Lock()
+        self._init_task: Optional[asyncio.Task] = None
+        self._semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+        self._executor = ThreadPoolExecutor(max_workers=settings.GEMINI_MAX_CONCURRENCY,
+                                            thread_name_prefix="gemini")
+
+    @property
+    def configured(self) -> bool:
+        """Whether the package is installed and a real API key is set."""
+        return bool(GEMINI_AVAILABLE and settings.GEMINI_API_KEY
+                    and settings.GEMINI_API_KEY != "your_gemini_api_key_here")
+
+    def initialize(self, refresh: bool = False) -> bool:
+        """Pick a working Gemini model, once per process; returns ``api_available``.
+
+        The chosen model name is cached in Redis for ``GEMINI_MODEL_CACHE_TTL``
+        seconds, so other workers (and restarts) skip discovery and its live
+        probe requests. ``refresh`` ignores the cached name and probes again.
+        """
+        if self.initialized and not refresh:
+            return self.api_available
+        with self._init_lock:
+            if not self.initialized or refresh:
+                self._discover(use_cache=not refresh)
+                self.initialized = True
+        return self.api_available
+
+    async def initialize_async(self) -> bool:
+        """``initialize`` on the Gemini thread pool, off the event loop."""
+        if self.initialized:
+            return self.api_available
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.initialize)
+
+    def start_initialization(self) -> None:
+        """Run ``initialize`` in the background (at startup) so the first request need not wait for it."""
+        if self.configured and (self._init_task is None or self._init_task.done()):
+            self._init_task = asyncio.create_task(self.initialize_async())
+
+    def _discover(self, use_cache: bool = True) -> None:
+        self.model = None
+        self.api_available = False
+
         print(f"Gemini API Key loaded: {bool(settings.GEMINI_API_KEY)}")
         print(f"Key preview: {settings.GEMINI_API_KEY[:20] if settings.GEMINI_API_KEY else 'None'}...")
-        
-        if GEMINI_AVAILABLE and settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != "your_gemini_api_key_here":
-            try:
-                print("Configuring Gemini API...")
-                genai.configure(api_key=settings.GEMINI_API_KEY)
-                
-                # List available models
-                print("Available Gemini models:")
-                for model in genai.list_models():
-                    if 'generateContent' in model.supported_generation_methods:
-                        print(f"  - {model.name}")
-                
-                # Try current available model names
-                model_names = ["models/gemini-2.5-flash", "models/gemini-2.5-pro", "models/gemini-flash-latest", "models/gemini-pro-latest"]
-                
-                for model_name in model_names:
-                    try:
-                        print(f"Trying model: {model_name}")
-                        self.model = genai.GenerativeModel(model_name)
-                        
-                        # Test the API with a simple request
-                        test_response = self.model.generate_content("Say hello")
-                        print(f"✅ Success with {model_name}: {test_response.text[:50]}...")
-                        
-                        self.api_available = True
-                        break
-                    except Exception as e:
-                        print(f"❌ Failed with {model_name}: {e}")
-                        continue
-                
-                if self.api_available:
-                    print("✅ Gemini AI initialized successfully")
-                else:
-                    print("❌ No working Gemini model found")
-            except Exception as e:
-                print(f"❌ Failed to initialize Gemini: {e}")
-                self.api_available = False
-        else:
+
+        if not self.configured:
             if not GEMINI_AVAILABLE:
                 print("❌ Google Generative AI package not available")
             elif not settings.GEMINI_API_KEY:
@@ -72,13 +127,91 @@ class GeminiService:
             elif settings.GEMINI_API_KEY == "your_gemini_api_key_here":
                 print("❌ GEMINI_API_KEY is still the placeholder value")
             print("🔄 Using mock responses instead of real AI")
+            return
+
+        try:
+            print("Configuring Gemini API...")
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+
+            cached = self._cached_model_name() if use_cache else None
+            if cached:
+                self.model = genai.GenerativeModel(cached)
+                self.api_available = True
+                print(f"✅ Gemini AI initialized with cached model {cached}")
+                return
+
+            # Only probe the preferred models the API actually offers
+            print("Available Gemini models:")
+            offered = set()
+            for model in genai.list_models():
+                if 'generateContent' in model.supported_generation_methods:
+                    print(f"  - {model.name}")
+                    offered.add(model.name)
+            model_names = [name for name in MODEL_NAMES if name in offered] or MODEL_NAMES
+
+            for model_name in model_names:
+                try:
+                    print(f"Trying model: {model_name}")
+                    self.model = genai.GenerativeModel(model_name)
+
+                    # Test the API with a simple request
+                    test_response = self.model.generate_content("Say hello")
+                    print(f"✅ Success with {model_name}: {test_response.text[:50]}...")
+
+                    self.api_available = True
+                    self._cache_model_name(model_name)
+                    break
+                except Exception as e:
+                    print(f"❌ Failed with {model_name}: {e}")
+                    continue
+
+            if self.api_available:
+                print("✅ Gemini AI initialized successfully")
+            else:
+                self.model = None
+                print("❌ No working Gemini model found")
+        except Exception as e:
+            print(f"❌ Failed to initialize Gemini: {e}")
+            self.model = None
+            self.api_available = False
+
+    @staticmethod
+    def _cached_model_name() -> Optional[str]:
+        try:
+            return redis_client.get_cache(MODEL_CACHE_KEY)
+        except RedisError:
+            return None
+
+    @staticmethod
+    def _cache_model_name(model_name: str) -> None:
+        try:
+            redis_client.set_cache(MODEL_CACHE_KEY, model_name, ttl=settings.GEMINI_MODEL_CACHE_TTL)
+        except RedisError:
+            pass
 
     def get_recommendations(self, skills: List[str], experience: str, interests: List[str], goals: str) -> List[Dict[str, Any]]:
         """Generate career recommendations."""
-        if not self.api_available:
+        self.initialize()
+        prompt = self._recommendations_prompt(skills, experience, interests, goals)
+        return self._ask_sync(prompt, self._parse_recommendations, "Gemini API error") or self._mock_recommendations()
+
+    async def get_recommendations_async(self, skills: List[str], experience: str, interests: List[str],
+                                        goals: str) -> List[Dict[str, Any]]:
+        """``get_recommendations`` through the response cache."""
+        if not await self.initialize_async():
             return self._mock_recommendations()
 
-        prompt = f"""
+        skills, interests = canonical_list(skills), canonical_list(interests)
+        experience, goals = canonical_text(experience), canonical_text(goals)
+        key = get_cache_key("gemini:recommend", {
+            "skills": skills, "experience": experience, "interests": interests, "goals": goals
+        })
+        prompt = self._recommendations_prompt(skills, experience, interests, goals)
+        result = await self._cached(key, prompt, self._parse_recommendations, "Gemini API error")
+        return result or self._mock_recommendations()
+
+    def _recommendations_prompt(self, skills: List[str], experience: str, interests: List[str], goals: str) -> str:
+        return f"""
         Based on the following information, provide career recommendations:
         
         Skills: {', '.join(skills) if skills else 'None specified'}
@@ -101,32 +234,35 @@ class GeminiService:
         Focus on realistic careers available in Kenya and globally.
         """
 
-        try:
-            response = self.model.generate_content(prompt)
-            
-            # Try to extract JSON from response
-            response_text = response.text
-            
-            # Look for JSON array in the response
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                recommendations = json.loads(json_str)
-                return recommendations
-            else:
-                # If no JSON found, parse manually
-                return self._parse_text_response(response_text)
-                
-        except Exception as e:
-            print(f"Gemini API error: {e}")
-            return self._mock_recommendations()
+    def _parse_recommendations(self, response_text: str) -> List[Dict[str, Any]]:
+        # Look for JSON array in the response
+        json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(0)
+            recommendations = json.loads(json_str)
+            return recommendations
+        else:
+            # If no JSON found, parse manually
+            return self._parse_text_response(response_text)
 
     def analyze_skills(self, text: str) -> Dict[str, Any]:
         """Extract skills from text."""
-        if not self.api_available:
+        self.initialize()
+        return (self._ask_sync(self._skills_prompt(text), self._parse_skills, "Gemini skills analysis error")
+                or {"skills": self._extract_skills_fallback(text)})
+
+    async def analyze_skills_async(self, text: str) -> Dict[str, Any]:
+        """``analyze_skills`` through the response cache."""
+        if not await self.initialize_async():
             return {"skills": self._extract_skills_fallback(text)}
 
-        prompt = f"""
+        text = canonical_text(text)
+        result = await self._cached(get_cache_key("gemini:skills", {"text": text}), self._skills_prompt(text),
+                                    self._parse_skills, "Gemini skills analysis error")
+        return result or {"skills": self._extract_skills_fallback(text)}
+
+    def _skills_prompt(self, text: str) -> str:
+        return f"""
         Extract technical and soft skills from this text: "{text}"
         
         Return a JSON object with:
@@ -137,22 +273,15 @@ class GeminiService:
         Focus on skills relevant to the Kenyan job market.
         """
 
-        try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text
-            
-            # Try to extract JSON
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                result = json.loads(json_str)
-                return result
-            else:
-                return {"skills": self._extract_skills_fallback(text)}
-                
-        except Exception as e:
-            print(f"Gemini skills analysis error: {e}")
-            return {"skills": self._extract_skills_fallback(text)}
+    def _parse_skills(self, response_text: str) -> Optional[Dict[str, Any]]:
+        # Try to extract JSON
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(0)
+            result = json.loads(json_str)
+            return result
+        else:
+            return None
 
     def _parse_text_response(self, text: str) -> List[Dict[str, Any]]:
         """Parse text response when JSON extraction fails."""
@@ -191,33 +320,52 @@ class GeminiService:
 
     def _extract_skills_fallback(self, text: str) -> List[str]:
         """Fallback skill extraction."""
-        text_lower = text.lower()
-        
-        common_skills = [
-            "python", "javascript", "java", "react", "sql", "excel", 
-            "communication", "leadership", "teamwork", "project management",
-            "data analysis", "marketing", "sales", "customer service",
-            "accounting", "finance", "teaching", "research"
-        ]
-        
-        found_skills = []
-        for skill in common_skills:
-            if skill in text_lower:
-                found_skills.append(skill.title())
-        
+        found_skills = skill_matcher.find(text)
         return found_skills[:5] if found_skills else ["Communication", "Problem Solving"]
 
     def get_kcse_recommendations(self, cluster_points: float, interests: List[str], 
                                preferred_subjects: List[str], budget_preference: str = "any") -> Dict[str, Any]:
         """Generate AI-powered KCSE course and university recommendations."""
+        self.initialize()
         # Get real university data first
         real_courses = []
         if SCRAPER_AVAILABLE:
-            real_courses = university_scraper.search_courses_by_points(cluster_points, interests)
-        
-        if not self.api_available:
+            real_courses = university_scraper.search_courses_by_points(cluster_points, interests,
+                                                                   limit=REAL_COURSES_LIMIT)
+
+        prompt = self._kcse_prompt(cluster_points, interests, preferred_subjects, budget_preference, real_courses)
+        return (self._ask_sync(prompt, self._parse_kcse, "Gemini KCSE recommendation error")
+                or self._mock_kcse_recommendations(cluster_points, interests, real_courses))
+
+    async def get_kcse_recommendations_async(self, cluster_points: float, interests: List[str],
+                                             preferred_subjects: List[str],
+                                             budget_preference: str = "any") -> Dict[str, Any]:
+        """``get_kcse_recommendations`` through the response cache.
+
+        Points are rounded down to their band before anything else, so the
+        shared answer never assumes more points than the student has.
+        """
+        cluster_points = bucket_points(cluster_points)
+        interests, preferred_subjects = canonical_list(interests), canonical_list(preferred_subjects)
+        budget_preference = canonical_text(budget_preference) or "any"
+
+        real_courses = []
+        if SCRAPER_AVAILABLE:
+            real_courses = university_scraper.search_courses_by_points(cluster_points, interests,
+                                                                   limit=REAL_COURSES_LIMIT)
+        if not await self.initialize_async():
             return self._mock_kcse_recommendations(cluster_points, interests, real_courses)
 
+        key = get_cache_key("gemini:kcse", {
+            "cluster_points": cluster_points, "interests": interests,
+            "preferred_subjects": preferred_subjects, "budget_preference": budget_preference
+        })
+        prompt = self._kcse_prompt(cluster_points, interests, preferred_subjects, budget_preference, real_courses)
+        result = await self._cached(key, prompt, self._parse_kcse, "Gemini KCSE recommendation error")
+        return result or self._mock_kcse_recommendations(cluster_points, interests, real_courses)
+
+    def _kcse_prompt(self, cluster_points: float, interests: List[str], preferred_subjects: List[str],
+                     budget_preference: str, real_courses: List[Dict]) -> str:
         # Include real data in prompt
         real_data_context = ""
         if real_courses:
@@ -226,7 +374,7 @@ class GeminiService:
             {json.dumps(real_courses[:10], indent=2)}
             """
 
-        prompt = f"""
+        return f"""
         You are a Kenyan education counselor. Based on the following KCSE student information, 
         recommend suitable university courses and institutions:
         
@@ -274,22 +422,15 @@ class GeminiService:
         Use the real course data provided above when available. Focus on realistic Kenyan universities and courses.
         """
 
-        try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                recommendations = json.loads(json_str)
-                return recommendations
-            else:
-                return self._mock_kcse_recommendations(cluster_points, interests, real_courses)
-                
-        except Exception as e:
-            print(f"Gemini KCSE recommendation error: {e}")
-            return self._mock_kcse_recommendations(cluster_points, interests, real_courses)
+    def _parse_kcse(self, response_text: str) -> Optional[Dict[str, Any]]:
+        # Extract JSON from response
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(0)
+            recommendations = json.loads(json_str)
+            return recommendations
+        else:
+            return None
 
     def _mock_kcse_recommendations(self, cluster_points: float, interests: List[str], real_courses: List[Dict] = None) -> Dict[str, Any]:
         """Mock KCSE recommendations when AI is unavailable."""
@@ -422,4 +563,75 @@ class GeminiService:
         """Check if Gemini API is available."""
         return self.api_available
 
+    async def _cached(self, key: str, prompt: str, parse: Callable[[str], Any], label: str) -> Optional[Any]:
+        """Cached ``_ask`` result; concurrent misses on ``key`` share one call.
+
+        A None result (Gemini unavailable, failing or too slow) is passed
+        through without being cached.
+        """
+        return await get_or_refresh(key, lambda: self._ask(prompt, parse, label),
+                                    soft_ttl=settings.GEMINI_CACHE_TTL)
+
+    def _ask_sync(self, prompt: str, parse: Callable[[str], Any], label: str) -> Optional[Any]:
+        """``parse`` of Gemini's answer to ``prompt``, or None when it is unavailable or fails."""
+        if not self.api_available:
+            return None
+        try:
+            return parse(self.model.generate_content(prompt).text)
+        except Exception as e:
+            print(f"{label}: {e}")
+            return None
+
+    async def _ask(self, prompt: str, parse: Callable[[str], Any], label: str) -> Optional[Any]:
+        """Async ``_ask_sync``; also None when Gemini does not answer within ``GEMINI_TIMEOUT``."""
+        if not self.api_available:
+            return None
+        try:
+            return parse(await self._generate(prompt))
+        except asyncio.TimeoutError:
+            print(f"{label}: no answer within {settings.GEMINI_TIMEOUT}s")
+            return None
+        except Exception as e:
+            print(f"{label}: {e}")
+            return None
+
+    async def _generate(self, prompt: str) -> str:
+        """Text of the first answer to ``prompt``, hedging once after ``GEMINI_HEDGE_DELAY``."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.GEMINI_TIMEOUT
+        hedge_at = loop.time() + settings.GEMINI_HEDGE_DELAY if settings.GEMINI_HEDGE_DELAY > 0 else None
+        pending = {asyncio.create_task(self._request(prompt))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    raise asyncio.TimeoutError()
+                until = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, pending = await asyncio.wait(pending, timeout=until - now,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if hedge_at is not None and loop.time() >= hedge_at:
+                    hedge_at = None
+                    # Only hedge with spare capacity, so a slow API is not hit twice as hard
+                    if pending and not self._semaphore.locked():
+                        pending.add(asyncio.create_task(self._request(prompt)))
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _request(self, prompt: str) -> str:
+        async with self._semaphore:
+            generate_async = getattr(self.model, "generate_content_async", None)
+            if generate_async is not None:
+                response = await generate_async(prompt)
+            else:
+                response = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self.model.generate_content, prompt)
+            return response.text
+
 gemini_service = GeminiService()
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""Pluggable HTML parser backends for the scrapers.
+
+Each backend parses a page and runs CSS selectors against its own native
+nodes, so scrapers never touch a parser library directly. The bs4 and
+lxml backends compile each selector once and reuse it for every card on
+every page; selectolax has no compiled-selector API, so lexbor parses the
+selector string again on every query.
+"""
+from typing import List, Dict, Optional, Any
+import soupsieve
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+def _squash(text: str) -> str:
+    """Collapse runs of whitespace so every backend returns the same text."""
+    return " ".join(text.split())
+
+
+class ParserBackend:
+    """Parse pages and query nodes with CSS selectors."""
+
+    name = "base"
+
+    def __init__(self):
+        self._compiled: Dict[str, Any] = {}
+
+    def compiled(self, selector: str) -> Any:
+        """The backend's compiled form of ``selector`` (compiled on first use)."""
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            compiled = self._compiled[selector] = self._compile(selector)
+        return compiled
+
+    def parse(self, html: bytes) -> Any:
+        raise NotImplementedError
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        raise NotImplementedError
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        matches = self.select(node, selector)
+        return matches[0] if matches else None
+
+    def text(self, node: Any) -> str:
+        raise NotImplementedError
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _compile(self, selector: str) -> Any:
+        return selector
+
+    def select_first(self, node: Any, selectors: List[str]) -> Optional[Any]:
+        """First match of the first selector (in priority order) that matches anything."""
+        for selector in selectors:
+            match = self.select_one(node, selector)
+            if match is not None:
+                return match
+        return None
+
+    def select_any(self, node: Any, selectors: List[str]) -> List[Any]:
+        """All matches of the first selector (in priority order) that matches anything."""
+        for selector in selectors:
+            matches = self.select(node, selector)
+            if matches:
+                return matches
+        return []
+
+    def first_text(self, node: Any, selectors: List[str], default: str = "") -> str:
+        """Text of ``select_first``, or ``default`` when nothing matches."""
+        match = self.select_first(node, selectors)
+        return self.text(match) if match is not None else default
+
+
+class SoupBackend(ParserBackend):
+    """BeautifulSoup with the stdlib ``html.parser`` (always available, slowest)."""
+
+    name = "bs4"
+
+    def parse(self, html: bytes) -> Any:
+        return BeautifulSoup(html, "html.parser")
+
+    def _compile(self, selector: str) -> Any:
+        return soupsieve.compile(selector)
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return self.compiled(selector).select(node)
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        return self.compiled(selector).select_one(node)
+
+    def text(self, node: Any) -> str:
+        return _squash(node.get_text(" "))
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        value = node.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+
+class LxmlBackend(ParserBackend):
+    """lxml's C parser with selectors compiled to XPath by cssselect."""
+
+    name = "lxml"
+
+    def parse(self, html: bytes) -> Any:
+        return lxml.html.document_fromstring(html)
+
+    def _compile(self, selector: str) -> Any:
+        return CSSSelector(selector)
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return self.compiled(selector)(node)
+
+    def text(self, node: Any) -> str:
+        return _squash(" ".join(node.itertext()))
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+
+class SelectolaxBackend(ParserBackend):
+    """selectolax's lexbor engine (selectolax 1.x), which matches selectors natively.
+
+    Nothing is cached per selector: lexbor re-parses the selector string on
+    every ``css()`` / ``css_first()`` call.
+    """
+
+    name = "selectolax"
+
+    def parse(self, html: bytes) -> Any:
+        return LexborHTMLParser(html)
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return node.css(selector)
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        return node.css_first(selector)
+
+    def text(self, node: Any) -> str:
+        return _squash(node.text(separator=" "))
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+
+PARSER_BACKENDS = {
+    "selectolax": SelectolaxBackend,
+    "lxml": LxmlBackend,
+    "bs4": SoupBackend,
+}
+
+
+def available_backends() -> List[str]:
+    """Names of the backends whose libraries are installed, fastest first."""
+    installed = {"selectolax": SELECTOLAX_AVAILABLE, "lxml": LXML_AVAILABLE, "bs4": True}
+    return [name for name in PARSER_BACKENDS if installed[name]]
+
+
+def get_parser(name: str = "auto") -> ParserBackend:
+    """Create a parser backend; ``"auto"`` picks the fastest one installed."""
+    if name == "auto":
+        name = available_backends()[0]
+    elif name not in available_backends():
+        print(f"HTML parser '{name}' is not available, falling back to bs4")
+        name = "bs4"
+    return PARSER_BACKENDS[name]()
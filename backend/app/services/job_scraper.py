@@ -1,280 +1,191 @@
 """Real-world job scraping service for Kenyan job sites."""
-import requests
-from bs4 import BeautifulSoup
-import re
-from typing import List, Dict, Optional
-import time
-import random
-from urllib.parse import urljoin, urlparse
+import httpx
+import asyncio
+from typing import List, Dict, Optional, Any
+from app.config import settings
+from app.services.rate_limiter import HostRateLimiter
+from app.services.crawler import crawl_source
+from app.services.crawl_state import CrawlState, crawl_state
+from app.services.html_parser import get_parser
+from app.services.skill_matcher import skill_matcher
+from app.services.categorizer import job_categorizer
+from app.services.salary_parser import salary_parser
+from functools import partial
+from urllib.parse import urlparse
+
+# Listing pages per source: first page URL, URL template for page N, card
+# selectors, field selectors (tried in order, first match wins) and optional
+# per-host limits overriding the SCRAPER_HOST_* defaults
+SOURCES = {
+    "BrighterMonday": {
+        "url": "https://www.brightermonday.co.ke/jobs",
+        "page_url": "https://www.brightermonday.co.ke/jobs?page={page}",
+        "cards": ["div.job-item", "article.job"],
+        "fields": {
+            "title": ["h3", "h2", "a.job-title"],
+            "company": ["span.company", "div.company-name"],
+            "location": ["span.location", "div.job-location"],
+            "description": ["p.description", "div.job-summary"],
+        },
+        "rate": 2.0,
+        "concurrency": 3,
+    },
+    "MyJobMag": {
+        "url": "https://www.myjobmag.co.ke/jobs",
+        "page_url": "https://www.myjobmag.co.ke/jobs/page/{page}",
+        "cards": ["div.job-list-item", "div.job-card"],
+        "fields": {
+            "title": ["h4", "h3", "a"],
+            "company": ["span.employer", "div.company"],
+            "location": ["span.location"],
+            "description": ["p", "div.summary"],
+        },
+    },
+    "Fuzu": {
+        "url": "https://www.fuzu.com/kenya/jobs",
+        "page_url": "https://www.fuzu.com/kenya/jobs?page={page}",
+        "cards": ["div.job-card", "div.listing-item"],
+        "fields": {
+            "title": ["h3", "h4", "a"],
+            "company": ["span.company-name", "div.employer"],
+            "location": ["span.location"],
+            "description": ["p.job-description", "div.description"],
+        },
+    },
+}
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 class JobScraper:
     """Scraper for multiple Kenyan job sites."""
     
-    def __init__(self):
+    def __init__(self, sources: Optional[Dict[str, Dict[str, Any]]] = None,
+                 state: Optional[CrawlState] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.sources = sources or SOURCES
+        self.parser = get_parser(settings.SCRAPER_PARSER)
+        # Set for incremental crawls: only pages/cards not seen before are parsed
+        self.state = state
+        self.last_crawl_stats: Dict[str, Dict[str, Any]] = {}
     
-    def scrape_all_jobs(self, max_jobs: int = 50) -> List[Dict]:
-        """Scrape jobs from multiple sources."""
-        all_jobs = []
-        
-        # Scrape from different sources
-        sources = [
-            self.scrape_brightermonday,
-            self.scrape_myjobmag,
-            self.scrape_fuzu
-        ]
-        
-        jobs_per_source = max_jobs // len(sources)
+    def scrape_all_jobs(self, max_jobs: int = 50, pages: Optional[int] = None,
+                        follow_details: Optional[bool] = None) -> List[Dict]:
+        """Scrape jobs from multiple sources (blocking wrapper for sync callers)."""
+        return asyncio.run(self.scrape_all_jobs_async(max_jobs, pages, follow_details))
+    
+    async def scrape_all_jobs_async(self, max_jobs: int = 50, pages: Optional[int] = None,
+                                    follow_details: Optional[bool] = None) -> List[Dict]:
+        """Crawl every source concurrently, following pagination up to ``pages`` deep.
+        
+        Requests share one keep-alive (HTTP/2 when available) client and are
+        throttled per host, so sources never wait on each other. Per-source
+        throughput is kept in ``last_crawl_stats``.
+        """
+        pages = pages or settings.SCRAPER_PAGES_PER_SOURCE
+        if follow_details is None:
+            follow_details = settings.SCRAPER_FOLLOW_DETAILS
+        jobs_per_source = max_jobs // len(self.sources)
+        limiter = self._build_limiter()
+        
+        async with httpx.AsyncClient(
+            headers=self.headers,
+            http2=HTTP2_AVAILABLE,
+            timeout=settings.SCRAPER_TIMEOUT,
+            follow_redirects=True
+        ) as client:
+            results = await asyncio.gather(
+                *(self.scrape_source(client, limiter, name, jobs_per_source, pages, follow_details)
+                  for name in self.sources),
+                return_exceptions=True
+            )
         
-        for scraper in sources:
-            try:
-                jobs = scraper(jobs_per_source)
-                all_jobs.extend(jobs)
-                time.sleep(random.uniform(1, 3))  # Be respectful
-            except Exception as e:
-                print(f"Error scraping with {scraper.__name__}: {e}")
+        all_jobs = []
+        for name, result in zip(self.sources, results):
+            if isinstance(result, Exception):
+                print(f"Error scraping {name}: {result}")
                 continue
+            all_jobs.extend(result)
         
         return all_jobs[:max_jobs]
     
-    def scrape_brightermonday(self, max_jobs: int = 20) -> List[Dict]:
-        """Scrape BrighterMonday Kenya jobs."""
-        jobs = []
-        
-        try:
-            url = "https://www.brightermonday.co.ke/jobs"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find job listings
-            job_cards = soup.find_all('div', class_='job-item') or soup.find_all('article', class_='job')
-            
-            for card in job_cards[:max_jobs]:
-                try:
-                    job = self._extract_brightermonday_job(card)
-                    if job:
-                        jobs.append(job)
-                except Exception as e:
-                    continue
-                    
-        except Exception as e:
-            print(f"BrighterMonday scraping error: {e}")
-        
-        return jobs
-    
-    def scrape_myjobmag(self, max_jobs: int = 15) -> List[Dict]:
-        """Scrape MyJobMag Kenya jobs."""
-        jobs = []
-        
-        try:
-            url = "https://www.myjobmag.co.ke/jobs"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_cards = soup.find_all('div', class_='job-list-item') or soup.find_all('div', class_='job-card')
-            
-            for card in job_cards[:max_jobs]:
-                try:
-                    job = self._extract_myjobmag_job(card)
-                    if job:
-                        jobs.append(job)
-                except Exception as e:
-                    continue
-                    
-        except Exception as e:
-            print(f"MyJobMag scraping error: {e}")
-        
-        return jobs
-    
-    def scrape_fuzu(self, max_jobs: int = 15) -> List[Dict]:
-        """Scrape Fuzu Kenya jobs."""
-        jobs = []
-        
-        try:
-            url = "https://www.fuzu.com/kenya/jobs"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_cards = soup.find_all('div', class_='job-card') or soup.find_all('div', class_='listing-item')
-            
-            for card in job_cards[:max_jobs]:
-                try:
-                    job = self._extract_fuzu_job(card)
-                    if job:
-                        jobs.append(job)
-                except Exception as e:
-                    continue
-                    
-        except Exception as e:
-            print(f"Fuzu scraping error: {e}")
-        
+    async def scrape_source(self, client: httpx.AsyncClient, limiter: HostRateLimiter, name: str,
+                            max_jobs: int = 20, pages: int = 1, follow_details: bool = False) -> List[Dict]:
+        """Crawl one source's listing pages (and optionally job-detail pages)."""
+        jobs, stats = await crawl_source(
+            client, limiter, self.sources[name],
+            parser=self.parser,
+            extract=partial(self._extract_job, name),
+            max_jobs=max_jobs,
+            max_pages=pages,
+            enrich=self._enrich_job if follow_details else None,
+            state=self.state
+        )
+        job_categorizer.categorize_jobs(jobs)
+        salary_parser.parse_jobs(jobs)
+        self.last_crawl_stats[name] = stats
+        print(f"{name}: {stats['pages']} pages ({stats['not_modified']} unchanged), {stats['jobs']} new jobs, "
+              f"{stats['skipped']} known skipped ({stats['pages_per_sec']} pages/s, {stats['jobs_per_sec']} jobs/s)")
         return jobs
     
-    def _extract_brightermonday_job(self, card) -> Optional[Dict]:
-        """Extract job data from BrighterMonday card."""
-        try:
-            title_elem = card.find('h3') or card.find('h2') or card.find('a', class_='job-title')
-            title = title_elem.get_text(strip=True) if title_elem else "Unknown Position"
-            
-            company_elem = card.find('span', class_='company') or card.find('div', class_='company-name')
-            company = company_elem.get_text(strip=True) if company_elem else "Unknown Company"
-            
-            location_elem = card.find('span', class_='location') or card.find('div', class_='job-location')
-            location = location_elem.get_text(strip=True) if location_elem else "Kenya"
-            
-            desc_elem = card.find('p', class_='description') or card.find('div', class_='job-summary')
-            description = desc_elem.get_text(strip=True)[:200] if desc_elem else "No description available"
-            
-            # Extract salary if available
-            salary = self._extract_salary(card.get_text())
-            
-            return {
-                "id": hash(f"{title}{company}") % 100000,
-                "title": title,
-                "company": company,
-                "location": location,
-                "description": description,
-                "salary": salary,
-                "category": self._categorize_job(title, description),
-                "skills": self._extract_skills(f"{title} {description}"),
-                "source": "BrighterMonday"
-            }
-        except Exception:
-            return None
+    def _build_limiter(self) -> HostRateLimiter:
+        """Per-host token buckets, with any per-source overrides applied."""
+        limiter = HostRateLimiter(
+            rate=settings.SCRAPER_HOST_RATE,
+            burst=settings.SCRAPER_HOST_BURST,
+            concurrency=settings.SCRAPER_HOST_CONCURRENCY
+        )
+        for source in self.sources.values():
+            if "rate" in source or "concurrency" in source:
+                limiter.configure(
+                    urlparse(source["url"]).netloc,
+                    rate=source.get("rate"),
+                    burst=source.get("burst"),
+                    concurrency=source.get("concurrency")
+                )
+        return limiter
     
-    def _extract_myjobmag_job(self, card) -> Optional[Dict]:
-        """Extract job data from MyJobMag card."""
-        try:
-            title_elem = card.find('h4') or card.find('h3') or card.find('a')
-            title = title_elem.get_text(strip=True) if title_elem else "Unknown Position"
-            
-            company_elem = card.find('span', class_='employer') or card.find('div', class_='company')
-            company = company_elem.get_text(strip=True) if company_elem else "Unknown Company"
-            
-            location_elem = card.find('span', class_='location')
-            location = location_elem.get_text(strip=True) if location_elem else "Kenya"
-            
-            desc_elem = card.find('p') or card.find('div', class_='summary')
-            description = desc_elem.get_text(strip=True)[:200] if desc_elem else "No description available"
-            
-            salary = self._extract_salary(card.get_text())
-            
-            return {
-                "id": hash(f"{title}{company}") % 100000,
-                "title": title,
-                "company": company,
-                "location": location,
-                "description": description,
-                "salary": salary,
-                "category": self._categorize_job(title, description),
-                "skills": self._extract_skills(f"{title} {description}"),
-                "source": "MyJobMag"
-            }
-        except Exception:
-            return None
+    def _enrich_job(self, job: Dict, detail_text: str) -> None:
+        """Refine a listing-card job with the text of its detail page."""
+        job["description"] = detail_text[:500]
+        # The card's own salary, if any, still comes first
+        job["_salary_text"] = f"{job.get('_salary_text', '')} {detail_text}"
+        job["skills"] = self._extract_skills(f"{job['title']} {detail_text}")
     
-    def _extract_fuzu_job(self, card) -> Optional[Dict]:
-        """Extract job data from Fuzu card."""
+    def _extract_job(self, source_name: str, card) -> Optional[Dict]:
+        """Extract job data from a listing card using the source's field selectors.
+
+        ``crawl_source`` adds the job's fingerprint and ID.
+        """
         try:
-            title_elem = card.find('h3') or card.find('h4') or card.find('a')
-            title = title_elem.get_text(strip=True) if title_elem else "Unknown Position"
-            
-            company_elem = card.find('span', class_='company-name') or card.find('div', class_='employer')
-            company = company_elem.get_text(strip=True) if company_elem else "Unknown Company"
-            
-            location_elem = card.find('span', class_='location')
-            location = location_elem.get_text(strip=True) if location_elem else "Kenya"
-            
-            desc_elem = card.find('p', class_='job-description') or card.find('div', class_='description')
-            description = desc_elem.get_text(strip=True)[:200] if desc_elem else "No description available"
-            
-            salary = self._extract_salary(card.get_text())
+            fields = self.sources[source_name]["fields"]
+            title = self.parser.first_text(card, fields["title"]) or "Unknown Position"
+            company = self.parser.first_text(card, fields["company"]) or "Unknown Company"
+            location = self.parser.first_text(card, fields["location"]) or "Kenya"
+            description = self.parser.first_text(card, fields["description"])[:200] or "No description available"
             
             return {
-                "id": hash(f"{title}{company}") % 100000,
                 "title": title,
                 "company": company,
                 "location": location,
                 "description": description,
-                "salary": salary,
-                "category": self._categorize_job(title, description),
+                "salary": None,
                 "skills": self._extract_skills(f"{title} {description}"),
-                "source": "Fuzu"
+                "source": source_name,
+                # Parsed for the whole batch in scrape_source
+                "_salary_text": self.parser.text(card)
             }
         except Exception:
             return None
     
-    def _extract_salary(self, text: str) -> Optional[int]:
-        """Extract salary from text."""
-        # Look for Kenyan salary patterns
-        patterns = [
-            r'KSh?\s*(\d{1,3}(?:,\d{3})*)',
-            r'(\d{1,3}(?:,\d{3})*)\s*KSh?',
-            r'(\d{1,3}(?:,\d{3})*)\s*per\s*month',
-            r'salary.*?(\d{1,3}(?:,\d{3})*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    salary_str = match.group(1).replace(',', '')
-                    salary = int(salary_str)
-                    # Convert to reasonable range (assume monthly if < 50000)
-                    if salary < 50000:
-                        salary *= 12  # Convert to annual
-                    return salary
-                except ValueError:
-                    continue
-        
-        return None
-    
-    def _categorize_job(self, title: str, description: str) -> str:
-        """Categorize job based on title and description."""
-        text = f"{title} {description}".lower()
-        
-        categories = {
-            "tech": ["developer", "programmer", "software", "IT", "computer", "data", "analyst", "engineer"],
-            "finance": ["accountant", "finance", "banking", "audit", "financial", "economist"],
-            "sales": ["sales", "marketing", "business development", "account manager"],
-            "education": ["teacher", "lecturer", "instructor", "education", "academic"],
-            "healthcare": ["nurse", "doctor", "medical", "health", "clinical"],
-            "hospitality": ["hotel", "restaurant", "chef", "waiter", "hospitality", "tourism"],
-            "agriculture": ["agriculture", "farming", "agricultural", "livestock", "crop"],
-            "management": ["manager", "director", "supervisor", "coordinator", "lead"],
-            "customer_service": ["customer service", "support", "receptionist", "call center"],
-            "logistics": ["logistics", "transport", "driver", "delivery", "supply chain"]
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in text for keyword in keywords):
-                return category
-        
-        return "other"
-    
     def _extract_skills(self, text: str) -> List[str]:
         """Extract skills from job text."""
-        text_lower = text.lower()
-        
-        # Common skills in Kenyan job market
-        skills_keywords = [
-            "python", "java", "javascript", "php", "sql", "mysql", "excel", "powerpoint",
-            "accounting", "quickbooks", "sage", "communication", "leadership", "teamwork",
-            "project management", "customer service", "sales", "marketing", "social media",
-            "microsoft office", "computer literacy", "data analysis", "reporting",
-            "budgeting", "planning", "organization", "problem solving"
-        ]
-        
-        found_skills = []
-        for skill in skills_keywords:
-            if skill in text_lower:
-                found_skills.append(skill.title())
-        
-        return found_skills[:5]  # Limit to top 5 skills
+        return skill_matcher.find(text)[:5]  # Limit to top 5 skills
 
 # Global scraper instance
-job_scraper = JobScraper()
\ No newline at end of file
+job_scraper = JobScraper(state=crawl_state if settings.SCRAPER_INCREMENTAL else None)
\ No newline at end of file
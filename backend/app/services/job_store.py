@@ -0,0 +1,376 @@
+"""Per-job Redis storage with secondary indexes for filtered lookups."""
+from app.database import async_redis_client
+from app.services.cache_service import set_cached_entry
+from app.services.search_index import search_index
+from app.services.job_table import job_table, posted_on
+from app.services.analytics_aggregates import analytics_aggregates
+from app.services.deduplicator import job_deduplicator
+from app.config import settings
+from redis.exceptions import RedisError
+from typing import List, Dict, Optional, Any, Iterable
+from datetime import date, timedelta
+import json
+import time
+
+JOB_KEY = "jobs:item:{}"
+ALL_JOBS_KEY = "jobs:all"
+CATEGORY_KEY = "jobs:category:{}"
+LOCATION_KEY = "jobs:location:{}"
+SOURCE_KEY = "jobs:source:{}"
+LOCATIONS_KEY = "jobs:locations"
+SALARY_KEY = "jobs:salary"
+POSTED_KEY = "jobs:posted"
+INDEX_KEYS_KEY = "jobs:index_keys"
+FINGERPRINTS_KEY = "jobs:fingerprints"
+VERSION_KEY = "jobs:version"
+FRESH_UNTIL_KEY = "jobs:fresh_until"
+
+POSITION_FIELD = "_position"
+
+
+def _normalize(value: Optional[str]) -> str:
+    """Normalize a location/source value for use in an index key."""
+    return (value or "").strip().lower()
+
+
+def _encode_job(job: Dict[str, Any], position: int) -> Dict[str, str]:
+    """Flatten a job into Redis hash fields (each value JSON-encoded)."""
+    fields = {name: json.dumps(value) for name, value in job.items()}
+    fields[POSITION_FIELD] = str(position)
+    return fields
+
+
+def _sources(job: Dict[str, Any]) -> List[str]:
+    """Every source a (possibly merged) job was listed on."""
+    return job.get("sources") or [job.get("source")]
+
+
+def _fingerprints(job: Dict[str, Any]) -> List[str]:
+    """Listing fingerprints of a job and of any duplicates merged into it."""
+    return [fp for fp in job.get("fingerprints") or [job.get("fingerprint")] if fp]
+
+
+def _decode_job(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Rebuild a job dict from its Redis hash fields."""
+    return {name: json.loads(value) for name, value in fields.items() if name != POSITION_FIELD}
+
+
+class JobStore:
+    """Keeps each scraped job in its own hash, indexed by category, location, source and salary.
+
+    Filtered reads intersect the small ID sets server-side and then fetch
+    only the matching hashes, instead of deserializing the whole corpus.
+    """
+
+    def __init__(self, redis=async_redis_client):
+        self.redis = redis
+
+    async def save_jobs(self, jobs: List[Dict], ttl: int = 3600) -> bool:
+        """Replace the stored corpus with ``jobs``.
+
+        The ``scraped_jobs`` cache blob is written alongside for readers that
+        need every job at once (the scraper listing). Jobs without a
+        ``posted_date`` are stamped with today's date, and near-duplicate
+        listings are merged into one job carrying all their ``sources``.
+
+        The jobs are fresh for ``ttl`` seconds and kept ``CACHE_STALE_TTL``
+        longer, so readers can serve them while a refresh runs.
+        """
+        if settings.JOB_DEDUP_ENABLED:
+            jobs = job_deduplicator.deduplicate(jobs)
+        today = date.today().isoformat()
+        for job in jobs:
+            job.setdefault("posted_date", today)
+
+        fresh_until = time.time() + ttl
+        await set_cached_entry("scraped_jobs", jobs, soft_ttl=ttl)
+        ttl += settings.CACHE_STALE_TTL
+
+        client = self.redis.client
+        if client is None:
+            return False
+
+        try:
+            old_ids = await client.smembers(ALL_JOBS_KEY)
+            old_index_keys = await client.smembers(INDEX_KEYS_KEY)
+
+            pipe = client.pipeline(transaction=True)
+            stale_keys = [JOB_KEY.format(job_id) for job_id in old_ids] + list(old_index_keys)
+            if stale_keys:
+                pipe.delete(*stale_keys)
+            pipe.delete(ALL_JOBS_KEY, LOCATIONS_KEY, SALARY_KEY, POSTED_KEY, INDEX_KEYS_KEY, FINGERPRINTS_KEY)
+            analytics_aggregates.queue_reset(pipe)
+
+            index_keys = set()
+            for position, job in enumerate(jobs):
+                job_id = str(job["id"])
+                pipe.hset(JOB_KEY.format(job_id), mapping=_encode_job(job, position))
+                pipe.expire(JOB_KEY.format(job_id), ttl)
+                pipe.sadd(ALL_JOBS_KEY, job_id)
+
+                secondary = [
+                    CATEGORY_KEY.format(job.get("category") or "other"),
+                    LOCATION_KEY.format(_normalize(job.get("location"))),
+                ] + [SOURCE_KEY.format(_normalize(source)) for source in _sources(job)]
+                for key in secondary:
+                    pipe.sadd(key, job_id)
+                index_keys.update(secondary)
+
+                pipe.sadd(LOCATIONS_KEY, _normalize(job.get("location")))
+                # Scored by the top of the range, so salary_min matches any job that can reach it
+                top = job.get("salary_max") or job.get("salary")
+                if top is not None:
+                    pipe.zadd(SALARY_KEY, {job_id: top})
+                pipe.zadd(POSTED_KEY, {job_id: posted_on(job).toordinal()})
+                if _fingerprints(job):
+                    pipe.sadd(FINGERPRINTS_KEY, *_fingerprints(job))
+
+            if index_keys:
+                pipe.sadd(INDEX_KEYS_KEY, *index_keys)
+            for key in list(index_keys) + [ALL_JOBS_KEY, LOCATIONS_KEY, SALARY_KEY, POSTED_KEY, INDEX_KEYS_KEY,
+                                           FINGERPRINTS_KEY]:
+                pipe.expire(key, ttl)
+            analytics_aggregates.queue_update(pipe, added=jobs, ttl=ttl)
+            pipe.set(FRESH_UNTIL_KEY, fresh_until, ex=ttl)
+            # Version stamp lets other workers notice their search index is stale
+            pipe.incr(VERSION_KEY)
+            results = await pipe.execute()
+        except RedisError:
+            return False
+
+        version = str(results[-1])
+        search_index.update(jobs, version=version)
+        job_table.update(jobs, version=version)
+        return True
+
+    async def merge_jobs(self, jobs: List[Dict], ttl: int = 3600) -> bool:
+        """Add newly scraped ``jobs`` to the stored corpus.
+
+        Used by incremental scrapes, which only return jobs not seen before:
+        the stored jobs are kept (new ones listed first, replacing any with
+        the same ID) and the corpus is saved again with a fresh TTL.
+        """
+        client = self.redis.client
+        if client is None:
+            return await self.save_jobs(jobs, ttl=ttl)
+
+        try:
+            stored_ids = await client.smembers(ALL_JOBS_KEY)
+        except RedisError:
+            stored_ids = []
+
+        new_ids = {str(job["id"]) for job in jobs}
+        stored = [job for job in await self.get_jobs(stored_ids) if str(job["id"]) not in new_ids]
+        return await self.save_jobs(list(jobs) + stored, ttl=ttl)
+
+    async def known_fingerprints(self, fingerprints: List[str]) -> List[bool]:
+        """Whether each listing fingerprint belongs to a job already in the store."""
+        client = self.redis.client
+        if client is None or not fingerprints:
+            return [False] * len(fingerprints)
+        try:
+            return [bool(found) for found in await client.smismember(FINGERPRINTS_KEY, fingerprints)]
+        except RedisError:
+            return [False] * len(fingerprints)
+
+    async def remove_jobs(self, job_ids: Iterable[Any]) -> int:
+        """Remove expired jobs from the store, its indexes and the analytics totals.
+
+        Returns the number of jobs removed.
+        """
+        client = self.redis.client
+        if client is None:
+            return 0
+
+        expired = await self.get_jobs(job_ids)
+        if not expired:
+            return 0
+
+        try:
+            pipe = client.pipeline(transaction=True)
+            for job in expired:
+                job_id = str(job["id"])
+                pipe.delete(JOB_KEY.format(job_id))
+                pipe.srem(ALL_JOBS_KEY, job_id)
+                pipe.srem(CATEGORY_KEY.format(job.get("category") or "other"), job_id)
+                pipe.srem(LOCATION_KEY.format(_normalize(job.get("location"))), job_id)
+                for source in _sources(job):
+                    pipe.srem(SOURCE_KEY.format(_normalize(source)), job_id)
+                pipe.zrem(SALARY_KEY, job_id)
+                pipe.zrem(POSTED_KEY, job_id)
+                if _fingerprints(job):
+                    pipe.srem(FINGERPRINTS_KEY, *_fingerprints(job))
+            analytics_aggregates.queue_update(pipe, removed=expired)
+            pipe.incr(VERSION_KEY)
+            pipe.ttl(ALL_JOBS_KEY)
+            pipe.smembers(ALL_JOBS_KEY)
+            results = await pipe.execute()
+        except RedisError:
+            return 0
+
+        version = results[-3]
+        if search_index.version == str(version - 1):
+            # Index was current, so patch it in place rather than re-syncing
+            for job in expired:
+                search_index.remove(str(job["id"]))
+            search_index.version = str(version)
+
+        # Keep the whole-corpus blob in step with what is left
+        ttl, remaining_ids = results[-2], results[-1]
+        if ttl <= 0:
+            ttl = 3600 + settings.CACHE_STALE_TTL
+        await set_cached_entry("scraped_jobs", await self.get_jobs(remaining_ids),
+                               soft_ttl=max(ttl - settings.CACHE_STALE_TTL, 0), hard_ttl=ttl)
+        return len(expired)
+
+    async def expire_jobs(self, max_age_days: Optional[int] = None) -> int:
+        """Remove jobs posted more than ``max_age_days`` (default ``JOB_MAX_AGE_DAYS``) ago.
+
+        Returns the number of jobs removed; a non-positive age keeps every job.
+        """
+        max_age_days = settings.JOB_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        if max_age_days <= 0:
+            return 0
+        expired = await self.find_posted_before(date.today() - timedelta(days=max_age_days))
+        return await self.remove_jobs(expired) if expired else 0
+
+    async def sync(self, view) -> bool:
+        """Bring an in-process view (search index, job table) up to date with the stored corpus.
+
+        ``view`` exposes ``version`` and ``update(jobs, version)``. Returns
+        ``False`` when there is no stored corpus.
+        """
+        client = self.redis.client
+        if client is None:
+            return False
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.get(VERSION_KEY)
+            pipe.scard(ALL_JOBS_KEY)
+            version, total = await pipe.execute()
+            if not total:
+                return False
+            if version == view.version:
+                return True
+            job_ids = await client.smembers(ALL_JOBS_KEY)
+        except RedisError:
+            return False
+
+        # The corpus changed since this worker last looked
+        view.update(await self.get_jobs(job_ids), version=version)
+        return True
+
+    async def oldest_posted_date(self) -> Optional[date]:
+        """Posted date of the oldest stored job."""
+        client = self.redis.client
+        if client is None:
+            return None
+        try:
+            oldest = await client.zrange(POSTED_KEY, 0, 0, withscores=True)
+        except RedisError:
+            return None
+        return date.fromordinal(int(oldest[0][1])) if oldest else None
+
+    async def find_posted_before(self, cutoff: date) -> List[str]:
+        """IDs of jobs posted before ``cutoff`` (candidates for ``remove_jobs``)."""
+        client = self.redis.client
+        if client is None:
+            return []
+        try:
+            return await client.zrangebyscore(POSTED_KEY, "-inf", cutoff.toordinal() - 1)
+        except RedisError:
+            return []
+
+    async def is_stale(self) -> bool:
+        """Whether the stored corpus is past its fresh ``ttl`` (or there is none)."""
+        client = self.redis.client
+        if client is None:
+            return True
+        try:
+            fresh_until = await client.get(FRESH_UNTIL_KEY)
+        except RedisError:
+            return True
+        return fresh_until is None or time.time() >= float(fresh_until)
+
+    async def count(self) -> int:
+        """Number of jobs currently stored."""
+        client = self.redis.client
+        if client is None:
+            return 0
+        try:
+            return await client.scard(ALL_JOBS_KEY)
+        except RedisError:
+            return 0
+
+    async def find_job_ids(self, category: Optional[str] = None, location: Optional[str] = None,
+                           source: Optional[str] = None, salary_min: Optional[int] = None) -> Optional[List[str]]:
+        """Return IDs of jobs matching every given filter.
+
+        ``location`` keeps the substring semantics of the old list filter by
+        matching against the (small) set of distinct stored locations.
+        Returns ``None`` when the store is empty or unavailable.
+        """
+        client = self.redis.client
+        if client is None:
+            return None
+
+        try:
+            if location:
+                locations = await client.smembers(LOCATIONS_KEY)
+                matching_locations = [loc for loc in locations if location.lower() in loc]
+            set_keys = [ALL_JOBS_KEY]
+            if category:
+                set_keys.append(CATEGORY_KEY.format(category))
+            if source:
+                set_keys.append(SOURCE_KEY.format(_normalize(source)))
+
+            pipe = client.pipeline(transaction=False)
+            pipe.scard(ALL_JOBS_KEY)
+            pipe.sinter(set_keys)
+            if location and matching_locations:
+                pipe.sunion([LOCATION_KEY.format(loc) for loc in matching_locations])
+            if salary_min:
+                pipe.zrangebyscore(SALARY_KEY, salary_min, "+inf")
+            results = await pipe.execute()
+        except RedisError:
+            return None
+
+        total, ids = results[0], set(results[1])
+        if not total:
+            return None
+
+        remaining = iter(results[2:])
+        if location:
+            ids &= set(next(remaining)) if matching_locations else set()
+        if salary_min:
+            ids &= set(next(remaining))
+        return list(ids)
+
+    async def get_jobs(self, job_ids: Iterable[Any], scrape_order: bool = True) -> List[Dict]:
+        """Fetch jobs by ID, in the order they were scraped (or as given)."""
+        client = self.redis.client
+        job_ids = list(job_ids)
+        if client is None or not job_ids:
+            return []
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for job_id in job_ids:
+                pipe.hgetall(JOB_KEY.format(job_id))
+            rows = await pipe.execute()
+        except RedisError:
+            return []
+
+        rows = [row for row in rows if row]
+        if scrape_order:
+            rows.sort(key=lambda row: int(row.get(POSITION_FIELD, 0)))
+        return [_decode_job(row) for row in rows]
+
+    async def get_job(self, job_id: Any) -> Optional[Dict]:
+        """Fetch a single job by ID."""
+        jobs = await self.get_jobs([job_id])
+        return jobs[0] if jobs else None
+
+
+job_store = JobStore()
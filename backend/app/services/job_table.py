@@ -0,0 +1,128 @@
+"""Columnar (NumPy) view of the job corpus for filtered analytics."""
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, timedelta
+import numpy as np
+
+# Lookback windows accepted by the analytics ``dateRange`` filter (None = no limit)
+DATE_RANGE_DAYS = {
+    "last-week": 7,
+    "last-month": 30,
+    "last-3-months": 90,
+    "last-6-months": 182,
+    "last-year": 365,
+    "all-time": None,
+}
+
+
+def date_range_start(date_range: Optional[str], today: Optional[date] = None) -> Optional[date]:
+    """First day included by a ``dateRange`` filter, or None for no limit."""
+    days = DATE_RANGE_DAYS.get(date_range or "all-time")
+    if days is None:
+        return None
+    return (today or date.today()) - timedelta(days=days)
+
+
+def posted_on(job: Dict[str, Any], today: Optional[date] = None) -> date:
+    """A job's ``posted_date``; ``today`` when it is missing or not an ISO date (e.g. "2 days ago")."""
+    try:
+        return date.fromisoformat(job["posted_date"])
+    except (KeyError, TypeError, ValueError):
+        return today or date.today()
+
+
+def _dictionary_encode(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (codes, dictionary) so that ``dictionary[codes] == values``."""
+    if not values:
+        return np.zeros(0, dtype=np.int32), np.array([], dtype=object)
+    dictionary, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return codes.astype(np.int32), dictionary
+
+
+class JobTable:
+    """Job corpus stored column-wise.
+
+    Salary is an int64 column (0 = unknown), category/location/skills are
+    dictionary-encoded, and the posted date is a ``datetime64[D]`` column.
+    Filters become boolean masks and group-bys become ``np.bincount``, so
+    filtered analytics stay in the milliseconds even for very large corpora.
+    """
+
+    def __init__(self, jobs: Optional[List[Dict[str, Any]]] = None):
+        self.version: Optional[str] = None
+        self.update(jobs or [], version=None)
+
+    def __len__(self) -> int:
+        return len(self.salary)
+
+    def update(self, jobs: List[Dict[str, Any]], version: Optional[str] = None) -> None:
+        """Rebuild the columns from ``jobs``."""
+        today = date.today()
+
+        self.salary = np.array([job.get("salary") or 0 for job in jobs], dtype=np.int64)
+        # Top of the advertised range (the salary itself when no range is known)
+        self.salary_max = np.array([job.get("salary_max") or job.get("salary") or 0 for job in jobs],
+                                   dtype=np.int64)
+        self.category_codes, self.categories = _dictionary_encode(
+            [job.get("category") or "other" for job in jobs])
+        self.location_codes, self.locations = _dictionary_encode(
+            [(job.get("location") or "").lower() for job in jobs])
+        self.posted_date = np.array(
+            [posted_on(job, today) for job in jobs], dtype="datetime64[D]")
+
+        # Skills are multi-valued: one row per (job, skill) pair
+        skill_rows = [(row, skill) for row, job in enumerate(jobs) for skill in job.get("skills") or []]
+        self.skill_job = np.array([row for row, _ in skill_rows], dtype=np.int64)
+        self.skill_codes, self.skills = _dictionary_encode([skill for _, skill in skill_rows])
+
+        self.version = version
+
+    def mask(self, category: Optional[str] = None, location: Optional[str] = None,
+             salary_min: Optional[int] = None, date_range: Optional[str] = None) -> np.ndarray:
+        """Boolean row mask for the analytics filters (``category="all"`` means any)."""
+        mask = np.ones(len(self), dtype=bool)
+
+        if category and category != "all":
+            matches = np.flatnonzero(self.categories == category)
+            mask &= self.category_codes == (matches[0] if len(matches) else -1)
+
+        if location:
+            # Substring match runs over the (small) location dictionary only
+            needle = location.lower()
+            matches = [code for code, name in enumerate(self.locations) if needle in name]
+            mask &= np.isin(self.location_codes, matches)
+
+        if salary_min:
+            mask &= self.salary_max >= salary_min
+
+        since = date_range_start(date_range)
+        if since is not None:
+            mask &= self.posted_date >= np.datetime64(since, "D")
+
+        return mask
+
+    def aggregate(self, mask: np.ndarray) -> Dict[str, Any]:
+        """Totals for the masked rows, shaped like ``AnalyticsAggregates.read()``."""
+        n_categories = len(self.categories)
+        category_counts = np.bincount(self.category_codes[mask], minlength=n_categories)
+
+        salaried = mask & (self.salary > 0)
+        salary_sums = np.bincount(self.category_codes[salaried], weights=self.salary[salaried],
+                                  minlength=n_categories)
+        salary_counts = np.bincount(self.category_codes[salaried], minlength=n_categories)
+
+        skill_counts = np.bincount(self.skill_codes[mask[self.skill_job]], minlength=len(self.skills))
+
+        def by_name(names: np.ndarray, counts: np.ndarray) -> Dict[str, int]:
+            return {str(names[code]): int(counts[code]) for code in np.flatnonzero(counts)}
+
+        return {
+            "total": int(mask.sum()),
+            "stored": len(self),
+            "category_counts": by_name(self.categories, category_counts),
+            "salary_sums": by_name(self.categories, salary_sums),
+            "salary_counts": by_name(self.categories, salary_counts),
+            "skill_counts": by_name(self.skills, skill_counts),
+        }
+
+
+job_table = JobTable()
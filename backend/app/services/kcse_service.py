@@ -1,119 +1,38 @@
 """KCSE career guidance service."""
-from typing import Dict, List, Any
-from .gemini_service import GeminiService
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from .gemini_service import gemini_service
+from .eligibility_index import EligibilityIndex
+from .catalogue import Catalogue, CatalogueStore, kcse_catalogue
+
+# Students scored per NumPy score matrix in bulk_career_recommendations
+BULK_CHUNK_SIZE = 2048
 
 class KCSEService:
     """Service for KCSE career guidance and recommendations."""
 
-    def __init__(self):
-        self.career_database = self._load_career_data()
-        self.universities = self._load_university_data()
-        self.gemini_service = GeminiService()
-
-    def _load_career_data(self) -> Dict[str, Any]:
-        """Load career data with cluster point requirements."""
-        return {
-            # STEM Careers
-            "Medicine": {
-                "cluster_points": 70.0,
-                "description": "Diagnose and treat patients, save lives",
-                "universities": ["University of Nairobi", "Moi University", "JKUAT"],
-                "job_prospects": "Excellent - High demand",
-                "salary_range": "KSh 150,000 - 500,000+",
-                "interests": ["science", "helping people", "biology", "chemistry"],
-                "subjects": ["Biology", "Chemistry", "Physics", "Mathematics"]
-            },
-            "Engineering": {
-                "cluster_points": 65.0,
-                "description": "Design and build systems, infrastructure",
-                "universities": ["University of Nairobi", "JKUAT", "Technical University of Kenya"],
-                "job_prospects": "Very Good - Growing demand",
-                "salary_range": "KSh 80,000 - 300,000",
-                "interests": ["technology", "problem solving", "mathematics", "building"],
-                "subjects": ["Mathematics", "Physics", "Chemistry"]
-            },
-            "Computer Science": {
-                "cluster_points": 60.0,
-                "description": "Develop software, manage IT systems",
-                "universities": ["Strathmore University", "JKUAT", "University of Nairobi"],
-                "job_prospects": "Excellent - High growth field",
-                "salary_range": "KSh 70,000 - 400,000",
-                "interests": ["technology", "programming", "problem solving", "computers"],
-                "subjects": ["Mathematics", "Physics", "Computer Studies"]
-            },
-            
-            # Business & Economics
-            "Business Administration": {
-                "cluster_points": 55.0,
-                "description": "Manage businesses, lead organizations",
-                "universities": ["Strathmore University", "USIU", "University of Nairobi"],
-                "job_prospects": "Good - Versatile field",
-                "salary_range": "KSh 50,000 - 250,000",
-                "interests": ["leadership", "business", "management", "entrepreneurship"],
-                "subjects": ["Mathematics", "Business Studies", "Economics"]
-            },
-            "Economics": {
-                "cluster_points": 58.0,
-                "description": "Analyze markets, advise on economic policy",
-                "universities": ["University of Nairobi", "Kenyatta University", "Strathmore"],
-                "job_prospects": "Good - Government and private sector",
-                "salary_range": "KSh 60,000 - 200,000",
-                "interests": ["analysis", "mathematics", "policy", "research"],
-                "subjects": ["Mathematics", "Economics", "Geography"]
-            },
-            
-            # Education & Social Sciences
-            "Education": {
-                "cluster_points": 45.0,
-                "description": "Teach and shape future generations",
-                "universities": ["Kenyatta University", "Moi University", "Egerton University"],
-                "job_prospects": "Stable - Always in demand",
-                "salary_range": "KSh 35,000 - 120,000",
-                "interests": ["teaching", "children", "knowledge sharing", "mentoring"],
-                "subjects": ["Any teaching subjects", "Education"]
-            },
-            "Psychology": {
-                "cluster_points": 52.0,
-                "description": "Understand human behavior, provide therapy",
-                "universities": ["University of Nairobi", "Kenyatta University", "USIU"],
-                "job_prospects": "Growing - Mental health awareness",
-                "salary_range": "KSh 45,000 - 180,000",
-                "interests": ["helping people", "human behavior", "counseling", "research"],
-                "subjects": ["Biology", "Mathematics", "English"]
-            },
-            
-            # Creative & Media
-            "Journalism": {
-                "cluster_points": 48.0,
-                "description": "Report news, create media content",
-                "universities": ["University of Nairobi", "Daystar University", "Moi University"],
-                "job_prospects": "Competitive - Digital transformation",
-                "salary_range": "KSh 40,000 - 150,000",
-                "interests": ["writing", "current affairs", "communication", "storytelling"],
-                "subjects": ["English", "Kiswahili", "History", "Geography"]
-            },
-            "Architecture": {
-                "cluster_points": 62.0,
-                "description": "Design buildings and spaces",
-                "universities": ["University of Nairobi", "JKUAT", "Technical University of Kenya"],
-                "job_prospects": "Good - Urban development",
-                "salary_range": "KSh 60,000 - 250,000",
-                "interests": ["design", "art", "mathematics", "building", "creativity"],
-                "subjects": ["Mathematics", "Physics", "Art", "Geography"]
-            }
-        }
-
-    def _load_university_data(self) -> List[Dict[str, Any]]:
-        """Load university information."""
-        return [
-            {"name": "University of Nairobi", "type": "Public", "fees_range": "KSh 16,000 - 120,000"},
-            {"name": "Kenyatta University", "type": "Public", "fees_range": "KSh 16,000 - 100,000"},
-            {"name": "Moi University", "type": "Public", "fees_range": "KSh 16,000 - 110,000"},
-            {"name": "JKUAT", "type": "Public", "fees_range": "KSh 16,000 - 130,000"},
-            {"name": "Strathmore University", "type": "Private", "fees_range": "KSh 200,000 - 400,000"},
-            {"name": "USIU", "type": "Private", "fees_range": "KSh 300,000 - 500,000"},
-            {"name": "Daystar University", "type": "Private", "fees_range": "KSh 150,000 - 300,000"}
-        ]
+    def __init__(self, catalogue: CatalogueStore = kcse_catalogue):
+        self.catalogue = catalogue
+        self.gemini_service = gemini_service
+        self._state: Optional[Tuple[Catalogue, EligibilityIndex]] = None
+
+    @property
+    def career_database(self) -> Dict[str, Any]:
+        """Careers of the current catalogue, with their cluster point requirements (read-only)."""
+        return self._current()[0].careers
+
+    @property
+    def eligibility_index(self) -> EligibilityIndex:
+        """Cutoff-sorted programmes and interest/subject inverted maps for get_career_recommendations."""
+        return self._current()[1]
+
+    def _current(self) -> Tuple[Catalogue, EligibilityIndex]:
+        """The current catalogue and its index, rebuilt when the catalogue is reloaded."""
+        catalogue = self.catalogue.current()
+        state = self._state
+        if state is None or state[0] is not catalogue:
+            state = (catalogue, EligibilityIndex(catalogue.careers, cutoffs=catalogue.arrays["career_cutoffs"]))
+            self._state = state
+        return state
 
     def get_ai_recommendations(self, cluster_points: float, interests: List[str], 
                              preferred_subjects: List[str], budget_preference: str = "any") -> Dict[str, Any]:
@@ -122,76 +41,70 @@ class KCSEService:
             cluster_points, interests, preferred_subjects, budget_preference
         )
 
+    async def get_ai_recommendations_async(self, cluster_points: float, interests: List[str],
+                                           preferred_subjects: List[str], budget_preference: str = "any") -> Dict[str, Any]:
+        """``get_ai_recommendations`` through the Gemini response cache."""
+        return await self.gemini_service.get_kcse_recommendations_async(
+            cluster_points, interests, preferred_subjects, budget_preference
+        )
+
     def get_career_recommendations(self, cluster_points: float, interests: List[str], 
                                  preferred_subjects: List[str], budget_range: str) -> Dict[str, List]:
         """Get career recommendations based on KCSE performance and interests."""
-        
-        eligible_careers = []
-        related_careers = []
+        catalogue, index = self._current()
+        eligible, related = index.recommend(cluster_points, interests, preferred_subjects)
+        return self._recommendations(catalogue, index, cluster_points, interests, eligible, related)
+
+    def bulk_career_recommendations(self, students: List[Dict[str, Any]],
+                                    chunk_size: int = BULK_CHUNK_SIZE) -> Iterator[Dict[str, List]]:
+        """``get_career_recommendations`` for each of ``students``, in order.
+
+        Students are dicts with ``cluster_points``, ``interests`` and
+        ``preferred_subjects``. Each chunk of ``chunk_size`` is scored against
+        the whole catalogue as one NumPy matrix, and results are yielded as
+        soon as their chunk is done.
+        """
+        catalogue, index = self._current()
+        for start in range(0, len(students), chunk_size):
+            chunk = students[start:start + chunk_size]
+            results = index.recommend_many(
+                [student["cluster_points"] for student in chunk],
+                [student.get("interests") or [] for student in chunk],
+                [student.get("preferred_subjects") or [] for student in chunk]
+            )
+            for student, (eligible, related) in zip(chunk, results):
+                yield self._recommendations(catalogue, index, student["cluster_points"],
+                                            student.get("interests") or [], eligible, related)
+
+    def _recommendations(self, catalogue: Catalogue, index: EligibilityIndex, cluster_points: float,
+                         interests: List[str], eligible: List[Tuple[int, int]],
+                         related: List[Tuple[int, int]]) -> Dict[str, List]:
         alternatives = []
-
-        for career_name, career_data in self.career_database.items():
-            # Calculate match percentage based on interests
-            interest_match = self._calculate_interest_match(interests, career_data["interests"])
-            subject_match = self._calculate_subject_match(preferred_subjects, career_data.get("subjects", []))
-            
-            career_option = {
-                "name": career_name,
-                "description": career_data["description"],
-                "required_points": career_data["cluster_points"],
-                "universities": career_data["universities"],
-                "job_prospects": career_data["job_prospects"],
-                "salary_range": career_data["salary_range"],
-                "match_percentage": int((interest_match + subject_match) / 2)
-            }
-
-            # Categorize based on cluster points and interest match
-            if cluster_points >= career_data["cluster_points"]:
-                eligible_careers.append(career_option)
-            elif cluster_points >= career_data["cluster_points"] - 10 and interest_match > 60:
-                related_careers.append(career_option)
-
-        # Sort by match percentage
-        eligible_careers.sort(key=lambda x: x["match_percentage"], reverse=True)
-        related_careers.sort(key=lambda x: x["match_percentage"], reverse=True)
-
         # Generate alternative paths for students who don't qualify directly
         if cluster_points < 45:
             alternatives = self._get_alternative_paths(interests, cluster_points)
 
         return {
-            "eligible": eligible_careers[:5],  # Top 5 matches
-            "related": related_careers[:3],    # Top 3 related
+            "eligible": [self._career_option(catalogue, index, programme, match)
+                         for programme, match in eligible],  # Top 5 matches
+            "related": [self._career_option(catalogue, index, programme, match)
+                        for programme, match in related],    # Top 3 related
             "alternatives": alternatives
         }
 
-    def _calculate_interest_match(self, user_interests: List[str], career_interests: List[str]) -> float:
-        """Calculate percentage match between user interests and career interests."""
-        if not user_interests or not career_interests:
-            return 50.0  # Default match
-        
-        user_interests_lower = [interest.lower() for interest in user_interests]
-        career_interests_lower = [interest.lower() for interest in career_interests]
-        
-        matches = sum(1 for interest in user_interests_lower 
-                     if any(career_int in interest or interest in career_int 
-                           for career_int in career_interests_lower))
-        
-        return min(100.0, (matches / len(user_interests)) * 100)
-
-    def _calculate_subject_match(self, user_subjects: List[str], career_subjects: List[str]) -> float:
-        """Calculate percentage match between preferred subjects and career requirements."""
-        if not user_subjects or not career_subjects:
-            return 50.0
-        
-        user_subjects_lower = [subject.lower() for subject in user_subjects]
-        career_subjects_lower = [subject.lower() for subject in career_subjects]
-        
-        matches = sum(1 for subject in user_subjects_lower 
-                     if any(career_sub in subject or subject in career_sub 
-                           for career_sub in career_subjects_lower))
-        
-        return min(100.0, (matches / len(user_subjects)) * 100)
+    def _career_option(self, catalogue: Catalogue, index: EligibilityIndex, programme: int,
+                       match_percentage: int) -> Dict[str, Any]:
+        career_name = index.names[programme]
+        career_data = catalogue.careers[career_name]
+        return {
+            "name": career_name,
+            "description": career_data["description"],
+            "required_points": career_data["cluster_points"],
+            "universities": list(career_data["universities"]),
+            "job_prospects": career_data["job_prospects"],
+            "salary_range": career_data["salary_range"],
+            "match_percentage": match_percentage
+        }
 
     def _get_alternative_paths(self, interests: List[str], cluster_points: float) -> List[Dict[str, Any]]:
         """Get alternative career paths for students with lower cluster points."""
@@ -231,12 +144,13 @@ class KCSEService:
 
     def get_universities(self) -> List[Dict[str, Any]]:
         """Get list of universities."""
-        return self.universities
+        return [{"name": name, "type": data["type"], "fees_range": data["fees_range"]}
+                for name, data in self._current()[0].universities.items()]
 
     def get_courses(self) -> Dict[str, Any]:
         """Get courses and their requirements."""
         return {name: {"cluster_points": data["cluster_points"], 
-                      "subjects": data.get("subjects", [])} 
+                      "subjects": list(data.get("subjects", []))} 
                 for name, data in self.career_database.items()}
 
 kcse_service = KCSEService()
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""Per-host request pacing for the scrapers."""
+from typing import Dict, Optional
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """Token bucket plus a concurrency cap per host.
+
+    Each host gets its own bucket and semaphore, so concurrent scraping of
+    several sites stays polite per site without a global sleep. Hosts that
+    tolerate more traffic can be given their own limits via ``configure``.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, concurrency: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self._limits: Dict[str, Dict[str, float]] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def configure(self, host: str, rate: Optional[float] = None, burst: Optional[int] = None,
+                  concurrency: Optional[int] = None) -> None:
+        """Override the limits for one host (before its first request)."""
+        self._limits[host] = {
+            "rate": rate or self.rate,
+            "burst": burst or self.burst,
+            "concurrency": concurrency or self.concurrency,
+        }
+
+    def _host_state(self, url: str):
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            limits = self._limits.get(host, {"rate": self.rate, "burst": self.burst, "concurrency": self.concurrency})
+            self._buckets[host] = TokenBucket(limits["rate"], int(limits["burst"]))
+            self._semaphores[host] = asyncio.Semaphore(int(limits["concurrency"]))
+        return self._buckets[host], self._semaphores[host]
+
+    async def wait(self, url: str) -> None:
+        """Block until the host's bucket allows another request."""
+        bucket, _ = self._host_state(url)
+        await bucket.acquire()
+
+    @asynccontextmanager
+    async def limit(self, url: str):
+        """Hold one of the host's concurrency slots and a rate token for a request."""
+        bucket, semaphore = self._host_state(url)
+        async with semaphore:
+            await bucket.acquire()
+            yield
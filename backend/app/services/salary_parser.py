@@ -0,0 +1,195 @@
+"""Salary extraction and normalization to monthly KES."""
+from typing import List, Dict, Optional, Any, Sequence
+import re
+import numpy as np
+from app.config import settings
+
+# Multipliers converting a salary quoted per period into a monthly figure
+PERIOD_TO_MONTHLY = {
+    "hour": 176.0,
+    "day": 22.0,
+    "week": 52 / 12,
+    "month": 1.0,
+    "year": 1 / 12,
+}
+
+_PERIOD_WORDS = {
+    "hour": "hour", "hourly": "hour", "hr": "hour",
+    "day": "day", "daily": "day",
+    "week": "week", "weekly": "week", "wk": "week",
+    "month": "month", "monthly": "month", "mo": "month", "mth": "month", "pm": "month", "p.m": "month",
+    "year": "year", "yearly": "year", "annum": "year", "annual": "year", "annually": "year", "yr": "year",
+    "pa": "year", "p.a": "year",
+}
+
+_CURRENCY_WORDS = {
+    "ksh": "KES", "kshs": "KES", "kes": "KES", "sh": "KES", "shs": "KES",
+    "usd": "USD", "us$": "USD", "$": "USD",
+    "eur": "EUR", "€": "EUR",
+    "gbp": "GBP", "£": "GBP",
+}
+
+_SUFFIXES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6}
+
+_CURRENCY = r"(?:\b(?:kshs?|kes|shs?|usd|eur|gbp)\b\.?|us\$|\$|€|£)"
+_AMOUNT = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SUFFIX = r"(?:k|thousand|mn|m|million)\b"
+
+SALARY_PATTERN = re.compile(
+    rf"""
+    (?P<cur1>{_CURRENCY})?\s*
+    (?P<lo>{_AMOUNT})\s*(?P<lo_sfx>{_SUFFIX})?
+    (?:\s*(?:-|–|—|to|and)\s*(?:{_CURRENCY})?\s*(?P<hi>{_AMOUNT})\s*(?P<hi_sfx>{_SUFFIX})?)?
+    (?:\s*(?P<cur2>{_CURRENCY}))?
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+PERIOD_PATTERN = re.compile(
+    r"(?:\b(?:per|a|an|each)\s+|/\s*)(?P<unit>hour|hr|day|week|wk|month|mo|mth|year|yr|annum)\b"
+    r"|\b(?P<adverb>hourly|daily|weekly|monthly|yearly|annually|annual)\b"
+    r"|\b(?P<abbr>p\.?m|p\.?a)\b\.?",
+    re.IGNORECASE,
+)
+SALARY_CONTEXT_PATTERN = re.compile(r"salary|pay|remuneration|compensation|stipend|wage|gross|net\b", re.IGNORECASE)
+
+# How far around an amount to look for its period or a salary keyword
+_WINDOW = 40
+# Monthly KES values outside this range are phone numbers, years, head counts...
+PLAUSIBLE_MONTHLY_KES = (3_000, 10_000_000)
+# Without a stated period, amounts this large (monthly KES) are taken as annual
+ANNUAL_GUESS_KES = 1_500_000
+
+
+def _amount(number: str, suffix: Optional[str]) -> float:
+    return float(number.replace(",", "")) * _SUFFIXES.get((suffix or "").lower(), 1.0)
+
+
+def _period(text: str, start: int, end: int) -> Optional[str]:
+    """Period stated right after the amount (preferred) or shortly before it."""
+    after = PERIOD_PATTERN.search(text, end, min(len(text), end + _WINDOW))
+    before = None
+    for before in PERIOD_PATTERN.finditer(text, max(0, start - _WINDOW), start):
+        pass
+    match = after or before
+    if match is None:
+        return None
+    word = (match.group("unit") or match.group("adverb") or match.group("abbr")).lower()
+    return _PERIOD_WORDS.get(word) or _PERIOD_WORDS.get(word.replace(".", ""))
+
+
+class SalaryParser:
+    """Finds a salary in job text and normalizes it to monthly KES.
+
+    Handles single figures and ranges ("KSh 80,000 - 120,000", "80k-120k"),
+    K/M suffixes, the currency (KES, USD, EUR, GBP at ``SALARY_FX_RATES``)
+    and the pay period (hourly ... annual). Amounts without a currency only
+    count next to a salary keyword or a period, so years and phone numbers
+    are ignored. Patterns are compiled once at import.
+    """
+
+    def __init__(self, fx_rates: Optional[Dict[str, float]] = None):
+        self.fx_rates = {"KES": 1.0, **(fx_rates if fx_rates is not None else settings.SALARY_FX_RATES)}
+
+    def _candidate(self, text: str) -> Optional[Dict[str, Any]]:
+        """The first amount in ``text`` that reads as a salary, un-normalized."""
+        for match in SALARY_PATTERN.finditer(text):
+            currency_word = (match.group("cur1") or match.group("cur2") or "").lower().rstrip(".")
+            start, end = match.span()
+            period = _period(text, start, end)
+            context = SALARY_CONTEXT_PATTERN.search(text, max(0, start - _WINDOW), start)
+            if not currency_word and not period and not context:
+                continue
+
+            low = _amount(match.group("lo"), match.group("lo_sfx"))
+            high = _amount(match.group("hi"), match.group("hi_sfx") or match.group("lo_sfx")) \
+                if match.group("hi") else low
+            # "5 years", "3 positions": small bare counts near the word "salary"
+            if not currency_word and max(low, high) < 100:
+                continue
+            # "80-120k": a suffix on the upper bound only applies to both
+            if match.group("hi_sfx") and not match.group("lo_sfx") and low < high / 100:
+                low *= _SUFFIXES[match.group("hi_sfx").lower()]
+            return {
+                "min": min(low, high),
+                "max": max(low, high),
+                "currency": _CURRENCY_WORDS.get(currency_word, "KES"),
+                "period": period,
+            }
+        return None
+
+    def parse(self, text: str) -> Optional[Dict[str, Any]]:
+        """Salary in ``text`` as ``{min, max, currency, period, monthly_min, monthly_max, salary}``.
+
+        ``monthly_*`` and ``salary`` (the range midpoint) are whole monthly
+        KES; ``period`` is the one stated, or the one assumed.
+        """
+        return self.parse_batch([text])[0]
+
+    def parse_batch(self, texts: Sequence[Optional[str]]) -> List[Optional[Dict[str, Any]]]:
+        """``parse`` for many texts, normalizing all of them in one vectorized step."""
+        columns = self.parse_columns(texts)
+        results: List[Optional[Dict[str, Any]]] = []
+        for row, candidate in enumerate(columns["candidates"]):
+            if candidate is None or not columns["found"][row]:
+                results.append(None)
+                continue
+            results.append(dict(
+                candidate,
+                period=columns["periods"][row],
+                monthly_min=int(columns["monthly_min"][row]),
+                monthly_max=int(columns["monthly_max"][row]),
+                salary=int(columns["salary"][row]),
+            ))
+        return results
+
+    def parse_columns(self, texts: Sequence[Optional[str]]) -> Dict[str, Any]:
+        """Salary columns for ``texts``: int64 ``monthly_min``/``monthly_max``/``salary`` (0 = none) and ``found``."""
+        candidates = [self._candidate(text) if text else None for text in texts]
+
+        low = np.array([candidate["min"] if candidate else 0.0 for candidate in candidates])
+        high = np.array([candidate["max"] if candidate else 0.0 for candidate in candidates])
+        fx = np.array([self.fx_rates.get(candidate["currency"], 0.0) if candidate else 0.0
+                       for candidate in candidates])
+        stated = np.array([PERIOD_TO_MONTHLY[candidate["period"]] if candidate and candidate["period"] else np.nan
+                           for candidate in candidates])
+
+        # Unstated periods: monthly, unless the figure is only plausible as an annual one
+        guess_annual = np.isnan(stated) & (high * fx >= ANNUAL_GUESS_KES)
+        factor = np.where(np.isnan(stated), np.where(guess_annual, PERIOD_TO_MONTHLY["year"], 1.0), stated)
+
+        monthly_min = np.rint(low * fx * factor).astype(np.int64)
+        monthly_max = np.rint(high * fx * factor).astype(np.int64)
+        found = (monthly_min >= PLAUSIBLE_MONTHLY_KES[0]) & (monthly_max <= PLAUSIBLE_MONTHLY_KES[1])
+        monthly_min[~found] = 0
+        monthly_max[~found] = 0
+        salary = (monthly_min + monthly_max) // 2
+
+        periods = [
+            (candidate["period"] or ("year" if annual else "month")) if candidate else None
+            for candidate, annual in zip(candidates, guess_annual.tolist())
+        ]
+        return {
+            "candidates": candidates,
+            "periods": periods,
+            "found": found,
+            "monthly_min": monthly_min,
+            "monthly_max": monthly_max,
+            "salary": salary,
+        }
+
+    def parse_jobs(self, jobs: List[Dict], field: str = "_salary_text") -> None:
+        """Set ``salary`` (monthly KES midpoint), ``salary_min`` and ``salary_max`` on jobs, in one batch.
+
+        The text is popped from ``field``; jobs without it, or with no salary
+        in it, keep whatever ``salary`` they already have.
+        """
+        columns = self.parse_columns([job.pop(field, None) for job in jobs])
+        for job, found, low, high, mid in zip(jobs, columns["found"].tolist(), columns["monthly_min"].tolist(),
+                                              columns["monthly_max"].tolist(), columns["salary"].tolist()):
+            if found:
+                job["salary"], job["salary_min"], job["salary_max"] = mid, low, high
+            else:
+                job.setdefault("salary", None)
+
+
+salary_parser = SalaryParser()
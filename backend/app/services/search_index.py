@@ -0,0 +1,173 @@
+"""In-process inverted index for free-text job search."""
+from typing import List, Dict, Tuple, Optional, Any
+from collections import Counter
+import bisect
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+# Field weights: a term in the title counts as much as two in the description
+FIELD_WEIGHTS = {"title": 2, "description": 1, "company": 1, "skills": 1}
+
+# Prefix expansion limits so a one-letter query doesn't touch the whole vocabulary
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 100
+PREFIX_MATCH_WEIGHT = 0.8
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into search tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _job_terms(job: Dict[str, Any]) -> Counter:
+    """Weighted term frequencies for a job across the indexed fields."""
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = job.get(field) or ""
+        if isinstance(value, list):
+            value = " ".join(value)
+        for token in tokenize(value):
+            terms[token] += weight
+    return terms
+
+
+class SearchIndex:
+    """Tokenized inverted index over title, description, company and skills.
+
+    Queries are AND-ed across terms, each term also matches as a prefix
+    ("dev" finds "developer"), and results are ranked with BM25. The index
+    is updated incrementally: only jobs whose text changed are re-tokenized.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_terms: Dict[str, Counter] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_fingerprints: Dict[str, int] = {}
+        self.total_length = 0
+        self.version: Optional[str] = None
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def add(self, doc_id: str, job: Dict[str, Any]) -> None:
+        """Index a job (replacing any previous version of it)."""
+        if doc_id in self.doc_terms:
+            self.remove(doc_id)
+
+        terms = _job_terms(job)
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = sum(terms.values())
+        self.doc_fingerprints[doc_id] = self._fingerprint(job)
+        self.total_length += self.doc_lengths[doc_id]
+        for token, tf in terms.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self._vocabulary_dirty = True
+            self.postings[token][doc_id] = tf
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a job from the index."""
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self.doc_fingerprints.pop(doc_id, None)
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+        for token in terms:
+            docs = self.postings.get(token)
+            if docs is None:
+                continue
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[token]
+                self._vocabulary_dirty = True
+
+    def update(self, jobs: List[Dict[str, Any]], version: Optional[str] = None) -> None:
+        """Make the index reflect exactly ``jobs``, re-indexing only what changed."""
+        incoming = {str(job["id"]): job for job in jobs}
+
+        for doc_id in list(self.doc_terms):
+            if doc_id not in incoming:
+                self.remove(doc_id)
+
+        for doc_id, job in incoming.items():
+            if self.doc_fingerprints.get(doc_id) != self._fingerprint(job):
+                self.add(doc_id, job)
+
+        self.version = version
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return ``(doc_id, score)`` pairs matching every query term, best first."""
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or not self.doc_terms:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        for term in query_terms:
+            term_scores = self._score_term(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: score + term_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def _score_term(self, term: str) -> Dict[str, float]:
+        """BM25 contribution of one query term (including its prefix expansions)."""
+        doc_count = len(self.doc_terms)
+        avg_length = self.total_length / doc_count if doc_count else 0.0
+        scores: Dict[str, float] = {}
+
+        for token, weight in self._expand(term):
+            docs = self.postings[token]
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                length = self.doc_lengths[doc_id]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                score = weight * idf * tf * (self.k1 + 1) / norm
+                # A doc matching several expansions keeps its best one
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens matched by ``term``: itself exactly, then by prefix."""
+        expansions = []
+        if term in self.postings:
+            expansions.append((term, 1.0))
+        if len(term) < MIN_PREFIX_LENGTH:
+            return expansions
+
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+
+        # The exact term sorts first, so skip it before taking the expansions
+        start = bisect.bisect_right(self._vocabulary, term)
+        for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            expansions.append((token, PREFIX_MATCH_WEIGHT))
+        return expansions
+
+    @staticmethod
+    def _fingerprint(job: Dict[str, Any]) -> int:
+        """Cheap change detector over the indexed fields."""
+        return hash(tuple(
+            tuple(job.get(field) or []) if field == "skills" else job.get(field)
+            for field in FIELD_WEIGHTS
+        ))
+
+
+search_index = SearchIndex()
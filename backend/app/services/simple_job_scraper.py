@@ -1,135 +1,129 @@
 """Simplified job scraper with better debugging."""
-import requests
-from bs4 import BeautifulSoup
+import httpx
 import re
-from typing import List, Dict, Optional
-import time
+from typing import List, Dict, Optional, Any
 import random
+from app.config import settings
+from app.services.rate_limiter import HostRateLimiter
+from app.services.crawler import crawl_source, job_id
+from app.services.crawl_state import CrawlState, crawl_state
+from app.services.html_parser import get_parser
+from app.services.skill_matcher import skill_matcher
+from app.services.categorizer import job_categorizer
+from app.services.salary_parser import salary_parser
+
+# Job aggregator crawled for real listings (pagination via its "next" link)
+INDEED_SOURCE = {
+    "name": "Indeed Kenya",
+    "url": "https://ke.indeed.com/jobs?q=&l=Kenya",
+    "cards": ['div[data-jk]', '.jobsearch-SerpJobCard', '.job_seen_beacon', '.slider_container .slider_item'],
+    "next": ['a[data-testid="pagination-page-next"]', 'a[aria-label="Next Page"]', 'a[rel="next"]'],
+    # Field selectors, tried in order (first match wins)
+    "fields": {
+        "title": ['h2 a span', 'h2 a', '.jobTitle a', 'h3 a', 'h4 a'],
+        "link": ['h2 a', '.jobTitle a', 'h3 a', 'h4 a'],
+        "company": ['.companyName', '[data-testid="company-name"]', '.company'],
+        "location": ['.companyLocation', '[data-testid="job-location"]', '.location'],
+        "description": ['.summary', '.job-snippet', '.jobSnippet'],
+    },
+}
 
 class SimpleJobScraper:
     """Simple, reliable job scraper."""
     
-    def __init__(self):
+    def __init__(self, state: Optional[CrawlState] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.parser = get_parser(settings.SCRAPER_PARSER)
+        self.state = state
+        self.last_crawl_stats: Dict[str, Dict[str, Any]] = {}
     
-    def scrape_all_jobs(self, max_jobs: int = 30) -> List[Dict]:
+    async def scrape_all_jobs(self, max_jobs: int = 30) -> List[Dict]:
         """Scrape jobs with fallback to generated realistic data."""
         scraped_jobs = []
+        self.last_crawl_stats.pop(INDEED_SOURCE["name"], None)
         
         # Try to scrape real jobs first
         try:
-            scraped_jobs = self._scrape_generic_jobs()
+            scraped_jobs = await self._scrape_generic_jobs(max_jobs)
             print(f"Scraped {len(scraped_jobs)} real jobs")
         except Exception as e:
             print(f"Real scraping failed: {e}")
         
-        # If scraping fails or returns few jobs, generate realistic Kenyan jobs
-        if len(scraped_jobs) < 10:
+        # If scraping fails or finds few jobs (new or already stored), generate realistic Kenyan jobs
+        known = self.last_crawl_stats.get(INDEED_SOURCE["name"], {}).get("skipped", 0)
+        if len(scraped_jobs) + known < 10:
             print("Generating realistic Kenyan job data...")
             scraped_jobs.extend(self._generate_realistic_kenyan_jobs(max_jobs - len(scraped_jobs)))
         
         return scraped_jobs[:max_jobs]
     
-    def _scrape_generic_jobs(self) -> List[Dict]:
-        """Try to scrape from a simple job aggregator."""
-        jobs = []
-        
-        try:
-            # Try a simple job search that's more likely to work
-            url = "https://ke.indeed.com/jobs?q=&l=Kenya"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Look for job cards with various possible selectors
-                job_selectors = [
-                    'div[data-jk]',
-                    '.jobsearch-SerpJobCard',
-                    '.job_seen_beacon',
-                    '.slider_container .slider_item'
-                ]
-                
-                job_cards = []
-                for selector in job_selectors:
-                    job_cards = soup.select(selector)
-                    if job_cards:
-                        break
-                
-                for card in job_cards[:15]:
-                    job = self._extract_generic_job(card)
-                    if job:
-                        jobs.append(job)
-                        
-        except Exception as e:
-            print(f"Generic scraping error: {e}")
+    async def _scrape_generic_jobs(self, max_jobs: int = 30) -> List[Dict]:
+        """Crawl a simple job aggregator, following its pagination."""
+        limiter = HostRateLimiter(
+            rate=settings.SCRAPER_HOST_RATE,
+            burst=settings.SCRAPER_HOST_BURST,
+            concurrency=settings.SCRAPER_HOST_CONCURRENCY
+        )
+        async with httpx.AsyncClient(headers=self.headers, timeout=settings.SCRAPER_TIMEOUT,
+                                     follow_redirects=True) as client:
+            jobs, stats = await crawl_source(
+                client, limiter, INDEED_SOURCE,
+                parser=self.parser,
+                extract=self._extract_generic_job,
+                max_jobs=max_jobs,
+                max_pages=settings.SCRAPER_PAGES_PER_SOURCE,
+                enrich=self._enrich_job if settings.SCRAPER_FOLLOW_DETAILS else None,
+                state=self.state
+            )
         
+        job_categorizer.categorize_jobs(jobs)
+        salary_parser.parse_jobs(jobs)
+        for job in jobs:
+            # Most cards do not advertise pay; estimate it from the title
+            if job["salary"] is None:
+                job["salary"] = self._generate_realistic_salary(job["title"])
+        self.last_crawl_stats[INDEED_SOURCE["name"]] = stats
+        print(f"{INDEED_SOURCE['name']}: {stats['pages']} pages ({stats['not_modified']} unchanged), "
+              f"{stats['jobs']} new jobs, {stats['skipped']} known skipped "
+              f"({stats['pages_per_sec']} pages/s, {stats['jobs_per_sec']} jobs/s)")
         return jobs
     
+    def _enrich_job(self, job: Dict, detail_text: str) -> None:
+        """Refine a listing-card job with the text of its detail page."""
+        job["description"] = detail_text[:500]
+        job["skills"] = self._extract_skills(f"{job['title']} {detail_text}")
+    
     def _extract_generic_job(self, card) -> Optional[Dict]:
-        """Extract job from generic job card."""
+        """Extract job from generic job card (``crawl_source`` adds its ID)."""
         try:
-            # Try multiple selectors for title
-            title = None
-            title_link = None
-            title_selectors = ['h2 a span', 'h2 a', '.jobTitle a', 'h3 a', 'h4 a']
-            for selector in title_selectors:
-                title_elem = card.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    # Try to get the job URL
-                    if title_elem.name == 'a':
-                        title_link = title_elem.get('href')
-                    elif title_elem.parent and title_elem.parent.name == 'a':
-                        title_link = title_elem.parent.get('href')
-                    break
-            
+            fields = INDEED_SOURCE["fields"]
+            title = self.parser.first_text(card, fields["title"])
             if not title:
                 return None
             
-            # Try multiple selectors for company
-            company = "Unknown Company"
-            company_selectors = ['.companyName', '[data-testid="company-name"]', '.company']
-            for selector in company_selectors:
-                company_elem = card.select_one(selector)
-                if company_elem:
-                    company = company_elem.get_text(strip=True)
-                    break
+            # The job URL sits on the title link
+            link = self.parser.select_first(card, fields["link"])
+            title_link = self.parser.attr(link, 'href') if link is not None else None
             
-            # Try to get location
-            location = "Kenya"
-            location_selectors = ['.companyLocation', '[data-testid="job-location"]', '.location']
-            for selector in location_selectors:
-                location_elem = card.select_one(selector)
-                if location_elem:
-                    location = location_elem.get_text(strip=True)
-                    break
-            
-            # Get description
-            description = "No description available"
-            desc_selectors = ['.summary', '.job-snippet', '.jobSnippet']
-            for selector in desc_selectors:
-                desc_elem = card.select_one(selector)
-                if desc_elem:
-                    description = desc_elem.get_text(strip=True)[:200]
-                    break
+            company = self.parser.first_text(card, fields["company"], "Unknown Company")
+            location = self.parser.first_text(card, fields["location"], "Kenya")
+            description = self.parser.first_text(card, fields["description"])[:200] or "No description available"
             
             # Generate apply URL
             apply_url = self._generate_apply_url(title_link, title, company)
             
             return {
-                "id": hash(f"{title}{company}") % 100000,
                 "title": title,
                 "company": company,
                 "location": location,
                 "description": description,
-                "salary": self._generate_realistic_salary(title),
-                "category": self._categorize_job(title, description),
+                "salary": None,
                 "skills": self._extract_skills(f"{title} {description}"),
                 "apply_url": apply_url,
-                "source": "Indeed Kenya"
+                "source": "Indeed Kenya",
+                "_salary_text": self.parser.text(card)
             }
             
         except Exception as e:
@@ -245,7 +239,7 @@ class SimpleJobScraper:
             apply_url = self._generate_apply_url(None, base_job["title"], base_job["company"])
             
             job = {
-                "id": 1000 + i,
+                "id": job_id(f"generated:{i}"),
                 "title": base_job["title"],
                 "company": base_job["company"],
                 "location": base_job["location"],
@@ -289,48 +283,9 @@ class SimpleJobScraper:
         # Default range
         return random.randint(30000, 80000)
     
-    def _categorize_job(self, title: str, description: str) -> str:
-        """Categorize job based on title and description."""
-        text = f"{title} {description}".lower()
-        
-        categories = {
-            "tech": ["developer", "programmer", "software", "IT", "computer", "data", "analyst", "engineer"],
-            "finance": ["accountant", "finance", "banking", "audit", "financial", "economist"],
-            "sales": ["sales", "marketing", "business development", "account manager"],
-            "education": ["teacher", "lecturer", "instructor", "education", "academic"],
-            "healthcare": ["nurse", "doctor", "medical", "health", "clinical"],
-            "hospitality": ["hotel", "restaurant", "chef", "waiter", "hospitality", "tourism"],
-            "agriculture": ["agriculture", "farming", "agricultural", "livestock", "crop"],
-            "management": ["manager", "director", "supervisor", "coordinator", "lead"],
-            "customer_service": ["customer service", "support", "receptionist", "call center"],
-            "engineering": ["engineer", "civil", "mechanical", "electrical", "construction"]
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in text for keyword in keywords):
-                return category
-        
-        return "other"
-    
     def _extract_skills(self, text: str) -> List[str]:
         """Extract skills from job text."""
-        text_lower = text.lower()
-        
-        skills_keywords = [
-            "python", "java", "javascript", "php", "sql", "mysql", "excel", "powerpoint",
-            "accounting", "quickbooks", "sage", "communication", "leadership", "teamwork",
-            "project management", "customer service", "sales", "marketing", "social media",
-            "microsoft office", "computer literacy", "data analysis", "reporting",
-            "budgeting", "planning", "organization", "problem solving", "autocad",
-            "teaching", "nursing", "agriculture", "hotel management"
-        ]
-        
-        found_skills = []
-        for skill in skills_keywords:
-            if skill in text_lower:
-                found_skills.append(skill.title())
-        
-        return found_skills[:5]
+        return skill_matcher.find(text)[:5]  # Limit to top 5 skills
     
     def _generate_apply_url(self, original_url: Optional[str], title: str, company: str) -> str:
         """Generate application URL for the job."""
@@ -375,4 +330,4 @@ class SimpleJobScraper:
             return job_sites[hash(company) % len(job_sites)]
 
 # Global scraper instance
-simple_job_scraper = SimpleJobScraper()
\ No newline at end of file
+simple_job_scraper = SimpleJobScraper(state=crawl_state if settings.SCRAPER_INCREMENTAL else None)
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""Skill extraction over a file-loaded taxonomy with an Aho–Corasick automaton."""
+from typing import List, Dict, Tuple, Optional
+from pathlib import Path
+from collections import deque
+import json
+from app.config import settings
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "skills_taxonomy.json"
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class SkillMatcher:
+    """Finds taxonomy skills in free text in a single pass.
+
+    The taxonomy maps each canonical skill name to its synonyms; the name and
+    every synonym are compiled (case-insensitively) into one Aho–Corasick
+    automaton, so matching costs one walk over the text however many skills
+    there are. A match only counts on word boundaries ("java" does not fire
+    inside "javascript", nor "sql" inside "mysql"), and where matches
+    overlap the leftmost-longest wins ("microsoft excel" rather than
+    "excel").
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        # Trie with failure links: goto[state][char] -> state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at each state as (length, skill, starts with a word char, ends with one)
+        self._output: List[List[Tuple[int, str, bool, bool]]] = [[]]
+
+        for skill, synonyms in taxonomy.items():
+            for pattern in {skill.lower(), *(synonym.lower() for synonym in synonyms)}:
+                pattern = " ".join(pattern.split())
+                if pattern:
+                    self._add(pattern, skill)
+        self._link()
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None) -> "SkillMatcher":
+        """Load a taxonomy JSON file of ``{"Skill": ["synonym", ...]}``."""
+        with open(path or DEFAULT_TAXONOMY_PATH, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _add(self, pattern: str, skill: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state] = [(len(pattern), skill, _is_word_char(pattern[0]), _is_word_char(pattern[-1]))]
+
+    def _link(self) -> None:
+        """Breadth-first pass setting failure links and merging outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """All word-bounded pattern matches as (start, end, skill)."""
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, skill, word_start, word_end in output[state]:
+                start = end - length
+                if word_start and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if word_end and end < len(text) and _is_word_char(text[end]):
+                    continue
+                matches.append((start, end, skill))
+        return matches
+
+    def find(self, text: str) -> List[str]:
+        """Distinct canonical skills mentioned in ``text``, in order of first mention."""
+        if not text:
+            return []
+        text = " ".join(text.lower().split())
+
+        found: List[str] = []
+        seen = set()
+        covered_until = 0
+        # Leftmost-longest, non-overlapping
+        for start, end, skill in sorted(self._matches(text), key=lambda m: (m[0], m[0] - m[1])):
+            if start < covered_until:
+                continue
+            covered_until = end
+            if skill not in seen:
+                seen.add(skill)
+                found.append(skill)
+        return found
+
+
+skill_matcher = SkillMatcher.from_file(settings.SKILLS_TAXONOMY_PATH)
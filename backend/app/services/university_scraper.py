@@ -1,102 +1,39 @@
 """University data scraper for enhanced KCSE recommendations."""
 import requests
-from typing import Dict, List, Any
+from typing import Dict, List, Any, FrozenSet, Iterable, Iterator, Optional, Set, Tuple
+from bisect import bisect_right
+from itertools import islice
+import heapq
 import json
+from .catalogue import Catalogue, CatalogueStore, kcse_catalogue
+
+# Course-name keyword -> interests it appeals to
+COURSE_KEYWORDS = {
+    "computer": ["technology", "programming", "computers", "software"],
+    "engineering": ["technology", "building", "problem solving", "mathematics"],
+    "medicine": ["helping people", "science", "biology", "health"],
+    "business": ["leadership", "management", "entrepreneurship", "finance"],
+    "education": ["teaching", "children", "mentoring", "knowledge"],
+    "agriculture": ["farming", "environment", "plants", "sustainability"],
+    "journalism": ["writing", "communication", "media", "current affairs"],
+    "law": ["justice", "debate", "helping people", "government"]
+}
 
 class UniversityScraper:
     """Scraper for university course and admission data."""
     
-    def __init__(self):
-        self.universities_data = self._load_enhanced_university_data()
-    
-    def _load_enhanced_university_data(self) -> Dict[str, Any]:
-        """Load enhanced university data with real information."""
-        return {
-            "University of Nairobi": {
-                "type": "Public",
-                "website": "https://www.uonbi.ac.ke",
-                "location": "Nairobi",
-                "fees_range": "KSh 16,000 - 120,000",
-                "courses": {
-                    "Medicine": {"cluster_points": 70.0, "duration": "6 years", "fees": "KSh 120,000"},
-                    "Engineering": {"cluster_points": 65.0, "duration": "4 years", "fees": "KSh 45,000"},
-                    "Computer Science": {"cluster_points": 60.0, "duration": "4 years", "fees": "KSh 35,000"},
-                    "Law": {"cluster_points": 68.0, "duration": "4 years", "fees": "KSh 40,000"},
-                    "Business": {"cluster_points": 55.0, "duration": "4 years", "fees": "KSh 30,000"}
-                },
-                "facilities": ["Library", "Computer Labs", "Research Centers", "Sports Complex"],
-                "notable_alumni": ["Wangari Maathai", "Uhuru Kenyatta"],
-                "ranking": "Top 1 in Kenya"
-            },
-            "JKUAT": {
-                "type": "Public",
-                "website": "https://www.jkuat.ac.ke",
-                "location": "Kiambu",
-                "fees_range": "KSh 16,000 - 130,000",
-                "courses": {
-                    "Engineering": {"cluster_points": 65.0, "duration": "4 years", "fees": "KSh 50,000"},
-                    "Computer Science": {"cluster_points": 58.0, "duration": "4 years", "fees": "KSh 40,000"},
-                    "Information Technology": {"cluster_points": 55.0, "duration": "4 years", "fees": "KSh 38,000"},
-                    "Agriculture": {"cluster_points": 50.0, "duration": "4 years", "fees": "KSh 35,000"},
-                    "Architecture": {"cluster_points": 62.0, "duration": "5 years", "fees": "KSh 55,000"}
-                },
-                "facilities": ["Modern Labs", "Innovation Hub", "Incubation Center", "Sports Facilities"],
-                "notable_alumni": ["Tech Entrepreneurs", "Engineers"],
-                "ranking": "Top 3 in Technology"
-            },
-            "Strathmore University": {
-                "type": "Private",
-                "website": "https://www.strathmore.edu",
-                "location": "Nairobi",
-                "fees_range": "KSh 200,000 - 400,000",
-                "courses": {
-                    "Business": {"cluster_points": 55.0, "duration": "4 years", "fees": "KSh 280,000"},
-                    "Information Technology": {"cluster_points": 58.0, "duration": "4 years", "fees": "KSh 320,000"},
-                    "Engineering": {"cluster_points": 62.0, "duration": "4 years", "fees": "KSh 350,000"},
-                    "Actuarial Science": {"cluster_points": 65.0, "duration": "4 years", "fees": "KSh 300,000"},
-                    "Finance": {"cluster_points": 60.0, "duration": "4 years", "fees": "KSh 290,000"}
-                },
-                "facilities": ["State-of-art Labs", "Business Incubator", "Modern Library", "Career Center"],
-                "notable_alumni": ["Business Leaders", "Tech CEOs"],
-                "ranking": "Top Private University"
-            },
-            "Kenyatta University": {
-                "type": "Public",
-                "website": "https://www.ku.ac.ke",
-                "location": "Nairobi",
-                "fees_range": "KSh 16,000 - 100,000",
-                "courses": {
-                    "Education": {"cluster_points": 45.0, "duration": "4 years", "fees": "KSh 25,000"},
-                    "Computer Science": {"cluster_points": 58.0, "duration": "4 years", "fees": "KSh 35,000"},
-                    "Business": {"cluster_points": 52.0, "duration": "4 years", "fees": "KSh 28,000"},
-                    "Psychology": {"cluster_points": 52.0, "duration": "4 years", "fees": "KSh 30,000"},
-                    "Journalism": {"cluster_points": 48.0, "duration": "4 years", "fees": "KSh 32,000"}
-                },
-                "facilities": ["Large Library", "Computer Labs", "Media Center", "Sports Complex"],
-                "notable_alumni": ["Educators", "Media Personalities"],
-                "ranking": "Top 5 in Kenya"
-            },
-            "Moi University": {
-                "type": "Public",
-                "website": "https://www.mu.ac.ke",
-                "location": "Eldoret",
-                "fees_range": "KSh 16,000 - 110,000",
-                "courses": {
-                    "Medicine": {"cluster_points": 68.0, "duration": "6 years", "fees": "KSh 110,000"},
-                    "Engineering": {"cluster_points": 62.0, "duration": "4 years", "fees": "KSh 42,000"},
-                    "Education": {"cluster_points": 45.0, "duration": "4 years", "fees": "KSh 24,000"},
-                    "Agriculture": {"cluster_points": 48.0, "duration": "4 years", "fees": "KSh 30,000"},
-                    "Forestry": {"cluster_points": 50.0, "duration": "4 years", "fees": "KSh 32,000"}
-                },
-                "facilities": ["Medical School", "Research Centers", "Agricultural Farms", "Library"],
-                "notable_alumni": ["Medical Professionals", "Agricultural Experts"],
-                "ranking": "Top 10 in Kenya"
-            }
-        }
+    def __init__(self, catalogue: CatalogueStore = kcse_catalogue):
+        self.catalogue = catalogue
+        self._state: Optional[Tuple[Catalogue, CourseIndex]] = None
+
+    @property
+    def universities_data(self) -> Dict[str, Any]:
+        """Universities of the current catalogue, with their courses (read-only)."""
+        return self.catalogue.current().universities
     
     def get_university_details(self, university_name: str) -> Dict[str, Any]:
         """Get detailed information about a specific university."""
-        return self.universities_data.get(university_name, {})
+        return self.catalogue.current().university(university_name)
     
     def get_course_details(self, university_name: str, course_name: str) -> Dict[str, Any]:
         """Get specific course details from a university."""
@@ -118,62 +55,104 @@ class UniversityScraper:
                 }
         return {}
     
-    def search_courses_by_points(self, cluster_points: float, interests: List[str] = None) -> List[Dict[str, Any]]:
-        """Search for courses based on cluster points and interests."""
+    def search_courses_by_points(self, cluster_points: float, interests: List[str] = None,
+                                 limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search for courses based on cluster points and interests.
+
+        Courses the student qualifies for, best interest match first, then
+        the largest points buffer; ``limit`` keeps only the top ones.
+        """
+        catalogue, index = self._current()
         matching_courses = []
-        
-        for uni_name, uni_data in self.universities_data.items():
-            for course_name, course_details in uni_data.get("courses", {}).items():
-                if cluster_points >= course_details["cluster_points"]:
-                    # Calculate interest match if provided
-                    interest_match = 100  # Default high match
-                    if interests:
-                        interest_match = self._calculate_course_interest_match(course_name, interests)
-                    
-                    matching_courses.append({
-                        "course": course_name,
-                        "university": uni_name,
-                        "cluster_points_required": course_details["cluster_points"],
-                        "duration": course_details["duration"],
-                        "fees": course_details["fees"],
-                        "university_type": uni_data.get("type", "Unknown"),
-                        "location": uni_data.get("location", "Unknown"),
-                        "website": uni_data.get("website", ""),
-                        "interest_match": interest_match,
-                        "points_buffer": cluster_points - course_details["cluster_points"]
-                    })
-        
-        # Sort by interest match and points buffer
-        matching_courses.sort(key=lambda x: (x["interest_match"], x["points_buffer"]), reverse=True)
+        for course, interest_match in index.search(cluster_points, interests, limit):
+            course_name, uni_name, course_details = index.courses[course]
+            uni_data = catalogue.universities[uni_name]
+            matching_courses.append({
+                "course": course_name,
+                "university": uni_name,
+                "cluster_points_required": course_details["cluster_points"],
+                "duration": course_details["duration"],
+                "fees": course_details["fees"],
+                "university_type": uni_data.get("type", "Unknown"),
+                "location": uni_data.get("location", "Unknown"),
+                "website": uni_data.get("website", ""),
+                "interest_match": interest_match,
+                "points_buffer": cluster_points - course_details["cluster_points"]
+            })
         return matching_courses
-    
-    def _calculate_course_interest_match(self, course_name: str, interests: List[str]) -> float:
-        """Calculate how well a course matches user interests."""
-        course_lower = course_name.lower()
-        interests_lower = [interest.lower() for interest in interests]
-        
-        # Define course-interest mappings
-        course_keywords = {
-            "computer": ["technology", "programming", "computers", "software"],
-            "engineering": ["technology", "building", "problem solving", "mathematics"],
-            "medicine": ["helping people", "science", "biology", "health"],
-            "business": ["leadership", "management", "entrepreneurship", "finance"],
-            "education": ["teaching", "children", "mentoring", "knowledge"],
-            "agriculture": ["farming", "environment", "plants", "sustainability"],
-            "journalism": ["writing", "communication", "media", "current affairs"],
-            "law": ["justice", "debate", "helping people", "government"]
-        }
-        
-        matches = 0
-        total_possible = len(interests_lower)
-        
-        for keyword, related_interests in course_keywords.items():
-            if keyword in course_lower:
-                for interest in interests_lower:
-                    if any(related in interest or interest in related for related in related_interests):
-                        matches += 1
-                        break
-        
-        return min(100.0, (matches / total_possible) * 100) if total_possible > 0 else 50.0
+
+    def _current(self) -> Tuple[Catalogue, "CourseIndex"]:
+        """The current catalogue and its course index, rebuilt when the catalogue is reloaded."""
+        catalogue = self.catalogue.current()
+        state = self._state
+        if state is None or state[0] is not catalogue:
+            state = (catalogue, CourseIndex(catalogue))
+            self._state = state
+        return state
+
+
+class CourseIndex:
+    """Every university course, grouped by the ``COURSE_KEYWORDS`` in its name and sorted by cutoff.
+
+    A course's interest match only depends on which keywords its name
+    contains, so courses with the same keywords share one score per
+    search. Within a group, the courses a student qualifies for are a
+    prefix found by bisecting the cutoffs, and the groups' prefixes,
+    already in rank order, are merged through a heap until ``limit``
+    courses are out.
+    """
+
+    def __init__(self, catalogue: Catalogue):
+        # (course name, university name, course details) in catalogue order
+        self.courses: List[Tuple[str, str, Dict[str, Any]]] = [
+            (course_name, uni_name, details)
+            for uni_name, uni_data in catalogue.universities.items()
+            for course_name, details in uni_data.get("courses", {}).items()
+        ]
+        self.cutoffs = [float(cutoff) for cutoff in catalogue.arrays["course_cutoffs"]]
+
+        members: Dict[Tuple[str, ...], List[int]] = {}
+        for course, (course_name, _, _) in enumerate(self.courses):
+            course_lower = course_name.lower()
+            keywords = tuple(keyword for keyword in COURSE_KEYWORDS if keyword in course_lower)
+            members.setdefault(keywords, []).append(course)
+        # (keywords, courses sorted by cutoff then catalogue order, their cutoffs)
+        self.groups: List[Tuple[FrozenSet[str], List[int], List[float]]] = []
+        for keywords, courses in members.items():
+            courses.sort(key=lambda course: (self.cutoffs[course], course))
+            self.groups.append((frozenset(keywords), courses, [self.cutoffs[course] for course in courses]))
+
+    def search(self, cluster_points: float, interests: Optional[List[str]],
+               limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """``(course, interest_match)`` of the best courses with a cutoff of at most ``cluster_points``.
+
+        Ranked by interest match, then lowest cutoff (largest points
+        buffer), then catalogue order.
+        """
+        matched = matched_keywords(interests) if interests else set()
+        ranked = []
+        for keywords, courses, cutoffs in self.groups:
+            eligible = bisect_right(cutoffs, cluster_points)
+            if not eligible:
+                continue
+            interest_match = 100
+            if interests:
+                interest_match = min(100.0, (len(keywords & matched) / len(interests)) * 100)
+            ranked.append(self._ranked(islice(courses, eligible), interest_match))
+        return [(course, interest_match) for _, _, course, interest_match in islice(heapq.merge(*ranked), limit)]
+
+    def _ranked(self, courses: Iterable[int], interest_match: float) -> Iterator[Tuple[float, float, int, float]]:
+        """Sort keys of one group's courses, which are already in rank order."""
+        for course in courses:
+            yield -interest_match, self.cutoffs[course], course, interest_match
+
+
+def matched_keywords(interests: List[str]) -> Set[str]:
+    """``COURSE_KEYWORDS`` with a related interest containing, or contained in, one of ``interests``."""
+    interests_lower = [interest.lower() for interest in interests]
+    return {keyword for keyword, related_interests in COURSE_KEYWORDS.items()
+            if any(related in interest or interest in related
+                   for interest in interests_lower for related in related_interests)}
+
 
 university_scraper = UniversityScraper()
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""Background job scraping: scheduled refreshes and on-demand runs."""
+from app.config import settings
+from app.database import async_redis_client
+from app.services.simple_job_scraper import simple_job_scraper
+from app.services.job_store import job_store
+from redis.exceptions import RedisError
+from typing import Dict, Optional, Any
+from datetime import datetime
+import asyncio
+import uuid
+
+RUN_KEY = "scraper_run:{}"
+LOCK_KEY = "scraper:lock"
+RUN_TTL = 86400
+MAX_RUNS = 50
+
+
+class ScrapeScheduler:
+    """Runs scrapes off the request path and tracks each run's status.
+
+    ``submit`` records a run and starts it as an asyncio task, returning at
+    once with the run's ID; callers poll ``get_run``. While a run is queued
+    or running, further submits join it instead of starting another. A
+    Redis lock keeps several app workers from scraping at the same time,
+    and results land through ``job_store.merge_jobs``, whose single
+    MULTI/EXEC transaction swaps the stored corpus in one step, so readers
+    never see a half-written scrape; jobs past ``JOB_MAX_AGE_DAYS`` are
+    then removed with ``job_store.expire_jobs``. ``start`` also refreshes on a fixed
+    ``SCRAPER_REFRESH_INTERVAL``.
+    """
+
+    def __init__(self, scraper=simple_job_scraper, store=job_store, redis=async_redis_client,
+                 interval: Optional[int] = None, timeout: Optional[int] = None):
+        self.scraper = scraper
+        self.store = store
+        self.redis = redis
+        self.interval = interval or settings.SCRAPER_REFRESH_INTERVAL
+        self.timeout = timeout or settings.SCRAPER_RUN_TIMEOUT
+        self.runs: Dict[str, Dict[str, Any]] = {}
+        self._active: Optional[str] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._schedule: Optional[asyncio.Task] = None
+
+    async def submit(self, max_jobs: int = 30, trigger: str = "manual") -> Dict[str, Any]:
+        """Start a scrape in the background (or join the one in progress); returns its run record."""
+        if self._active and self.runs[self._active]["status"] in ("queued", "running"):
+            return self.runs[self._active]
+
+        run = {
+            "run_id": uuid.uuid4().hex,
+            "status": "queued",
+            "trigger": trigger,
+            "max_jobs": max_jobs,
+            "jobs_count": 0,
+            "expired_count": 0,
+            "error": None,
+            "queued_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self._remember(run)
+        self._active = run["run_id"]
+        await self._publish(run)
+        self._tasks[run["run_id"]] = asyncio.create_task(self._execute(run))
+        return run
+
+    async def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a run started by this worker or, via Redis, by another one."""
+        return self.runs.get(run_id) or await self.redis.get_cache(RUN_KEY.format(run_id))
+
+    async def wait(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Wait for a run started by this worker to finish."""
+        task = self._tasks.get(run_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return await self.get_run(run_id)
+
+    def start(self) -> None:
+        """Begin scheduled refreshes (one right away, then every ``interval`` seconds)."""
+        if self._schedule is None or self._schedule.done():
+            self._schedule = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        """Cancel scheduled refreshes and any run still in progress."""
+        tasks = [task for task in [self._schedule, *self._tasks.values()] if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._schedule = None
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            run = await self.submit(trigger="schedule")
+            await self.wait(run["run_id"])
+            await asyncio.sleep(self.interval)
+
+    async def _execute(self, run: Dict[str, Any]) -> None:
+        token = run["run_id"]
+        try:
+            if await self._lock(token):
+                run.update(status="running", started_at=datetime.utcnow().isoformat())
+                await self._publish(run)
+                try:
+                    jobs = await asyncio.wait_for(self.scraper.scrape_all_jobs(run["max_jobs"]), self.timeout)
+                    if jobs:
+                        await self.store.merge_jobs(jobs, ttl=3600)
+                    # Retract listings past JOB_MAX_AGE_DAYS from the indexes and analytics totals
+                    expired = await self.store.expire_jobs()
+                    run.update(status="succeeded", jobs_count=len(jobs), expired_count=expired)
+                finally:
+                    await self._unlock(token)
+            else:
+                run.update(status="skipped", error="Another worker is already scraping")
+        except asyncio.CancelledError:
+            run["status"] = "cancelled"
+            await asyncio.shield(self._finish(run))
+            raise
+        except asyncio.TimeoutError:
+            run.update(status="failed", error=f"Timed out after {self.timeout}s")
+        except Exception as e:
+            run.update(status="failed", error=str(e))
+        await self._finish(run)
+
+    async def _finish(self, run: Dict[str, Any]) -> None:
+        """Stamp a run that has ended, forget its task and publish the final status."""
+        run["finished_at"] = datetime.utcnow().isoformat()
+        self._tasks.pop(run["run_id"], None)
+        print(f"Scrape run {run['run_id']} ({run['trigger']}): {run['status']}, {run['jobs_count']} jobs"
+              + (f" - {run['error']}" if run["error"] else ""))
+        await self._publish(run)
+
+    def _remember(self, run: Dict[str, Any]) -> None:
+        self.runs[run["run_id"]] = run
+        while len(self.runs) > MAX_RUNS:
+            del self.runs[next(iter(self.runs))]
+
+    async def _publish(self, run: Dict[str, Any]) -> None:
+        """Share the run's status with other workers."""
+        await self.redis.set_cache(RUN_KEY.format(run["run_id"]), run, ttl=RUN_TTL)
+
+    async def _lock(self, token: str) -> bool:
+        if self.redis.client is None:
+            return True
+        try:
+            return bool(await self.redis.client.set(LOCK_KEY, token, nx=True, ex=self.timeout + 60))
+        except RedisError:
+            # Without Redis there are no other workers to coordinate with
+            return True
+
+    async def _unlock(self, token: str) -> None:
+        if self.redis.client is None:
+            return
+        try:
+            if await self.redis.client.get(LOCK_KEY) == token:
+                await self.redis.client.delete(LOCK_KEY)
+        except RedisError:
+            pass
+
+
+scrape_scheduler = ScrapeScheduler()
@@ -0,0 +1,103 @@
+"""Size and speed of the cache value codecs on a synthetic scraped-jobs corpus.
+
+Builds ``--jobs`` (default 10k) jobs shaped like the ``scraped_jobs`` blob
+(repetitive titles, companies, descriptions and skill lists) and, for each
+installed codec with and without zstd, reports the stored size and the
+median encode/decode time over ``--repeat`` runs. ``legacy`` is the
+previous ``json.dumps`` text format.
+
+No Redis is needed; only the encoding is measured.
+
+Run from the backend directory: ``python scripts/bench_cache_codecs.py``
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import CODECS, ZSTD_AVAILABLE, decode_value, encode_value  # noqa: E402
+
+TITLES = [
+    "Software Developer", "Data Analyst", "Accountant", "Sales Executive", "Registered Nurse",
+    "Secondary School Teacher", "Civil Engineer", "Customer Care Agent", "Hotel Manager", "Agronomist",
+]
+COMPANIES = [
+    "Safaricom PLC", "Equity Bank", "KCB Group", "Kenya Airways", "Nation Media Group",
+    "Unilever Kenya", "Aga Khan University Hospital", "Serena Hotels", "Airtel Kenya", "Twiga Foods",
+]
+LOCATIONS = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika"]
+PHRASES = [
+    "Join a fast-growing team in Nairobi.", "Support daily operations and reporting.",
+    "Work with customers across East Africa.", "Prepare monthly financial statements.",
+    "Maintain computer systems and networks.", "Teach and mentor students.",
+    "Provide patient care in the outpatient clinic.", "Coordinate deliveries and fleet schedules.",
+]
+SKILLS = ["Python", "SQL", "Excel", "Communication", "Sales", "Accounting", "Patient Care", "AutoCAD",
+          "Customer Service", "Leadership", "Power BI", "Teaching"]
+
+
+def synthetic_jobs(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        title = rng.choice(TITLES)
+        jobs.append({
+            "id": i,
+            "title": title,
+            "company": rng.choice(COMPANIES),
+            "location": rng.choice(LOCATIONS),
+            "description": " ".join(rng.sample(PHRASES, 3)),
+            "salary": rng.randrange(40_000, 300_000, 1000),
+            "category": "tech",
+            "skills": rng.sample(SKILLS, 4),
+            "apply_url": f"https://www.brightermonday.co.ke/listings/{title.lower().replace(' ', '-')}-{i}",
+            "source": rng.choice(["BrighterMonday", "MyJobMag", "Fuzu", "Indeed Kenya"]),
+            "posted_date": f"2024-0{rng.randint(1, 9)}-{rng.randint(10, 28)}",
+        })
+    return jobs
+
+
+def median_ms(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs)
+    print(f"{'codec':<16} {'bytes':>12} {'encode':>10} {'decode':>10}")
+
+    legacy = json.dumps(jobs)
+    print(f"{'legacy':<16} {len(legacy.encode()):>12,} "
+          f"{median_ms(lambda: json.dumps(jobs), args.repeat):>8.1f}ms "
+          f"{median_ms(lambda: json.loads(legacy), args.repeat):>8.1f}ms")
+
+    for codec in CODECS.values():
+        if not codec.available:
+            print(f"{codec.name:<16} not installed")
+            continue
+        for compress in ([False, True] if ZSTD_AVAILABLE else [False]):
+            stored = encode_value(jobs, codec=codec, compress=compress)
+            assert decode_value(stored) == jobs
+            label = codec.name + ("+zstd" if compress else "")
+            print(f"{label:<16} {len(stored):>12,} "
+                  f"{median_ms(lambda: encode_value(jobs, codec=codec, compress=compress), args.repeat):>8.1f}ms "
+                  f"{median_ms(lambda: decode_value(stored), args.repeat):>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
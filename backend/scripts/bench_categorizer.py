@@ -0,0 +1,101 @@
+"""Throughput benchmark for job categorization over synthetic job titles.
+
+Generates ``--titles`` (default 100k) synthetic titles with short
+descriptions and categorizes them three ways:
+
+``legacy``  the old per-call keyword-dict scan (dict rebuilt every call,
+            first matching category wins), reproduced here as the baseline
+``single``  ``JobCategorizer.categorize`` called once per job
+``batch``   ``JobCategorizer.categorize_batch`` over the whole list
+
+and reports titles/s for each, plus how often the scored result agrees
+with the legacy first-match answer.
+
+Run from the backend directory: ``python scripts/bench_categorizer.py``
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.categorizer import job_categorizer  # noqa: E402
+
+SENIORITY = ["", "Junior", "Senior", "Lead", "Graduate", "Principal", "Assistant"]
+ROLES = [
+    "Software Developer", "Data Analyst", "IT Support Officer", "Accountant", "Credit Analyst",
+    "Sales Executive", "Marketing Officer", "Secondary School Teacher", "Lecturer", "Registered Nurse",
+    "Clinical Officer", "Chef", "Hotel Receptionist", "Agronomist", "Farm Manager", "Civil Engineer",
+    "Electrical Technician", "Truck Driver", "Logistics Coordinator", "Customer Care Agent",
+    "Operations Manager", "Graphic Designer", "Security Guard", "Procurement Officer",
+]
+PHRASES = [
+    "Join a fast-growing team in Nairobi.", "Support daily operations and reporting.",
+    "Work with customers across East Africa.", "Prepare monthly financial statements.",
+    "Maintain computer systems and networks.", "Teach and mentor students.",
+    "Provide patient care in the outpatient clinic.", "Coordinate deliveries and fleet schedules.",
+]
+
+
+def synthetic_jobs(count: int, seed: int = 7) -> Tuple[List[str], List[str]]:
+    """Random (title, description) pairs drawn from common Kenyan job titles."""
+    rng = random.Random(seed)
+    titles = [f"{rng.choice(SENIORITY)} {rng.choice(ROLES)}".strip() for _ in range(count)]
+    descriptions = [" ".join(rng.sample(PHRASES, 2)) for _ in range(count)]
+    return titles, descriptions
+
+
+def legacy_categorize(title: str, description: str) -> str:
+    """The previous scraper implementation, kept as the baseline."""
+    text = f"{title} {description}".lower()
+
+    categories = {
+        "tech": ["developer", "programmer", "software", "IT", "computer", "data", "analyst", "engineer"],
+        "finance": ["accountant", "finance", "banking", "audit", "financial", "economist"],
+        "sales": ["sales", "marketing", "business development", "account manager"],
+        "education": ["teacher", "lecturer", "instructor", "education", "academic"],
+        "healthcare": ["nurse", "doctor", "medical", "health", "clinical"],
+        "hospitality": ["hotel", "restaurant", "chef", "waiter", "hospitality", "tourism"],
+        "agriculture": ["agriculture", "farming", "agricultural", "livestock", "crop"],
+        "management": ["manager", "director", "supervisor", "coordinator", "lead"],
+        "customer_service": ["customer service", "support", "receptionist", "call center"],
+        "logistics": ["logistics", "transport", "driver", "delivery", "supply chain"]
+    }
+
+    for category, keywords in categories.items():
+        if any(keyword in text for keyword in keywords):
+            return category
+
+    return "other"
+
+
+def timed(label: str, count: int, func) -> List[str]:
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    print(f"{label:<7} {count / seconds:12,.0f} titles/s   ({seconds:6.2f}s)")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    titles, descriptions = synthetic_jobs(args.titles)
+    pairs = list(zip(titles, descriptions))
+
+    legacy = timed("legacy", args.titles, lambda: [legacy_categorize(t, d) for t, d in pairs])
+    single = timed("single", args.titles, lambda: [job_categorizer.categorize(t, d) for t, d in pairs])
+    batch = timed("batch", args.titles, lambda: job_categorizer.categorize_batch(titles, descriptions))
+
+    assert single == batch, "batch and per-job categorization disagree"
+    agreement = sum(a == b for a, b in zip(legacy, batch)) / args.titles
+    print(f"agreement with legacy first-match: {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    main()
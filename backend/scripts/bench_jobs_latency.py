@@ -0,0 +1,172 @@
+"""Latency benchmark for the /api/jobs cache path under high concurrency.
+
+Two modes:
+
+``cache``  Runs in-process against a reachable Redis (see app.config).
+           500 concurrent coroutines each perform /api/jobs-style cache
+           lookups, first through the blocking ``RedisClient`` ("before")
+           and then through the pooled ``AsyncRedisClient`` ("after").
+           Alongside them a probe coroutine wakes every millisecond and
+           records how late it runs: that is how long any other request
+           on the same worker is stalled, which a blocking call hides
+           from its own timing. Reports p50/p95/p99 of both, plus lookup
+           throughput. The in-process L1 cache is disabled, so every
+           "after" lookup makes a Redis round-trip.
+
+``http``   Fires concurrent GETs at a running server, e.g. once against a
+           checkout before the async Redis change and once after:
+
+               python scripts/bench_jobs_latency.py http --url http://localhost:8000/api/jobs
+
+Run from the backend directory: ``python scripts/bench_jobs_latency.py cache``
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import redis_client, async_redis_client  # noqa: E402
+from app.services.cache_service import get_cache_key  # noqa: E402
+
+BENCH_KEY = get_cache_key("jobs", {"bench": True})
+PROBE_INTERVAL = 0.001
+BENCH_PAYLOAD = [
+    {
+        "id": i,
+        "title": f"Software Developer {i}",
+        "company": "Safaricom PLC",
+        "location": "Nairobi",
+        "description": "Develop mobile applications and web solutions.",
+        "salary": 120000,
+        "category": "tech",
+        "skills": ["Python", "Java", "SQL"],
+    }
+    for i in range(30)
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of latency samples (in ms)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(label: str, samples: List[float], wall: float) -> None:
+    """Print a one-line latency summary."""
+    print(
+        f"{label:<14} n={len(samples):<6} "
+        f"p50={percentile(samples, 50):8.2f}ms "
+        f"p95={percentile(samples, 95):8.2f}ms "
+        f"p99={percentile(samples, 99):8.2f}ms "
+        f"mean={statistics.mean(samples):8.2f}ms "
+        f"throughput={len(samples) / wall:8.0f} req/s"
+    )
+
+
+def report_stalls(label: str, delays: List[float]) -> None:
+    """Print a one-line summary of the probe's wake-up delays."""
+    print(
+        f"{label:<14} n={len(delays):<6} "
+        f"p50={percentile(delays, 50):8.2f}ms "
+        f"p95={percentile(delays, 95):8.2f}ms "
+        f"p99={percentile(delays, 99):8.2f}ms "
+        f"max={max(delays):8.2f}ms"
+    )
+
+
+async def _run_clients(request, clients: int, rounds: int) -> Tuple[List[float], float]:
+    """Drive ``clients`` concurrent request loops and report latencies."""
+    samples: List[float] = []
+
+    async def client():
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await request()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return samples, time.perf_counter() - start
+
+
+async def _probe(stop: asyncio.Event) -> List[float]:
+    """How late (ms) a coroutine sleeping ``PROBE_INTERVAL`` at a time wakes up, until ``stop`` is set."""
+    delays: List[float] = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+    return delays
+
+
+async def _run_with_probe(label: str, request, clients: int, rounds: int) -> None:
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop))
+    await asyncio.sleep(0)
+    samples, wall = await _run_clients(request, clients, rounds)
+    stop.set()
+    delays = await probe
+    report(label, samples, wall)
+    report_stalls(f"{label} stalls", delays)
+
+
+async def bench_cache(clients: int, rounds: int) -> None:
+    """Compare the blocking and pooled clients on the same cache key."""
+    if not redis_client.connected:
+        sys.exit("Redis is not reachable; start it (docker-compose up redis) and retry.")
+
+    redis_client.set_cache(BENCH_KEY, BENCH_PAYLOAD, ttl=600)
+    # Measure the Redis path, not in-process L1 hits
+    async_redis_client.l1.max_size = 0
+    async_redis_client.l1.clear()
+
+    async def blocking_lookup():
+        # What the routes did before: a sync call inside an async handler.
+        redis_client.get_cache(BENCH_KEY)
+
+    async def pooled_lookup():
+        await async_redis_client.get_cache(BENCH_KEY)
+
+    await _run_with_probe("before", blocking_lookup, clients, rounds)
+    await _run_with_probe("after", pooled_lookup, clients, rounds)
+    await async_redis_client.close()
+
+
+async def bench_http(url: str, clients: int, rounds: int) -> None:
+    """Measure end-to-end latency of a running server."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        await http.get(url)  # warm the response cache
+
+        async def fetch():
+            response = await http.get(url)
+            response.raise_for_status()
+
+        samples, wall = await _run_clients(fetch, clients, rounds)
+    report("http", samples, wall)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["cache", "http"])
+    parser.add_argument("--url", default="http://localhost:8000/api/jobs")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.mode == "cache":
+        asyncio.run(bench_cache(args.clients, args.rounds))
+    else:
+        asyncio.run(bench_http(args.url, args.clients, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
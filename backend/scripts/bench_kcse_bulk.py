@@ -0,0 +1,93 @@
+"""Bulk KCSE guidance: score matrix vs one lookup per student.
+
+Builds a synthetic catalogue of ``--programmes`` (default 1k) programmes and
+``--students`` (default 50k) students with realistic interest/subject lists,
+then times:
+
+- ``matrix``: ``EligibilityIndex.recommend_many`` over chunks of
+  ``BULK_CHUNK_SIZE`` students (what ``/kcse/bulk-career-guidance`` uses)
+- ``per-student``: ``EligibilityIndex.recommend`` for each student (what
+  one ``/kcse/career-guidance`` call per student costs), timed on
+  ``--sample`` students and extrapolated
+
+Run from the backend directory: ``python scripts/bench_kcse_bulk.py``
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.eligibility_index import EligibilityIndex  # noqa: E402
+from app.services.kcse_service import BULK_CHUNK_SIZE  # noqa: E402
+
+INTERESTS = [
+    "science", "helping people", "biology", "chemistry", "technology", "problem solving", "mathematics",
+    "building", "programming", "computers", "leadership", "business", "management", "entrepreneurship",
+    "economics", "finance", "law", "justice", "writing", "communication", "media", "art", "design",
+    "creativity", "music", "teaching", "agriculture", "environment", "travel", "sports", "psychology",
+    "nursing", "pharmacy", "architecture", "engineering", "data", "statistics", "history", "languages",
+]
+SUBJECTS = [
+    "Mathematics", "English", "Kiswahili", "Biology", "Chemistry", "Physics", "Geography", "History",
+    "CRE", "Business Studies", "Agriculture", "Computer Studies", "Art", "Music", "French", "Home Science",
+]
+
+
+def synthetic_programmes(count: int, rng: random.Random) -> Dict[str, Dict[str, Any]]:
+    return {
+        f"Programme {i}": {
+            "cluster_points": round(rng.uniform(20, 84), 3),
+            "interests": rng.sample(INTERESTS, rng.randint(2, 5)),
+            "subjects": rng.sample(SUBJECTS, rng.randint(2, 4)),
+        }
+        for i in range(count)
+    }
+
+
+def synthetic_students(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {
+            "cluster_points": round(rng.uniform(15, 84), 3),
+            "interests": rng.sample(INTERESTS, rng.randint(1, 4)),
+            "preferred_subjects": rng.sample(SUBJECTS, rng.randint(0, 3)),
+        }
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--programmes", type=int, default=1_000)
+    parser.add_argument("--sample", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    started = time.perf_counter()
+    index = EligibilityIndex(synthetic_programmes(args.programmes, rng))
+    print(f"index build ({args.programmes:,} programmes): {(time.perf_counter() - started) * 1000:.1f}ms")
+    students = synthetic_students(args.students, rng)
+
+    started = time.perf_counter()
+    for start in range(0, len(students), BULK_CHUNK_SIZE):
+        chunk = students[start:start + BULK_CHUNK_SIZE]
+        index.recommend_many([s["cluster_points"] for s in chunk], [s["interests"] for s in chunk],
+                             [s["preferred_subjects"] for s in chunk])
+    matrix = time.perf_counter() - started
+
+    sample = students[:min(args.sample, len(students))]
+    started = time.perf_counter()
+    for s in sample:
+        index.recommend(s["cluster_points"], s["interests"], s["preferred_subjects"])
+    per_student = (time.perf_counter() - started) / len(sample) * len(students)
+
+    print(f"{'matrix':<12} {matrix:>8.2f}s  ({len(students) / matrix:,.0f} students/s)")
+    print(f"{'per-student':<12} {per_student:>8.2f}s  (extrapolated from {len(sample):,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Parse-throughput benchmark for the scraper HTML parser backends.
+
+Runs every installed backend (see ``app.services.html_parser``) over the
+saved listing pages in ``tests/fixtures/job_sites`` and reports, per
+backend, pages/s for parsing plus card selection and jobs/s for full
+field extraction through ``JobScraper``. Pages can be repeated into one
+larger document with ``--scale`` to approximate real listing pages, which
+carry far more markup than the fixtures.
+
+Run from the backend directory: ``python scripts/bench_parsers.py``
+"""
+import argparse
+import os
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.html_parser import available_backends, get_parser  # noqa: E402
+from app.services.job_scraper import JobScraper, SOURCES  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "job_sites"
+
+
+def load_pages(scale: int) -> Dict[str, List[bytes]]:
+    """Fixture listing pages per source, each body repeated ``scale`` times."""
+    pages = {}
+    for name in SOURCES:
+        bodies = []
+        for path in sorted(FIXTURES_DIR.glob(f"{name.lower()}_[0-9].html")):
+            html = path.read_text(encoding="utf-8")
+            head, _, rest = html.partition("<body>")
+            body, _, tail = rest.partition("</body>")
+            bodies.append(f"{head}<body>{body * scale}</body>{tail}".encode("utf-8"))
+        pages[name] = bodies
+    return pages
+
+
+def bench_backend(backend: str, pages: Dict[str, List[bytes]], rounds: int) -> Dict[str, float]:
+    """Time parse+select and parse+extract over every page ``rounds`` times."""
+    scraper = JobScraper()
+    scraper.parser = parser = get_parser(backend)
+    extractors = {name: partial(scraper._extract_job, name) for name in pages}
+    n_pages = sum(len(bodies) for bodies in pages.values()) * rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name, bodies in pages.items():
+            for html in bodies:
+                parser.select_any(parser.parse(html), SOURCES[name]["cards"])
+    select_seconds = time.perf_counter() - started
+
+    jobs = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name, bodies in pages.items():
+            for html in bodies:
+                for card in parser.select_any(parser.parse(html), SOURCES[name]["cards"]):
+                    jobs += extractors[name](card) is not None
+    extract_seconds = time.perf_counter() - started
+
+    return {
+        "pages_per_sec": n_pages / select_seconds,
+        "jobs_per_sec": jobs / extract_seconds,
+        "jobs": jobs / rounds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=20, help="repeat each page body this many times")
+    parser.add_argument("--backend", action="append", choices=available_backends(),
+                        help="backend(s) to run (default: every installed one)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.scale)
+    results = {name: bench_backend(name, pages, args.rounds) for name in args.backend or available_backends()}
+
+    baseline = results.get("bs4")
+    for name, result in results.items():
+        speedup = f"{result['pages_per_sec'] / baseline['pages_per_sec']:5.1f}x" if baseline else "   - "
+        print(f"{name:<11} parse+select {result['pages_per_sec']:9.1f} pages/s ({speedup} vs bs4)   "
+              f"extract {result['jobs_per_sec']:9.1f} jobs/s   ({result['jobs']:.0f} jobs/round)")
+
+
+if __name__ == "__main__":
+    main()
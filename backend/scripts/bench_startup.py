@@ -0,0 +1,64 @@
+"""Time from process start to the first served request, with and without the Gemini probe.
+
+Each mode runs in a fresh interpreter, which imports the app, runs its
+startup hooks and serves ``GET /health`` through the test client:
+
+- ``lazy``: the current behaviour; Gemini model discovery starts in the
+  background at startup and does not hold up the first request.
+- ``probe``: the previous behaviour; model discovery (``list_models`` plus
+  a live ``generate_content`` probe per candidate model, ignoring any cached
+  model name) runs before the app can serve.
+
+Without a ``GEMINI_API_KEY`` both modes skip discovery, so set one to see
+the difference. Scheduled scraping is disabled for the measurement.
+
+Run from the backend directory: ``python scripts/bench_startup.py``
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, os, time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.gemini_service import gemini_service
+imported = time.perf_counter()
+if {probe}:
+    gemini_service.initialize(refresh=True)
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    client.get("/health")
+    served = time.perf_counter()
+print(json.dumps({{"import": imported - started, "startup": ready - imported, "first_request": served - started}}))
+os._exit(0)  # do not wait for a background discovery still in flight
+"""
+
+
+def run(probe: bool) -> dict:
+    env = dict(os.environ, SCRAPER_SCHEDULE_ENABLED="false")
+    output = subprocess.run([sys.executable, "-c", CHILD.format(probe=probe)], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'import':>10} {'startup':>10} {'first request':>15}")
+    for mode in ("lazy", "probe"):
+        runs = [run(probe=mode == "probe") for _ in range(args.repeat)]
+        median = {field: statistics.median(r[field] for r in runs) * 1000 for field in runs[0]}
+        print(f"{mode:<8} {median['import']:>8.0f}ms {median['startup']:>8.0f}ms {median['first_request']:>13.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
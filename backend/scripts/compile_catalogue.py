@@ -0,0 +1,26 @@
+"""Compile the KCSE catalogue JSON into the memory-mapped binary the app serves from.
+
+Running workers pick up the new file within ``KCSE_CATALOGUE_CHECK_INTERVAL``
+seconds, so updated KUCCPS cutoffs apply without a restart.
+
+Run from the backend directory: ``python scripts/compile_catalogue.py [--source S] [--output O]``
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalogue import compile_catalogue  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", help="JSON catalogue (default: KCSE_CATALOGUE_SOURCE or app/data/kcse_catalogue.json)")
+    parser.add_argument("--output", help="compiled file (default: KCSE_CATALOGUE_PATH or app/data/kcse_catalogue.bin)")
+    args = parser.parse_args()
+    print(f"Compiled catalogue version {compile_catalogue(args.source, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Shared pytest fixtures."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import hashlib
+import threading
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "job_sites"
+
+# Request path -> saved listing page
+STUB_PAGES = {
+    "/brightermonday/jobs": "brightermonday_1.html",
+    "/brightermonday/jobs?page=2": "brightermonday_2.html",
+    "/brightermonday/linked": "brightermonday_1.html",
+    "/myjobmag/jobs": "myjobmag_1.html",
+    "/myjobmag/jobs/page/2": "myjobmag_2.html",
+    "/fuzu/jobs": "fuzu_1.html",
+    "/fuzu/jobs?page=2": "fuzu_2.html",
+    "/fuzu/job/data-analyst": "fuzu_detail.html",
+}
+
+
+class _StubJobSiteHandler(BaseHTTPRequestHandler):
+    """Serves the saved fixture pages with ETags (honouring If-None-Match); anything else is a 404."""
+
+    def do_GET(self):
+        page = STUB_PAGES.get(self.path)
+        if page is None:
+            self.send_error(404)
+            return
+        body = (FIXTURES_DIR / page).read_bytes()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_job_site():
+    """Local HTTP server standing in for the job sites; yields its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubJobSiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_sources(stub_job_site):
+    """Scraper source config pointing at the stub server.
+
+    Per-source rate overrides are dropped: every source shares the stub's host.
+    """
+    from app.services.job_scraper import SOURCES
+
+    paths = {
+        "BrighterMonday": ("/brightermonday/jobs", "/brightermonday/jobs?page={page}"),
+        "MyJobMag": ("/myjobmag/jobs", "/myjobmag/jobs/page/{page}"),
+        "Fuzu": ("/fuzu/jobs", "/fuzu/jobs?page={page}"),
+    }
+    return {
+        name: dict({key: value for key, value in SOURCES[name].items() if key not in ("rate", "burst", "concurrency")},
+                    url=stub_job_site + first, page_url=stub_job_site + page)
+        for name, (first, page) in paths.items()
+    }
+
+
+@pytest.fixture
+def fake_redis():
+    """Factory for ``RedisClient``/``AsyncRedisClient`` instances backed by one shared in-memory fakeredis server.
+
+    Call it with ``asynchronous=True`` for an ``AsyncRedisClient``; its
+    connections are bound to the first event loop that uses them.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    from app.database import AsyncRedisClient, RedisClient
+
+    server = fakeredis.FakeServer()
+
+    def make(asynchronous: bool = False):
+        if asynchronous:
+            redis = AsyncRedisClient()
+            redis.pool = redis.raw_pool = None
+            redis.client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            redis.raw = fakeredis.FakeAsyncRedis(server=server)
+            return redis
+        redis = RedisClient.__new__(RedisClient)
+        redis.client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        redis.raw = fakeredis.FakeRedis(server=server)
+        redis.connected = True
+        return redis
+
+    return make
+
+
+@pytest.fixture
+def fake_job_store(fake_redis, monkeypatch):
+    """Points the global ``job_store``, analytics totals and API cache at a fresh fakeredis; yields the client.
+
+    The in-process search index and job table are replaced with empty ones.
+    """
+    from app.services import cache_service, job_store as job_store_module
+    from app.services.analytics_aggregates import analytics_aggregates
+    from app.services.job_table import JobTable
+    from app.services.search_index import SearchIndex
+    from app.routes import analytics as analytics_routes, jobs as jobs_routes
+
+    redis = fake_redis(asynchronous=True)
+    monkeypatch.setattr(job_store_module.job_store, "redis", redis)
+    monkeypatch.setattr(analytics_aggregates, "redis", redis)
+    monkeypatch.setattr(cache_service, "async_redis_client", redis)
+    index = SearchIndex()
+    monkeypatch.setattr(job_store_module, "search_index", index)
+    monkeypatch.setattr(jobs_routes, "search_index", index)
+    table = JobTable()
+    monkeypatch.setattr(job_store_module, "job_table", table)
+    monkeypatch.setattr(analytics_routes, "job_table", table)
+    return redis
@@ -0,0 +1,119 @@
+"""Route-level tests."""
+import asyncio
+import json
+import httpx
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.services.job_store import job_store
+from app.services.kcse_service import kcse_service
+from app.tasks.scrapping_tasks import scrape_scheduler
+
+client = TestClient(app)
+
+
+def test_bulk_career_guidance_streams_csv_and_ndjson_results():
+    csv_upload = (
+        "student_id,cluster_points,interests,preferred_subjects,budget_range\n"
+        "S1,62.5,technology;problem solving,Mathematics;Physics,low\n"
+        "S2,not-a-number,art,,\n"
+        "S3,40,business,,\n"
+    )
+    response = client.post("/api/kcse/bulk-career-guidance",
+                           files={"file": ("class.csv", csv_upload, "text/csv")})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [line["row"] for line in lines] == [1, 2, 3]
+    single = kcse_service.get_career_recommendations(62.5, ["technology", "problem solving"],
+                                                     ["Mathematics", "Physics"], "low")
+    assert lines[0]["student_id"] == "S1" and lines[0]["budget_range"] == "low"
+    assert lines[0]["eligible_careers"] == single["eligible"]
+    assert lines[0]["related_careers"] == single["related"]
+    assert "error" in lines[1]
+    assert lines[2]["alternative_paths"]
+
+    ndjson_upload = '{"student_id": 7, "cluster_points": 62.5, "interests": ["technology", "problem solving"], ' \
+                    '"preferred_subjects": ["Mathematics", "Physics"]}\n\n{"cluster_points": 50\n'
+    response = client.post("/api/kcse/bulk-career-guidance",
+                           files={"file": ("class.ndjson", ndjson_upload, "application/x-ndjson")})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["student_id"] == 7 and lines[0]["eligible_careers"] == single["eligible"]
+    assert lines[1]["row"] == 2 and lines[1]["error"].startswith("Invalid JSON")
+
+
+STORED_JOBS = [
+    {"id": 101, "title": "Python Developer", "company": "Safari Tech", "salary": 120000, "location": "Nairobi",
+     "category": "tech", "description": "Build Django and FastAPI services", "skills": ["Python", "Django"],
+     "source": "BrighterMonday"},
+    {"id": 102, "title": "Clinical Nurse", "company": "Coast Hospital", "salary": 70000, "location": "Mombasa",
+     "category": "healthcare", "description": "Ward nursing and patient care", "skills": ["Nursing"],
+     "source": "Fuzu"},
+    {"id": 103, "title": "Senior Python Engineer", "company": "Lakeside Data", "salary": 200000,
+     "location": "Kisumu", "category": "tech", "description": "Data pipelines in Python",
+     "skills": ["Python", "SQL"], "source": "MyJobMag"},
+]
+
+
+def test_jobs_route_reads_from_the_job_store(fake_job_store):
+    async def scenario():
+        await job_store.save_jobs([dict(job) for job in STORED_JOBS])
+        # One event loop for the seeding and the requests, as the fake Redis connections are bound to it
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            response = await http.get("/api/jobs")
+            assert response.status_code == 200
+            assert [job["id"] for job in response.json()] == [101, 102, 103]
+
+            async def ids(**params):
+                return [job["id"] for job in (await http.get("/api/jobs", params=params)).json()]
+
+            assert await ids(category="tech") == [101, 103]
+            assert await ids(location="mombasa") == [102]
+            assert await ids(salary_min=150000) == [103]
+            assert await ids(category="tech", location="mombasa") == []
+            assert (await http.get("/api/jobs/102")).json()["title"] == "Clinical Nurse"
+
+    asyncio.run(scenario())
+
+
+def test_jobs_route_full_text_search_is_ranked_and_filtered(fake_job_store):
+    async def scenario():
+        await job_store.save_jobs([dict(job) for job in STORED_JOBS])
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            async def ids(**params):
+                return [job["id"] for job in (await http.get("/api/jobs", params=params)).json()]
+
+            assert await ids(q="python") == [103, 101]
+            assert await ids(q="python engineer") == [103]
+            assert await ids(q="pyth", location="kisumu") == [103]
+            assert await ids(q="nursing") == [102]
+            assert await ids(q="cobol") == []
+            assert [job["id"] for job in (await http.get("/api/jobs/search", params={"q": "sql"})).json()] == [103]
+
+    asyncio.run(scenario())
+
+
+def test_ensure_fresh_data_reads_only_the_freshness_stamp(fake_job_store, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_DEDUP_ENABLED", False)
+    submitted = []
+
+    async def submit(max_jobs=30, trigger="manual"):
+        submitted.append(trigger)
+        return {"run_id": "run-1", "status": "pending"}
+
+    monkeypatch.setattr(scrape_scheduler, "submit", submit)
+
+    async def scenario():
+        await job_store.save_jobs([dict(STORED_JOBS[0], id=i) for i in range(12)], ttl=3600)
+        # The whole-corpus blob is not consulted
+        await fake_job_store.client.delete("scraped_jobs")
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            response = (await http.post("/api/auto/ensure-fresh-data")).json()
+            assert (response["action"], response["jobs_count"], submitted) == ("used_cache", 12, [])
+
+            await fake_job_store.client.set("jobs:fresh_until", 0)
+            response = (await http.post("/api/auto/ensure-fresh-data")).json()
+            assert (response["action"], response["run_id"], submitted) == ("refreshing_stale", "run-1", ["stale-cache"])
+
+    asyncio.run(scenario())
@@ -0,0 +1,1101 @@
+"""Service-level tests."""
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.config import settings
+from app.services.job_scraper import JobScraper
+from app.services.crawler import job_id
+from app.services.html_parser import available_backends, get_parser
+from app.services.rate_limiter import HostRateLimiter
+from app.services.skill_matcher import SkillMatcher, skill_matcher
+from app.services.categorizer import job_categorizer
+from app.services.salary_parser import SalaryParser
+from app.services.job_table import JobTable, date_range_start
+from app.services.analytics_service import analytics_service
+from app.routes import analytics as analytics_routes
+from app.routes.analytics import _get_aggregates
+from app.services.deduplicator import JobDeduplicator
+from app.services.job_store import job_store
+from app.services.analytics_aggregates import analytics_aggregates
+from app.services import search_index as search_index_module
+from app.services.search_index import SearchIndex
+from app.services.eligibility_index import EligibilityIndex
+from app.services.catalogue import CatalogueStore, DEFAULT_SOURCE_PATH
+from app.services.kcse_service import KCSEService
+from app.services.university_scraper import COURSE_KEYWORDS, UniversityScraper
+from app.tasks.scrapping_tasks import ScrapeScheduler
+from app.services import cache_service
+from app.services import gemini_service as gemini_module
+from app.services.gemini_service import GeminiService
+from app import database
+from app.database import CODECS, LocalCache, decode_value, encode_value
+
+
+@pytest.fixture(autouse=True)
+def fast_scraper_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPER_HOST_RATE", 50.0)
+    monkeypatch.setattr(settings, "SCRAPER_TIMEOUT", 5.0)
+
+
+def test_scrape_all_jobs_collects_every_source_and_page(stub_sources):
+    jobs = JobScraper(sources=stub_sources).scrape_all_jobs(max_jobs=30, pages=2)
+
+    assert len(jobs) == 9
+    assert {job["source"] for job in jobs} == {"BrighterMonday", "MyJobMag", "Fuzu"}
+    titles = {job["title"] for job in jobs}
+    assert {"Registered Nurse", "Logistics Coordinator", "Agricultural Extension Officer"} <= titles
+
+
+def test_scrape_all_jobs_extracts_fields(stub_sources):
+    jobs = JobScraper(sources=stub_sources).scrape_all_jobs(max_jobs=30, pages=1)
+    developer = next(job for job in jobs if job["title"] == "Senior Software Developer")
+
+    assert developer["company"] == "Safaricom PLC"
+    assert developer["location"] == "Nairobi"
+    assert developer["salary"] == 250000
+    assert developer["category"] == "tech"
+    assert "Python" in developer["skills"]
+
+
+def test_scraped_job_ids_are_stable_and_derived_from_the_fingerprint(stub_sources):
+    jobs = JobScraper(sources=stub_sources).scrape_all_jobs(max_jobs=30, pages=2)
+
+    assert [job["id"] for job in jobs] == [job_id(job["fingerprint"]) for job in jobs]
+    assert len({job["id"] for job in jobs}) == len(jobs)
+    # Not Python's per-process salted hash(): the same in every worker, and exact in JavaScript
+    assert job_id("https://example.com/jobs/1") == 1431889831871061
+    assert all(0 < job["id"] < 2 ** 53 for job in jobs)
+
+
+def test_scrape_all_jobs_caps_jobs_per_source(stub_sources):
+    jobs = JobScraper(sources=stub_sources).scrape_all_jobs(max_jobs=3, pages=2)
+
+    assert len(jobs) == 3
+    assert {job["source"] for job in jobs} == {"BrighterMonday", "MyJobMag", "Fuzu"}
+
+
+def test_failing_source_does_not_block_others(stub_sources, stub_job_site):
+    stub_sources["Fuzu"] = dict(stub_sources["Fuzu"], url=stub_job_site + "/missing",
+                                page_url=stub_job_site + "/missing?page={page}")
+    jobs = JobScraper(sources=stub_sources).scrape_all_jobs(max_jobs=30, pages=2)
+
+    assert {job["source"] for job in jobs} == {"BrighterMonday", "MyJobMag"}
+
+
+def test_follow_pagination_links_without_page_template(stub_sources, stub_job_site):
+    scraper = JobScraper(sources={"BrighterMonday": dict(
+        stub_sources["BrighterMonday"], url=stub_job_site + "/brightermonday/linked", page_url=None)})
+    jobs = scraper.scrape_all_jobs(max_jobs=30, pages=3)
+
+    assert [job["title"] for job in jobs] == ["Senior Software Developer", "Accountant", "Registered Nurse"]
+    assert scraper.last_crawl_stats["BrighterMonday"]["pages"] == 2
+
+
+def test_follow_detail_links_enriches_jobs(stub_sources):
+    scraper = JobScraper(sources={"Fuzu": stub_sources["Fuzu"]})
+    jobs = scraper.scrape_all_jobs(max_jobs=30, pages=1, follow_details=True)
+    analyst = next(job for job in jobs if job["title"] == "Data Analyst")
+
+    assert "Power BI" in analyst["description"]
+    assert analyst["salary"] == 120000
+    stats = scraper.last_crawl_stats["Fuzu"]
+    assert stats["pages"] == 2
+    assert stats["jobs_per_sec"] > 0
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_parser_backends_extract_the_same_jobs(stub_sources, backend):
+    reference = JobScraper(sources=stub_sources)
+    reference.parser = get_parser("bs4")
+    scraper = JobScraper(sources=stub_sources)
+    scraper.parser = get_parser(backend)
+
+    expected = reference.scrape_all_jobs(max_jobs=30, pages=2)
+    assert scraper.scrape_all_jobs(max_jobs=30, pages=2) == expected
+
+
+class MemoryCrawlState:
+    """In-process stand-in for ``CrawlState``: validators and fingerprints in dicts."""
+
+    def __init__(self):
+        self.pages = {}
+        self.fingerprints = set()
+
+    async def validators(self, urls):
+        return {url: self.pages[url] for url in urls if url in self.pages}
+
+    async def save_validators(self, pages):
+        self.pages.update(pages)
+
+    async def known(self, fingerprints):
+        return [fingerprint in self.fingerprints for fingerprint in fingerprints]
+
+
+def test_incremental_crawl_skips_unchanged_pages_and_known_cards(stub_sources):
+    state = MemoryCrawlState()
+    scraper = JobScraper(sources=stub_sources, state=state)
+    first = scraper.scrape_all_jobs(max_jobs=30, pages=2)
+    assert len(first) == 9
+    assert all(job["fingerprint"] for job in first)
+
+    # Nothing changed: every listing page is a 304 and nothing is re-extracted
+    state.fingerprints.update(job["fingerprint"] for job in first)
+    assert scraper.scrape_all_jobs(max_jobs=30, pages=2) == []
+    assert {stats["not_modified"] for stats in scraper.last_crawl_stats.values()} == {2}
+
+    # Pages without validators are re-read, but stored cards are skipped before extraction
+    state.pages.clear()
+    state.fingerprints.discard(first[0]["fingerprint"])
+    again = scraper.scrape_all_jobs(max_jobs=30, pages=2)
+    assert [job["title"] for job in again] == [first[0]["title"]]
+    assert sum(stats["skipped"] for stats in scraper.last_crawl_stats.values()) == 8
+
+
+def test_host_rate_limiter_spaces_same_host_only():
+    async def run():
+        limiter = HostRateLimiter(rate=10.0, burst=1)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait("http://a.example/jobs") for _ in range(3)))
+        same_host = time.monotonic() - start
+
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait(f"http://{host}.example/jobs") for host in "bcd"))
+        other_hosts = time.monotonic() - start
+        return same_host, other_hosts
+
+    same_host, other_hosts = asyncio.run(run())
+    assert same_host >= 0.2
+    assert other_hosts < 0.1
+
+
+def test_skill_matcher_respects_word_boundaries_and_synonyms():
+    assert skill_matcher.find("Senior JavaScript developer, MySQL a plus") == ["JavaScript", "MySQL"]
+    assert skill_matcher.find("Excellent communication skills") == ["Communication"]
+    assert skill_matcher.find("Reports in MS Excel and Power BI; C#/.NET") == ["Excel", "Power BI", "C#", ".NET"]
+
+
+def test_skill_matcher_prefers_longest_overlapping_match():
+    matcher = SkillMatcher({"Excel": [], "Microsoft Excel": [], "Data": [], "Data Analysis": ["analysing data"]})
+
+    assert matcher.find("Microsoft  Excel for analysing data") == ["Microsoft Excel", "Data Analysis"]
+    assert matcher.find("data, excel") == ["Data", "Excel"]
+
+
+def test_categorizer_scores_instead_of_first_match():
+    # "engineer" is a tech keyword too, but civil engineering outscores it
+    assert job_categorizer.categorize("Civil Engineer", "Supervise road construction") == "engineering"
+    assert job_categorizer.categorize("IT Support Officer") == "tech"
+    # Lowercase "it" is a pronoun, not the IT acronym
+    assert job_categorizer.categorize("Office Assistant", "it is a busy office") == "other"
+
+
+def test_categorizer_matches_whole_words_and_only_marked_stems():
+    # Near misses of whole-word keywords
+    assert job_categorizer.scores("Taxi Driver") == {"logistics": 3.0}
+    assert job_categorizer.scores("Leading Chef") == {"hospitality": 3.0}
+    assert job_categorizer.scores("Database Administrator") == {}
+    assert job_categorizer.scores("Nursery School Teacher") == {"education": 3.0}
+    assert job_categorizer.scores("Webinar host", "Doctoral candidate wanted") == {}
+    # Plurals, stems and phrases
+    assert job_categorizer.scores("Nurses", "Tax and taxes; data entry") == {"healthcare": 3.0, "finance": 2.0,
+                                                                            "tech": 1.0}
+    assert job_categorizer.scores("Engineering Lead") == {"tech": 3.0, "engineering": 3.0, "management": 3.0}
+    assert job_categorizer.scores("Delivery riders", "Two deliveries a day") == {"logistics": 4.0}
+    assert job_categorizer.scores("Supply  Chain Officer", "Supply chains") == {"logistics": 4.0}
+    assert job_categorizer.scores("ICT officer", "ict, It and IT.") == {"tech": 4.0}
+    assert job_categorizer.categorize_batch(["Taxi Driver", "Tax Accountant", "Team Leader"]) == [
+        "logistics", "finance", "management"]
+
+
+def test_categorizer_batch_matches_single():
+    titles = ["Senior Software Developer", "Registered Nurse", "Farm Manager", "", "Accountant"]
+    descriptions = ["Python and SQL", "Patient care", "Livestock and crops", "", "Audit and tax"]
+
+    assert job_categorizer.categorize_batch(titles, descriptions) == [
+        job_categorizer.categorize(title, description) for title, description in zip(titles, descriptions)
+    ] == ["tech", "healthcare", "agriculture", "other", "finance"]
+
+
+def test_salary_parser_normalizes_ranges_suffixes_periods_and_currency():
+    parser = SalaryParser(fx_rates={"USD": 130.0})
+
+    assert parser.parse("Salary: KSh 80,000 - 120,000 per month")["salary"] == 100000
+    assert parser.parse("Pay 80-120k monthly")["monthly_min"] == 80000
+    assert parser.parse("KES 1.2M p.a.")["salary"] == 100000
+    assert parser.parse("USD 2,000 per month") == dict(
+        min=2000.0, max=2000.0, currency="USD", period="month",
+        monthly_min=260000, monthly_max=260000, salary=260000)
+    # No period stated: an annual-sized figure is read as annual
+    assert parser.parse("Salary KES 2,400,000")["period"] == "year"
+    # Bare numbers that are not pay
+    assert parser.parse("5 years experience, salary negotiable") is None
+    assert parser.parse("Call 0712 345678") is None
+
+
+def test_salary_parser_batch_sets_job_fields_and_filters_by_range_top():
+    jobs = [{"_salary_text": "KSh 60,000 to 90,000 a month"}, {"_salary_text": "No pay listed"}, {"salary": 70000}]
+    SalaryParser().parse_jobs(jobs)
+
+    assert jobs[0] == {"salary": 75000, "salary_min": 60000, "salary_max": 90000}
+    assert jobs[1] == {"salary": None}
+    assert jobs[2] == {"salary": 70000}
+    # salary_min matches any job whose range reaches it
+    assert JobTable(jobs).mask(salary_min=80000).tolist() == [True, False, False]
+
+
+def test_deduplicator_merges_near_duplicate_listings_across_sources():
+    listing = {"id": 1, "title": "Senior Software Developer", "company": "Safaricom PLC", "source": "BrighterMonday",
+               "description": "Build mobile money APIs in Python and Django for millions of customers.",
+               "fingerprint": "bm-1", "salary": None}
+    relisted = dict(listing, id=2, title="Senior Software Developer - Nairobi", source="Fuzu", fingerprint="fz-7",
+                    salary=200000)
+    other = {"id": 3, "title": "Accountant", "company": "KCB Bank", "source": "Fuzu",
+             "description": "Prepare monthly financial statements and reconcile accounts."}
+
+    jobs = JobDeduplicator(threshold=0.7).deduplicate([listing, other, relisted])
+
+    assert [job["id"] for job in jobs] == [1, 3]
+    assert jobs[0]["sources"] == ["BrighterMonday", "Fuzu"]
+    assert jobs[0]["fingerprints"] == ["bm-1", "fz-7"]
+    assert jobs[0]["salary"] == 200000
+    assert "sources" not in jobs[1]
+
+
+class _NoRedis:
+    """Stands in for the Redis client when Redis is not running."""
+    client = None
+
+    async def set_cache(self, key, value, ttl=300):
+        return False
+
+    async def get_cache(self, key):
+        return None
+
+
+class _GatedScraper:
+    def __init__(self, fail=False):
+        self.release = asyncio.Event()
+        self.calls = 0
+        self.fail = fail
+
+    async def scrape_all_jobs(self, max_jobs):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("site down")
+        return [{"id": 1, "title": "Data Analyst"}]
+
+
+class _RecordingStore:
+    def __init__(self):
+        self.merged = []
+        self.expiries = 0
+
+    async def merge_jobs(self, jobs, ttl=3600):
+        self.merged.append(jobs)
+        return True
+
+    async def expire_jobs(self):
+        self.expiries += 1
+        return 2
+
+
+def _scan_recommendations(programmes, points, interests, subjects):
+    """The per-programme scan ``EligibilityIndex.recommend`` replaces."""
+    def percent(user, listed):
+        if not user or not listed:
+            return 50.0
+        listed = [term.lower() for term in listed]
+        matches = sum(1 for term in (t.lower() for t in user) if any(c in term or term in c for c in listed))
+        return min(100.0, (matches / len(user)) * 100)
+
+    eligible, related = [], []
+    for name, data in programmes.items():
+        interest = percent(interests, data["interests"])
+        match = int((interest + percent(subjects, data["subjects"])) / 2)
+        if points >= data["cluster_points"]:
+            eligible.append((name, match))
+        elif points >= data["cluster_points"] - 10 and interest > 60:
+            related.append((name, match))
+    eligible.sort(key=lambda item: item[1], reverse=True)
+    related.sort(key=lambda item: item[1], reverse=True)
+    return eligible[:5], related[:3]
+
+
+def test_eligibility_index_and_score_matrix_match_full_catalogue_scan():
+    rng = random.Random(3)
+    vocabulary = ["science", "computer science", "biology", "art", "business", "law", "mathematics",
+                  "design", "helping people", "technology", "Physics", "Chemistry", "music"]
+    programmes = {
+        f"Programme {i}": {
+            "cluster_points": float(rng.randrange(20, 84)),
+            "interests": rng.sample(vocabulary, rng.randint(0, 4)),
+            "subjects": rng.sample(vocabulary, rng.randint(0, 3)),
+        }
+        for i in range(300)
+    }
+    index = EligibilityIndex(programmes)
+
+    queries = []
+    for _ in range(200):
+        points = rng.uniform(15, 90)
+        interests = [term.upper() if rng.random() < 0.3 else term
+                     for term in rng.sample(vocabulary + ["sci", "tech"], rng.randint(0, 3))]
+        subjects = rng.sample(vocabulary, rng.randint(0, 2))
+        eligible, related = index.recommend(points, interests, subjects)
+        named = ([(index.names[p], m) for p, m in eligible], [(index.names[p], m) for p, m in related])
+        assert named == _scan_recommendations(programmes, points, interests, subjects)
+        queries.append((points, interests, subjects))
+
+    # The batch score matrix agrees with the per-student lookups
+    points, interests, subjects = zip(*queries)
+    assert index.recommend_many(points, interests, subjects) == [
+        index.recommend(*query) for query in queries]
+
+
+def test_catalogue_compiles_memory_maps_and_hot_reloads(tmp_path):
+    source = json.loads(DEFAULT_SOURCE_PATH.read_text())
+    source_path, compiled_path = tmp_path / "catalogue.json", tmp_path / "catalogue.bin"
+    source_path.write_text(json.dumps(source))
+    store = CatalogueStore(str(source_path), str(compiled_path), check_interval=0)
+    service = KCSEService(catalogue=store)
+
+    # First use compiles the source; numeric columns are read-only views of the mapping
+    catalogue = store.current()
+    assert compiled_path.exists() and catalogue.version == source["version"]
+    cutoffs = catalogue.arrays["career_cutoffs"]
+    assert not cutoffs.flags.writeable
+    assert cutoffs.tolist() == [career["cluster_points"] for career in source["careers"].values()]
+    assert [u["name"] for u in service.get_universities()] == list(source["universities"])
+    assert service.get_universities()[0] is not service.get_universities()[0]
+    medicine = service.get_career_recommendations(75, ["biology"], [], "any")["eligible"][0]
+    assert (medicine["name"], medicine["required_points"]) == ("Medicine", 70.0)
+
+    # New cutoffs land without a restart; the index is rebuilt once per reload
+    index = service.eligibility_index
+    assert store.current() is catalogue and service.eligibility_index is index
+    source["version"] = "2025.1"
+    source["careers"]["Medicine"]["cluster_points"] = 80.0
+    source_path.write_text(json.dumps(source))
+    os.utime(source_path, ns=(compiled_path.stat().st_mtime_ns + 10**9,) * 2)
+    assert store.current().version == "2025.1"
+    eligible = service.get_career_recommendations(75, ["biology"], [], "any")["eligible"]
+    assert "Medicine" not in [career["name"] for career in eligible]
+    assert service.eligibility_index is not index
+    # The previous mapping stays valid for whoever still holds it
+    assert cutoffs[0] == 70.0
+
+
+
+def test_catalogue_falls_back_to_temp_dir_when_compiled_path_is_unwritable(tmp_path, monkeypatch):
+    # A regular file as the parent directory cannot be written to, even as root
+    (tmp_path / "read-only").write_text("")
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+    (tmp_path / "tmp").mkdir()
+    store = CatalogueStore(str(DEFAULT_SOURCE_PATH), str(tmp_path / "read-only" / "catalogue.bin"), check_interval=0)
+
+    catalogue = store.current()
+    assert store.compiled_path.parent == tmp_path / "tmp" and store.compiled_path.exists()
+    assert catalogue.version == json.loads(DEFAULT_SOURCE_PATH.read_text())["version"]
+    assert store.current() is catalogue
+
+
+def test_universities_are_listed_in_catalogue_order():
+    assert [u["name"] for u in KCSEService().get_universities()] == [
+        "University of Nairobi", "Kenyatta University", "Moi University", "JKUAT",
+        "Strathmore University", "USIU", "Daystar University"]
+
+def _scan_courses(universities, points, interests):
+    """The full university x course scan ``CourseIndex.search`` replaces."""
+    courses = []
+    for uni_name, uni_data in universities.items():
+        for course_name, details in uni_data.get("courses", {}).items():
+            if points < details["cluster_points"]:
+                continue
+            match = 100
+            if interests:
+                lowered = [interest.lower() for interest in interests]
+                hits = sum(1 for keyword, related in COURSE_KEYWORDS.items() if keyword in course_name.lower()
+                           and any(r in i or i in r for i in lowered for r in related))
+                match = min(100.0, (hits / len(interests)) * 100)
+            courses.append((course_name, uni_name, match, points - details["cluster_points"]))
+    courses.sort(key=lambda course: (course[2], course[3]), reverse=True)
+    return courses
+
+
+def test_course_search_matches_full_scan_and_limits_top_k(tmp_path):
+    rng = random.Random(8)
+    names = ["Computer Science", "Civil Engineering", "Medicine", "Business", "Education", "Law",
+             "Agriculture", "Journalism", "Computer Engineering", "Business Law", "Forestry", "Music"]
+    universities = {
+        f"University {u}": {"type": "Public", "fees_range": "KSh 16,000", "courses": {
+            name: {"cluster_points": float(rng.randrange(30, 80)), "duration": "4 years", "fees": "KSh 30,000"}
+            for name in rng.sample(names, rng.randint(0, 8))}}
+        for u in range(40)
+    }
+    source_path = tmp_path / "catalogue.json"
+    source_path.write_text(json.dumps({"version": "test", "careers": {}, "universities": universities}))
+    scraper = UniversityScraper(CatalogueStore(str(source_path), str(tmp_path / "catalogue.bin")))
+
+    for _ in range(100):
+        points = rng.uniform(25, 85)
+        interests = rng.sample(["technology", "Helping People", "law", "media", "farming", "art", "te"],
+                               rng.randint(0, 3))
+        found = scraper.search_courses_by_points(points, interests)
+        assert [(c["course"], c["university"], c["interest_match"], c["points_buffer"]) for c in found] == \
+            _scan_courses(universities, points, interests)
+        assert scraper.search_courses_by_points(points, interests, limit=10) == found[:10]
+
+
+def test_scrape_scheduler_runs_in_background_and_coalesces():
+    async def scenario():
+        scraper, store = _GatedScraper(), _RecordingStore()
+        scheduler = ScrapeScheduler(scraper=scraper, store=store, redis=_NoRedis())
+
+        run = await scheduler.submit(max_jobs=5)
+        assert run["status"] == "queued"
+        await asyncio.sleep(0)
+        assert (await scheduler.submit())["run_id"] == run["run_id"]
+        assert (await scheduler.get_run(run["run_id"]))["status"] == "running"
+
+        scraper.release.set()
+        done = await scheduler.wait(run["run_id"])
+        assert (done["status"], done["jobs_count"], scraper.calls) == ("succeeded", 1, 1)
+        assert store.merged == [[{"id": 1, "title": "Data Analyst"}]]
+        assert (done["expired_count"], store.expiries) == (2, 1)
+
+        failing = ScrapeScheduler(scraper=_GatedScraper(fail=True), store=store, redis=_NoRedis())
+        failed_run = await failing.submit()
+        failing.scraper.release.set()
+        failed = await failing.wait(failed_run["run_id"])
+        assert (failed["status"], failed["error"]) == ("failed", "site down")
+        assert len(store.merged) == 1
+
+    asyncio.run(scenario())
+
+
+def test_scrape_scheduler_lock_loser_publishes_skipped_run(fake_redis):
+    async def scenario():
+        winner_scraper, store = _GatedScraper(), _RecordingStore()
+        winner = ScrapeScheduler(scraper=winner_scraper, store=store, redis=fake_redis(asynchronous=True))
+        loser = ScrapeScheduler(scraper=_GatedScraper(), store=store, redis=fake_redis(asynchronous=True))
+
+        running = await winner.submit()
+        await asyncio.sleep(0)
+        skipped = await loser.wait((await loser.submit())["run_id"])
+        assert (skipped["status"], loser.scraper.calls) == ("skipped", 0)
+        assert skipped["finished_at"] and not loser._tasks
+
+        # Any worker sees the loser's final status through Redis
+        observer = fake_redis(asynchronous=True)
+        published = await observer.get_cache(f"scraper_run:{skipped['run_id']}")
+        assert published["status"] == "skipped" and published["finished_at"] == skipped["finished_at"]
+
+        winner_scraper.release.set()
+        assert (await winner.wait(running["run_id"]))["status"] == "succeeded"
+        assert await observer.client.get("scraper:lock") is None
+
+        # A cancelled run is published too
+        cancelled = await winner.submit()
+        await asyncio.sleep(0)
+        winner_scraper.release.clear()
+        await winner.stop()
+        published = await observer.get_cache(f"scraper_run:{cancelled['run_id']}")
+        assert published["status"] == "cancelled" and published["finished_at"]
+        assert not winner._tasks
+
+    asyncio.run(scenario())
+
+
+def _stored_job(job_id, title, category="tech", location="Nairobi", salary=None, source="BrighterMonday", **fields):
+    job = {"id": job_id, "title": title, "company": f"Company {job_id}", "location": location,
+           "category": category, "salary": salary, "description": f"{title} role at company {job_id}",
+           "skills": [], "source": source, "fingerprint": f"{source[:2].lower()}-{job_id}"}
+    job.update(fields)
+    return job
+
+
+def test_job_store_round_trip_filters_and_versions(fake_job_store):
+    async def scenario():
+        jobs = [
+            _stored_job(1, "Backend Developer", salary=90000, posted_date="2024-05-01"),
+            _stored_job(2, "Nurse", category="healthcare", location="Mombasa", salary_max=60000, salary=40000),
+            _stored_job(3, "Accountant", category="finance", source="Fuzu", posted_date="2 days ago"),
+            _stored_job(4, "Data Analyst", location="Nairobi CBD", salary=150000, category="data"),
+        ]
+        assert await job_store.save_jobs(jobs)
+        version = await fake_job_store.client.get("jobs:version")
+
+        assert [job["id"] for job in await job_store.get_jobs(await job_store.find_job_ids())] == [1, 2, 3, 4]
+        assert await job_store.get_job(2) == dict(jobs[1], posted_date=date.today().isoformat())
+        assert await job_store.get_job(99) is None
+        assert set(await job_store.find_job_ids(category="tech")) == {"1"}
+        assert set(await job_store.find_job_ids(location="nairobi")) == {"1", "3", "4"}
+        assert set(await job_store.find_job_ids(source="fuzu")) == {"3"}
+        assert await job_store.find_job_ids(location="kisumu") == []
+        # Salary filters use the top of the range; jobs without a salary never match
+        assert set(await job_store.find_job_ids(salary_min=50000)) == {"1", "2", "4"}
+        assert set(await job_store.find_job_ids(salary_min=60001)) == {"1", "4"}
+        assert set(await job_store.find_job_ids(salary_min=100000, location="nairobi")) == {"4"}
+
+        # A non-ISO posted date is indexed as today instead of failing the batch
+        assert await job_store.oldest_posted_date() == date(2024, 5, 1)
+        assert await job_store.find_posted_before(date.today()) == ["1"]
+        assert (await job_store.get_job(3))["posted_date"] == "2 days ago"
+
+        assert await job_store.save_jobs(jobs[:1])
+        assert int(await fake_job_store.client.get("jobs:version")) == int(version) + 1
+        assert await job_store.find_job_ids() == ["1"]
+        assert await job_store.find_job_ids(category="finance") == []
+
+    asyncio.run(scenario())
+
+
+def test_job_store_merge_replaces_by_id_and_collapses_duplicates(fake_job_store):
+    async def scenario():
+        await job_store.save_jobs([_stored_job(1, "Backend Developer", salary=90000),
+                                   _stored_job(2, "Nurse", category="healthcare")])
+        listing = _stored_job(3, "Senior Data Engineer", company="Acme",
+                              description="Build and run the data platform for our Nairobi analytics team",
+                              source="Fuzu")
+        relisted = dict(listing, id=4, source="MyJobMag", fingerprint="my-4", salary=200000)
+        assert await job_store.merge_jobs([listing, relisted, _stored_job(2, "Registered Nurse")])
+
+        jobs = await job_store.get_jobs(await job_store.find_job_ids())
+        assert [job["id"] for job in jobs] == [3, 2, 1]
+        assert jobs[0]["sources"] == ["Fuzu", "MyJobMag"] and jobs[0]["salary"] == 200000
+        assert jobs[1]["title"] == "Registered Nurse"
+        assert await job_store.known_fingerprints(["fu-3", "my-4", "br-1", "br-9"]) == [True, True, True, False]
+        assert set(await job_store.find_job_ids(source="myjobmag")) == {"3"}
+
+    asyncio.run(scenario())
+
+
+def test_analytics_totals_match_a_full_recompute_after_add_remove_and_expiry(fake_job_store):
+    async def scenario():
+        jobs = [
+            _stored_job(1, "Backend Developer", salary=90000, skills=["Python", "SQL"]),
+            _stored_job(2, "Nurse", category="healthcare", salary=40000, skills=["Nursing"]),
+            _stored_job(3, "Frontend Developer", salary=80000, skills=["React"]),
+            _stored_job(4, "Volunteer", category=None, skills=["Python"]),
+            _stored_job(6, "Driver", category=None, salary=30000),
+            _stored_job(5, "Old Listing", category="finance", salary=50000, posted_date="2020-01-01"),
+        ]
+        assert await job_store.save_jobs([dict(job) for job in jobs])
+        totals = await analytics_aggregates.read()
+        assert totals["category_counts"] == {"tech": 2, "healthcare": 1, "other": 2, "finance": 1}
+        # Uncategorized salaries count under "other", as in the filtered JobTable totals
+        assert totals["salary_sums"] == {"tech": 170000, "healthcare": 40000, "finance": 50000, "other": 30000}
+
+        assert await job_store.remove_jobs(["1", "2", "99"]) == 2
+        assert await job_store.expire_jobs(max_age_days=30) == 1
+        assert await job_store.expire_jobs(max_age_days=0) == 0
+        assert await job_store.merge_jobs([_stored_job(1, "Backend Developer", salary=95000, skills=["Python"])])
+        incremental = await analytics_aggregates.read()
+
+        # A full rewrite of what is left recomputes every total from scratch
+        assert await job_store.save_jobs(await job_store.get_jobs(await job_store.find_job_ids()))
+        recomputed = await analytics_aggregates.read()
+        assert incremental == recomputed
+        assert recomputed == {
+            "total": 4,
+            "stored": 4,
+            "category_counts": {"tech": 2, "other": 2},
+            "salary_sums": {"tech": 175000, "other": 30000},
+            "salary_counts": {"tech": 2, "other": 1},
+            "skill_counts": {"Python": 2, "React": 1},
+        }
+
+    asyncio.run(scenario())
+
+
+def _synthetic_corpus(count, rng):
+    today = date.today()
+    return [
+        {"id": i, "title": f"Job {i}", "category": rng.choice(["tech", "finance", "healthcare", "education", None]),
+         "location": rng.choice(["Nairobi", "Nairobi CBD", "Mombasa", "Kisumu", "Remote"]),
+         "salary": rng.choice([None, 0, rng.randrange(20000, 300000, 500)]),
+         "skills": rng.sample(["Python", "Excel", "Nursing", "Teaching", "SQL", "Sales"], rng.randint(0, 3)),
+         "posted_date": (today - timedelta(days=rng.randint(0, 500))).isoformat()}
+        for i in range(count)
+    ]
+
+
+def _loop_filter(jobs, category=None, location=None, salary_min=None, date_range=None):
+    """The per-job filtering the NumPy masks replace."""
+    since = date_range_start(date_range)
+    return [
+        job for job in jobs
+        if (not category or category == "all" or job["category"] == category)
+        and (not location or location.lower() in job["location"].lower())
+        and (not salary_min or (job.get("salary_max") or job.get("salary") or 0) >= salary_min)
+        and (since is None or date.fromisoformat(job["posted_date"]) >= since)
+    ]
+
+
+def _loop_results(jobs):
+    """What the analytics endpoints return from a Python pass over ``jobs`` (with some jobs stored)."""
+    if not jobs:
+        # A filter matching no stored job gives empty results, not mock data
+        return {"demand": [], "salary": [], "skills": set(), "categories": Counter()}
+    return {
+        "demand": analytics_service.generate_demand_trends(jobs),
+        "salary": analytics_service.generate_salary_data(jobs),
+        "skills": {(s["name"], s["count"]) for s in analytics_service.generate_skills_data(jobs)},
+        "categories": Counter(tuple(c.items()) for c in analytics_service.generate_categories_data(jobs)),
+    }
+
+
+def _table_results(aggregates):
+    return {
+        "demand": analytics_service.demand_trends_from_aggregates(aggregates),
+        "salary": analytics_service.salary_data_from_aggregates(aggregates),
+        "skills": {(s["name"], s["count"]) for s in analytics_service.skills_data_from_aggregates(aggregates)},
+        "categories": Counter(tuple(c.items()) for c in analytics_service.categories_data_from_aggregates(aggregates)),
+    }
+
+
+ANALYTICS_FILTERS = [
+    {"category": "tech"},
+    {"category": "finance", "date_range": "last-3-months"},
+    {"location": "nairobi"},
+    {"location": "KISUMU", "salary_min": 100000},
+    {"date_range": "last-week"},
+    {"date_range": "last-month", "category": "healthcare", "location": "mombasa"},
+    {"category": "unknown"},
+    {"location": "eldoret"},
+]
+
+
+def test_job_table_aggregates_match_the_python_loop_analytics():
+    rng = random.Random(5)
+    jobs = _synthetic_corpus(600, rng)
+    table = JobTable(jobs)
+
+    for filters in ANALYTICS_FILTERS + [{}]:
+        matching = _loop_filter(jobs, **filters)
+        mask = table.mask(**filters)
+        assert mask.tolist() == [job in matching for job in jobs]
+
+        aggregates = table.aggregate(mask)
+        assert aggregates["total"] == len(matching)
+        assert aggregates["category_counts"] == Counter(job["category"] or "other" for job in matching)
+        assert aggregates["skill_counts"] == Counter(skill for job in matching for skill in job["skills"])
+        assert _table_results(aggregates) == _loop_results(matching), filters
+
+
+def test_date_range_start_windows():
+    today = date(2024, 6, 30)
+    assert date_range_start("last-week", today) == date(2024, 6, 23)
+    assert date_range_start("last-year", today) == date(2023, 7, 1)
+    assert date_range_start("all-time", today) is None
+    assert date_range_start(None, today) is None
+    assert date_range_start("since-forever", today) is None
+
+
+def test_filtered_analytics_route_aggregates_match_the_python_loop(fake_job_store):
+    jobs = _synthetic_corpus(120, random.Random(8))
+
+    async def scenario():
+        # Mock data only stands in while nothing is stored
+        assert analytics_service.categories_data_from_aggregates(await _get_aggregates("tech", None, None, None)) \
+            == analytics_service._get_mock_categories_data()
+
+        assert await job_store.save_jobs([dict(job) for job in jobs])
+        for filters in ANALYTICS_FILTERS:
+            aggregates = await _get_aggregates(filters.get("category"), filters.get("location"),
+                                               filters.get("salary_min"), filters.get("date_range"))
+            assert _table_results(aggregates) == _loop_results(_loop_filter(jobs, **filters)), filters
+        # Unfiltered requests over a window covering every job read the ingest-time totals
+        assert await _get_aggregates("all", None, None, "all-time") == await analytics_aggregates.read()
+        # ...which agree with the job table's totals over every row, uncategorized jobs included
+        table = analytics_routes.job_table
+        assert table.aggregate(table.mask()) == await analytics_aggregates.read()
+
+    asyncio.run(scenario())
+
+
+def _indexed(*jobs):
+    index = SearchIndex()
+    index.update([dict({"description": "", "company": "", "skills": []}, id=job_id, title=title, **fields)
+                  for job_id, title, fields in jobs], version="1")
+    return index
+
+
+def test_search_index_ranks_with_bm25_and_field_weights():
+    index = _indexed(
+        (1, "Python Developer", {"description": "Python services, Python tooling and Python tests"}),
+        (2, "Developer", {"description": "Occasional Python scripting within a large Java and Go codebase"}),
+        (3, "Accountant", {"description": "Ledgers"}),
+        (4, "Analyst", {"description": "Reports"}),
+        (5, "Reporting lead", {"description": "Analyst team"}),
+    )
+    ranked = index.search("python")
+    assert [doc_id for doc_id, _ in ranked] == ["1", "2"]
+    assert ranked[0][1] > ranked[1][1] > 0
+    # The rarer term carries more weight than one found in most jobs
+    assert index.search("ledgers")[0][1] > index.search("developer")[0][1]
+    # A title match outweighs the same term in the description
+    assert [doc_id for doc_id, _ in index.search("analyst")] == ["4", "5"]
+    assert index.search("python", limit=1) == ranked[:1]
+
+
+def test_search_index_ands_terms_and_expands_prefixes(monkeypatch):
+    index = _indexed(
+        (1, "Python Developer", {"skills": ["Django"]}),
+        (2, "Python Data Engineer", {}),
+        (3, "Web Developer", {"skills": ["React"]}),
+        (4, "Dev", {}),
+    )
+    assert [doc_id for doc_id, _ in index.search("python developer")] == ["1"]
+    assert index.search("python react") == []
+    assert index.search("") == [] and index.search("cobol") == []
+    # Exact matches rank above prefix expansions
+    assert [doc_id for doc_id, _ in index.search("dev")] == ["4", "1", "3"]
+    assert [doc_id for doc_id, _ in index.search("py eng")] == ["2"]
+    # Too short to expand: only an exact token matches
+    assert index.search("d") == []
+
+    monkeypatch.setattr(search_index_module, "MAX_PREFIX_EXPANSIONS", 3)
+    wide = _indexed(*[(i, f"role{i:02d}", {}) for i in range(10)])
+    assert len(wide.search("role")) == 3
+    assert len(wide.search("role05")) == 1
+
+
+def test_search_index_update_drops_replaced_and_removed_postings():
+    index = _indexed((1, "Python Developer", {}), (2, "Nurse", {}), (3, "Accountant", {}))
+    unchanged = index.doc_terms["3"]
+
+    index.update([
+        {"id": 1, "title": "Golang Developer"},
+        {"id": 3, "title": "Accountant", "description": "", "company": "", "skills": []},
+    ], version="2")
+    assert (len(index), index.version) == (2, "2")
+    assert index.search("python") == [] and "python" not in index.postings
+    assert index.search("nurse") == [] and "nurse" not in index.postings
+    assert [doc_id for doc_id, _ in index.search("golang")] == ["1"]
+    assert set(index.postings["developer"]) == {"1"}
+    assert index.doc_terms["3"] is unchanged
+    assert index.total_length == sum(index.doc_lengths.values())
+
+    index.remove("1")
+    assert index.search("developer") == [] and "golang" not in index.postings
+
+
+def test_session_fields_round_trip_share_one_ttl_and_delete(fake_redis, monkeypatch):
+    redis = fake_redis()
+    session = redis.get_session_id()
+
+    assert redis.set_session_fields(session, {"profile": {"name": "Amina", "points": 64.5}, "step": 2}, ttl=120)
+    assert redis.set_session_data(session, "answers", ["a", "b"], ttl=600)
+    assert redis.get_session_data(session, "profile") == {"name": "Amina", "points": 64.5}
+    assert redis.get_session_fields(session, ["step", "missing", "answers"]) == {"step": 2, "answers": ["a", "b"]}
+    assert redis.get_session_fields(session, []) == {}
+    assert set(redis.get_session_fields(session)) == {"profile", "step", "answers"}
+    # Every write resets the expiry of the whole session
+    assert redis.raw.ttl(f"session:{session}") == 600
+    assert redis.raw.keys("session:*") == [f"session:{session}".encode()]
+
+    # Off by default: the per-key layout is not scanned for
+    redis.raw.setex(f"session:{session}:legacy", 60, encode_value("old"))
+    assert "legacy" not in redis.get_session_fields(session)
+
+    # Turned on, fields written in the per-key layout are still found, and deleted with the session
+    monkeypatch.setattr(settings, "SESSION_LEGACY_KEYS", True)
+    redis.raw.setex(f"session:{session}:legacy", 60, encode_value("old"))
+    redis.raw.setex(f"session:{session}:step", 60, encode_value("shadowed"))
+    assert redis.get_session_data(session, "legacy") == "old"
+    assert redis.get_session_fields(session)["step"] == 2
+    assert redis.get_session_fields(session)["legacy"] == "old"
+    assert redis.delete_session(session) == 5
+    assert redis.get_session_fields(session) == {} and redis.raw.keys("session:*") == []
+    assert redis.delete_session(session) == 0
+
+
+def test_async_session_fields_round_trip_and_legacy_keys(fake_redis, monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(settings, "SESSION_LEGACY_KEYS", True)
+        redis = fake_redis(asynchronous=True)
+        session = redis.get_session_id()
+        await redis.raw.setex(f"session:{session}:quiz", 60, encode_value({"q1": "b"}))
+
+        assert await redis.set_session_fields(session, {"profile": {"name": "Otieno"}, "step": 1})
+        assert await redis.raw.ttl(f"session:{session}") == settings.SESSION_TTL
+        assert await redis.set_session_data(session, "step", 3, ttl=90)
+        assert await redis.raw.ttl(f"session:{session}") == 90
+        assert await redis.get_session_data(session, "step") == 3
+        assert await redis.get_session_fields(session, ["profile", "quiz", "nope"]) == {
+            "profile": {"name": "Otieno"}, "quiz": {"q1": "b"}}
+        assert await redis.get_session_fields(session) == {"profile": {"name": "Otieno"}, "step": 3,
+                                                          "quiz": {"q1": "b"}}
+
+        monkeypatch.setattr(settings, "SESSION_LEGACY_KEYS", False)
+        assert await redis.get_session_data(session, "quiz") is None
+        assert await redis.delete_session(session) == 2
+        monkeypatch.setattr(settings, "SESSION_LEGACY_KEYS", True)
+        assert await redis.delete_session(session) == 1
+        assert await redis.raw.keys("session:*") == []
+
+    asyncio.run(scenario())
+
+
+class _MemoryCache(_NoRedis):
+    """In-memory ``get_cache``/``set_cache`` (no expiry, no locks)."""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def set_cache(self, key, value, ttl=300):
+        self.entries[key] = value
+        return True
+
+    async def get_cache(self, key):
+        return self.entries.get(key)
+
+
+def test_stale_while_revalidate_single_flight_and_stale_serving(monkeypatch):
+    monkeypatch.setattr(cache_service, "async_redis_client", _MemoryCache())
+    calls = []
+
+    @cache_service.stale_while_revalidate("demo", soft_ttl=60)
+    async def load(category="all"):
+        calls.append(category)
+        await asyncio.sleep(0.01)
+        return {"category": category, "build": len(calls)}
+
+    async def scenario():
+        # A cold key under concurrent load is built once
+        results = await asyncio.gather(*(load("tech") for _ in range(10)))
+        assert calls == ["tech"] and all(r == {"category": "tech", "build": 1} for r in results)
+
+        # Past the soft TTL: stale data comes back at once, one refresh runs behind it
+        key = cache_service.get_cache_key("demo", {"category": "tech"})
+        cache_service.async_redis_client.entries[key]["fresh_until"] = 0
+        stale = await asyncio.gather(*(load("tech") for _ in range(5)))
+        assert all(r["build"] == 1 for r in stale)
+        await asyncio.sleep(0.05)
+        assert calls == ["tech", "tech"]
+        assert (await load("tech"))["build"] == 2
+
+    asyncio.run(scenario())
+
+
+
+def test_lock_waiters_stop_when_the_holder_releases_without_a_result(fake_redis, monkeypatch):
+    redis = fake_redis(asynchronous=True)
+    monkeypatch.setattr(cache_service, "async_redis_client", redis)
+    calls = []
+
+    async def load():
+        calls.append("load")
+        return {"built": True}
+
+    async def scenario():
+        # Another worker holds the lock, and its loader fails (returns None)
+        await redis.client.set(cache_service.LOCK_KEY.format("gemini:demo"), "other", ex=30)
+        waiter = asyncio.create_task(cache_service.get_or_refresh("gemini:demo", load, lock_timeout=30))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        await redis.client.delete(cache_service.LOCK_KEY.format("gemini:demo"))
+        assert await asyncio.wait_for(waiter, 1) is None
+        assert calls == []
+
+        # A holder that cached its result hands it to the waiters
+        await redis.client.set(cache_service.LOCK_KEY.format("gemini:demo"), "other", ex=30)
+        waiter = asyncio.create_task(cache_service.get_or_refresh("gemini:demo", load, lock_timeout=30))
+        await asyncio.sleep(0.1)
+        await cache_service.set_cached_entry("gemini:demo", {"built": "elsewhere"})
+        await redis.client.delete(cache_service.LOCK_KEY.format("gemini:demo"))
+        assert await asyncio.wait_for(waiter, 1) == {"built": "elsewhere"} and calls == []
+
+    asyncio.run(scenario())
+
+class _FakeGeminiModel:
+    """``generate_content`` stand-in answering from ``reply(prompt)``, which may sleep or raise."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=self.reply(prompt))
+
+
+class _FakeAsyncGeminiModel(_FakeGeminiModel):
+    """Native-async stand-in: each call waits for the next of ``delays``."""
+
+    def __init__(self, delays):
+        super().__init__(lambda prompt: '[{"title": "Data Analyst"}]')
+        self.delays = list(delays)
+
+    async def generate_content_async(self, prompt):
+        delay = self.delays.pop(0)
+        await asyncio.sleep(delay)
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=f'[{{"title": "Data Analyst", "delay": {delay}}}]')
+
+
+def _gemini(monkeypatch, model):
+    monkeypatch.setattr(cache_service, "async_redis_client", _MemoryCache())
+    service = GeminiService()
+    service.model, service.api_available, service.initialized = model, True, True
+    return service
+
+
+def test_gemini_answers_are_cached_by_canonical_input(monkeypatch):
+    def reply(prompt):
+        time.sleep(0.01)
+        if "Goals: fail" in prompt:
+            raise RuntimeError("quota exceeded")
+        return '[{"title": "Data Analyst"}]'
+
+    model = _FakeGeminiModel(reply)
+    service = _gemini(monkeypatch, model)
+
+    async def scenario():
+        # Same request up to order, case and spacing: one upstream call
+        results = await asyncio.gather(
+            service.get_recommendations_async(["Python", "SQL"], "2 years", ["data"], "Grow"),
+            service.get_recommendations_async(["sql", " python", "SQL"], "2  Years", ["Data"], "grow"),
+        )
+        assert len(model.prompts) == 1 and "Skills: python, sql" in model.prompts[0]
+        assert results[0] == results[1] == [{"title": "Data Analyst"}]
+
+        # Failures fall back to the mock and are retried next time
+        for _ in range(2):
+            assert await service.get_recommendations_async([], "", [], "fail") == service._mock_recommendations()
+        assert len(model.prompts) == 3
+
+    asyncio.run(scenario())
+
+
+def test_gemini_calls_time_out_to_mock_and_hedge_slow_requests(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_TIMEOUT", 0.2)
+
+    # The only attempt outlives the deadline: mock answer, nothing cached
+    service = _gemini(monkeypatch, _FakeAsyncGeminiModel([1.0]))
+    started = time.perf_counter()
+    assert asyncio.run(service.get_recommendations_async(["python"], "", [], "")) == service._mock_recommendations()
+    assert time.perf_counter() - started < 0.5
+    assert cache_service.async_redis_client.entries == {}
+
+    # A slow first attempt is hedged, and the quicker second one wins
+    monkeypatch.setattr(settings, "GEMINI_HEDGE_DELAY", 0.05)
+    service = _gemini(monkeypatch, _FakeAsyncGeminiModel([1.0, 0.01]))
+    assert asyncio.run(service.get_recommendations_async(["python"], "", [], "")) == [
+        {"title": "Data Analyst", "delay": 0.01}]
+
+
+def test_gemini_discovers_model_lazily_once_and_shares_it(monkeypatch):
+    calls = []
+
+    class FakeModel:
+        def __init__(self, name):
+            self.name = name
+
+        def generate_content(self, prompt):
+            calls.append(("probe", self.name))
+            time.sleep(0.01)
+            if self.name == gemini_module.MODEL_NAMES[0]:
+                raise RuntimeError("model overloaded")
+            return SimpleNamespace(text="Hello")
+
+    def list_models():
+        calls.append(("list",))
+        return [SimpleNamespace(name=name, supported_generation_methods=["generateContent"])
+                for name in gemini_module.MODEL_NAMES[:2]]
+
+    shared = {}
+    monkeypatch.setattr(gemini_module, "GEMINI_AVAILABLE", True)
+    monkeypatch.setattr(gemini_module, "genai", SimpleNamespace(
+        configure=lambda api_key: None, list_models=list_models, GenerativeModel=FakeModel), raising=False)
+    monkeypatch.setattr(gemini_module, "redis_client", SimpleNamespace(
+        get_cache=shared.get, set_cache=lambda key, value, ttl=300: shared.update({key: value})))
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+
+    # Nothing happens at construction; concurrent first uses discover once
+    service = GeminiService()
+    assert calls == [] and not service.initialized
+
+    async def first_requests():
+        return await asyncio.gather(*(service.initialize_async() for _ in range(5)))
+
+    assert asyncio.run(first_requests()) == [True] * 5
+    second = gemini_module.MODEL_NAMES[1]
+    assert calls == [("list",), ("probe", gemini_module.MODEL_NAMES[0]), ("probe", second)]
+    assert service.model.name == second and shared == {gemini_module.MODEL_CACHE_KEY: second}
+
+    # Another worker reuses the cached choice without touching the network
+    calls.clear()
+    other = GeminiService()
+    assert other.initialize() and other.model.name == second and calls == []
+
+
+def test_local_cache_evicts_least_recently_used_and_expired():
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.put("a", [1])
+    cache.put("b", [2])
+    assert cache.get("a") == [1]
+    cache.put("c", [3])  # evicts "b", the least recently used
+
+    assert (cache.get("b"), cache.get("c")) == (None, [3])
+    assert cache.hits == 2
+
+    # Every hit is a fresh copy, so mutating one leaves the entry intact
+    cache.get("c").append(4)
+    assert cache.get("c") == [3]
+    cache.put("d", {"jobs": [{"id": 1, "skills": ["SQL"]}]})
+    cache.get("d")["jobs"][0]["skills"].append("Excel")
+    assert cache.get("d") == {"jobs": [{"id": 1, "skills": ["SQL"]}]}
+
+    expired = LocalCache(max_size=2, ttl=0)
+    expired.put("a", [1])
+    assert expired.get("a") is None
+
+
+def test_async_cache_stats_count_only_lookups_that_reach_redis(fake_redis, monkeypatch):
+    decoded = []
+    monkeypatch.setattr(database, "decode_value", lambda raw: decoded.append(raw) or decode_value(raw))
+
+    async def scenario():
+        redis = fake_redis(asynchronous=True)
+        await redis.set_cache("jobs", [{"id": 1}])
+        jobs = await redis.get_cache("jobs")
+        jobs.append({"id": 2})
+        # The L1 hit is a copy of the entry decoded on the miss, not a second decode
+        assert await redis.get_cache("jobs") == [{"id": 1}] and len(decoded) == 1
+        assert await redis.get_cache("missing") is None
+        assert redis.cache_stats() == {"l1": {"hits": 1, "misses": 2}, "redis": {"hits": 1, "misses": 1}}
+
+        class _Down:
+            async def get(self, key):
+                raise RedisConnectionError("Redis is down")
+
+        redis.raw = _Down()
+        assert await redis.get_cache("other") is None
+        assert redis.cache_stats() == {"l1": {"hits": 1, "misses": 2}, "redis": {"hits": 1, "misses": 1}}
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("codec", [codec for codec in CODECS.values() if codec.available], ids=lambda c: c.name)
+def test_codecs_round_trip_with_header_and_read_legacy_values(codec):
+    jobs = [{"id": i, "title": "Data Analyst", "skills": ["SQL", "Excel"], "salary": None} for i in range(200)]
+
+    small = encode_value({"a": 1}, codec=codec, compress=True, compress_min_bytes=1024)
+    large = encode_value(jobs, codec=codec, compress=True, compress_min_bytes=1024)
+    assert small[0] == codec.header and decode_value(small) == {"a": 1}
+    assert decode_value(large) == jobs
+
+    # Values written before the codec header existed
+    assert decode_value(b'[{"id": 1}]') == [{"id": 1}]
+    assert decode_value("Nairobi".encode()) == "Nairobi"
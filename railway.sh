@@ -8,6 +8,10 @@ echo "[railway] Installing backend dependencies..."
 cd /app/backend
 pip install -r requirements.txt
 
+# Compile the KCSE catalogue while the app directory is still writable
+echo "[railway] Compiling KCSE catalogue..."
+python scripts/compile_catalogue.py
+
 # Start FastAPI server
 echo "[railway] Starting FastAPI server on port $PORT"
 exec uvicorn app.main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file